@@ -0,0 +1,194 @@
+"""Measure memory allocated by the frame loop's motion code.
+
+Usage: python -m benchmarks.allocations [--asteroids N] [--bullets N]
+                                        [--ufos N] [--frames N] [--seed N]
+
+Builds a busy World holding exactly the requested entities (fresh ones
+replace those a second of warm-up played with) and traces allocations
+with tracemalloc. Each motion step (integrate, wrap, ship_points,
+angle_to_vec) runs over one frame's worth of entities twice: as the old
+temporary-building code ("before") and through the in-place helpers in
+core.utils ("after"). An entity's cost is how far its call lifts
+tracemalloc's peak above the memory in use when it starts, so the totals
+are the bytes of temporaries per frame. The script then reports the peak
+and the net growth of whole World.update() calls.
+"""
+
+import argparse
+import random
+import tracemalloc
+from collections.abc import Callable
+
+from core import config as C
+from core.commands import PlayerCommand
+from core.entities import UFO_BULLET_OWNER, Bullet, Ship
+from core.utils import (
+    Vec,
+    angle_to_vec,
+    integrate,
+    integrate_wrap,
+    rand_unit_vec,
+    wrap_pos,
+)
+from core.world import World
+
+
+def build_world(
+    seed: int, n_ast: int, n_bullets: int, n_ufos: int
+) -> World:
+    """A World that has run a second of frames, holding exactly the given
+    asteroids, bullets and UFOs.
+
+    The warm-up's collisions, exits and UFO shots change those counts, so
+    the entities it played with are replaced by fresh ones after it.
+    """
+    random.seed(seed)
+    world = World(seed)
+    populate(world, n_ast, n_bullets, n_ufos)
+    idle = {C.LOCAL_PLAYER_ID: PlayerCommand()}
+    for _ in range(C.FPS):
+        world.update(1.0 / C.FPS, idle)
+    for table in (world.asteroids, world.bullets, world.ufos):
+        for entity in table.sprites():
+            entity.kill()
+    populate(world, n_ast, n_bullets, n_ufos)
+    return world
+
+
+def populate(world: World, n_ast: int, n_bullets: int, n_ufos: int) -> None:
+    for _ in range(n_ast):
+        world.spawn_asteroid(uniform_pos(), rand_unit_vec() * 60.0, "S")
+    for _ in range(n_bullets):
+        # Long-lived so they outlast the measured frames.
+        vel = rand_unit_vec() * C.SHIP_BULLET_SPEED
+        world.bullets.add(Bullet(UFO_BULLET_OWNER, uniform_pos(), vel, 1e9))
+    for _ in range(n_ufos):
+        world.spawn_ufo()
+
+
+def uniform_pos() -> Vec:
+    return Vec(
+        random.uniform(0, C.ARENA_WIDTH), random.uniform(0, C.ARENA_HEIGHT)
+    )
+
+
+def temp_bytes(step: Callable[[object], object], item: object) -> int:
+    """Peak bytes step(item) allocates above what was in use before it."""
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    step(item)
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - base
+
+
+# The motion code as it was before the in-place helpers.
+
+
+def old_move(entity: object, dt: float) -> None:
+    entity.pos += entity.vel * dt
+
+
+def old_move_wrap(entity: object, dt: float) -> None:
+    entity.pos += entity.vel * dt
+    entity.pos = wrap_pos(entity.pos)
+
+
+def old_ship_points(ship: Ship) -> tuple[Vec, Vec, Vec]:
+    dirv = angle_to_vec(ship.angle)
+    left = angle_to_vec(ship.angle + C.SHIP_NOSE_ANGLE)
+    right = angle_to_vec(ship.angle - C.SHIP_NOSE_ANGLE)
+    p1 = ship.pos + dirv * ship.r
+    p2 = ship.pos + left * ship.r * C.SHIP_NOSE_SCALE
+    p3 = ship.pos + right * ship.r * C.SHIP_NOSE_SCALE
+    return p1, p2, p3
+
+
+Step = Callable[[object], object]
+
+
+def motion_steps(
+    world: World, dt: float
+) -> list[tuple[str, list[object], Step, Step]]:
+    """(name, items, before, after) for each per-entity motion step."""
+    wrapped = [*world.asteroids.entities, *world.ships.values()]
+    free = [*world.bullets.entities, *world.ufos.entities]
+    ships = list(world.ships.values())
+    scratch = Vec()
+    return [
+        (
+            "integrate+wrap",
+            wrapped,
+            lambda e: old_move_wrap(e, dt),
+            lambda e: integrate_wrap(e.pos, e.vel, dt),
+        ),
+        (
+            "integrate",
+            free,
+            lambda e: old_move(e, dt),
+            lambda e: integrate(e.pos, e.vel, dt),
+        ),
+        ("ship_points", ships, old_ship_points, Ship.ship_points),
+        (
+            "angle_to_vec",
+            ships,
+            lambda s: angle_to_vec(s.angle),
+            lambda s: angle_to_vec(s.angle, scratch),
+        ),
+    ]
+
+
+def frame_bytes(step: Step, items: list[object], noise: float) -> float:
+    """Temporary bytes of one frame's worth of step, one item at a time."""
+    total = 0.0
+    for item in items:
+        step(item)  # warm lazily created state
+        total += max(0.0, temp_bytes(step, item) - noise)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--asteroids", type=int, default=200)
+    parser.add_argument("--bullets", type=int, default=100)
+    parser.add_argument("--ufos", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    dt = 1.0 / C.FPS
+    world = build_world(args.seed, args.asteroids, args.bullets, args.ufos)
+    counts = len(world.asteroids), len(world.bullets), len(world.ufos)
+    if counts != (args.asteroids, args.bullets, args.ufos):
+        raise AssertionError(f"built {counts}, not the requested counts")
+    idle = {C.LOCAL_PLAYER_ID: PlayerCommand()}
+
+    tracemalloc.start()
+    # What the measurement itself costs around a call that allocates nothing.
+    noise = min(temp_bytes(lambda item: None, None) for _ in range(100))
+    print("temporary bytes per frame")
+    print(f"{'step':>20}  {'items':>5}  {'before':>8}  {'after':>8}")
+    for name, items, before, after in motion_steps(world, dt):
+        print(
+            f"{name:>20}  {len(items):5d}"
+            f"  {frame_bytes(before, items, noise):8.0f}"
+            f"  {frame_bytes(after, items, noise):8.0f}"
+        )
+
+    peak_total = 0
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    for _ in range(args.frames):
+        peak_total += temp_bytes(lambda w: w.update(dt, idle), world)
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"\nWorld.update: {peak_total / args.frames:.0f} B peak/frame,"
+        f" {(end - start) / args.frames:+.1f} B net/frame"
+        f" (from {counts[0]} asteroids, {counts[1]} bullets,"
+        f" {counts[2]} ufos; {len(world.asteroids)}, {len(world.bullets)}"
+        f" and {len(world.ufos)} at the end)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Compare CollisionManager backends on a crowded scene.
+
+Usage: python -m benchmarks.collisions [--asteroids N] [--bullets N]
+                                       [--ufos N] [--repeat N] [--seed N]
+                                       [--check]
+
+Every backend resolves the same scene, built from the same seed. The script
+checks that all CollisionResults are identical, then prints the mean resolve
+time per backend. Each repetition starts from a fresh CollisionManager, so
+the "sap" time includes building its index from scratch, a cost a running
+World pays only as entities spawn.
+
+--check instead plants seeded pairs that touch only across the wrapped
+arena edges and reports any pair a backend's contact finder misses.
+"""
+
+import argparse
+import gc
+import random
+import time
+
+from core import config as C
+from core.collisions import CollisionManager, CollisionResult
+from core.contacts import BACKENDS
+from core.entities import UFO, UFO_BULLET_OWNER, Asteroid, Bullet, Ship
+from core.store import EntityStore, EntityTable
+from core.utils import Vec, rand_unit_vec
+
+Scene = tuple[dict, EntityTable, EntityTable, EntityTable]
+
+
+def build_scene(seed: int, n_ast: int, n_bullets: int, n_ufos: int) -> Scene:
+    random.seed(seed)
+    store = EntityStore()
+    ships = {
+        pid: Ship(pid, Vec(uniform_pos()))
+        for pid in range(1, C.MAX_PLAYERS + 1)
+    }
+    store.ships.add(*ships.values())
+    for _ in range(n_ast):
+        store.asteroids.add(
+            Asteroid(uniform_pos(), rand_unit_vec(), random.choice("LMS"))
+        )
+    for _ in range(n_bullets):
+        bullet = Bullet(
+            random.choice([*ships, UFO_BULLET_OWNER]),
+            uniform_pos(),
+            rand_unit_vec() * C.SHIP_BULLET_SPEED,
+        )
+        bullet.prev_pos = bullet.pos - bullet.vel / C.FPS
+        store.bullets.add(bullet)
+    for _ in range(n_ufos):
+        ufo = UFO(uniform_pos(), small=True)
+        ufo.pos = uniform_pos()
+        store.ufos.add(ufo)
+    store.sync()
+    return ships, store.bullets, store.asteroids, store.ufos
+
+
+def uniform_pos() -> Vec:
+    return Vec(
+        random.uniform(0, C.ARENA_WIDTH), random.uniform(0, C.ARENA_HEIGHT)
+    )
+
+
+def summarize(result: CollisionResult) -> tuple:
+    return (
+        list(result.events.records()),
+        result.score_deltas,
+        result.ship_deaths,
+        [(tuple(p), tuple(v), s) for p, v, s in result.asteroids_to_spawn],
+        [(tuple(p), k) for p, k in result.particles_to_spawn],
+    )
+
+
+def build_edge_scene(
+    seed: int, pairs: int
+) -> tuple[Scene, list[tuple[Asteroid, Ship | UFO | Bullet]]]:
+    """Plant asteroids, each touching a ship, UFO or bullet only across
+    the wrapped edges (a corner for some), and return the planted pairs.
+
+    Bullets sit still (prev_pos == pos), so their path is a point.
+    """
+    random.seed(seed)
+    store = EntityStore()
+    ships = {}
+    planted = []
+    width, height = C.ARENA_WIDTH, C.ARENA_HEIGHT
+    for i in range(pairs):
+        kind = "ship" if i < C.MAX_PLAYERS else ("ufo", "bullet")[i % 2]
+        ast = Asteroid(Vec(), Vec(), random.choice("LMS"))
+        if kind == "ship":
+            other = Ship(i + 1, Vec())
+            other.invuln.reset(0)
+            ships[other.player_id] = other
+        elif kind == "ufo":
+            other = UFO(Vec(), small=random.random() < 0.5)
+        else:
+            other = Bullet(random.randint(1, C.MAX_PLAYERS), Vec(), Vec())
+        edge = random.choice(
+            [(0, random.uniform(0, height)), (random.uniform(0, width), 0)]
+        )
+        if i % 5 == 0:
+            edge = (0, 0)
+        reach = ast.r + (0 if kind == "bullet" else other.r)
+        while True:
+            offset = rand_unit_vec() * random.uniform(0.1, 0.9) * reach / 2
+            a = Vec(edge) + offset
+            b = Vec(edge) - offset
+            for pos in (a, b):
+                pos.update(pos.x % width, pos.y % height)
+            if (a - b).length() > reach:
+                break
+        ast.pos.update(a)
+        other.pos.update(b)
+        if kind == "bullet":
+            other.prev_pos.update(b)
+        store.asteroids.add(ast)
+        if kind == "ufo":
+            store.ufos.add(other)
+        elif kind == "bullet":
+            store.bullets.add(other)
+        planted.append((ast, other))
+    store.ships.add(*ships.values())
+    store.sync()
+    return (ships, store.bullets, store.asteroids, store.ufos), planted
+
+
+def check_edges(seed: int = 0, pairs: int = 48) -> str | None:
+    """Ask every backend for the contacts planted by build_edge_scene().
+
+    Returns a description of the first planted pair a backend misses, or
+    None if every backend finds them all.
+    """
+    for backend in BACKENDS:
+        scene, planted = build_edge_scene(seed, pairs)
+        contacts = BACKENDS[backend]()
+        ships, bullets, asteroids, ufos = scene
+        for entity in (*ships.values(), *bullets, *asteroids, *ufos):
+            contacts.track(entity)
+        contacts.rebuild(*scene)
+        for ast, other in planted:
+            if isinstance(other, Bullet):
+                found = other in contacts.bullets_inside(ast)
+            else:
+                found = ast in contacts.asteroids_touching(other)
+            if not found:
+                return (
+                    f"{backend} misses {type(other).__name__} at"
+                    f" {tuple(other.pos)} touching asteroid at"
+                    f" {tuple(ast.pos)} (r={ast.r})"
+                )
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--asteroids", type=int, default=400)
+    parser.add_argument("--bullets", type=int, default=400)
+    parser.add_argument("--ufos", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    if args.check:
+        found = check_edges(args.seed)
+        if found:
+            raise SystemExit(f"mismatch: {found}")
+        print("every backend finds the contacts across the arena edges")
+        return
+    scene_args = (args.seed, args.asteroids, args.bullets, args.ufos)
+
+    reference = None
+    for backend in BACKENDS:
+        elapsed = 0.0
+        for _ in range(args.repeat):
+            mgr = CollisionManager(backend, rng=random.Random(args.seed))
+            scene = build_scene(*scene_args)
+            ships, bullets, asteroids, ufos = scene
+            for entity in (*ships.values(), *bullets, *asteroids, *ufos):
+                mgr.track(entity)
+            gc.collect()
+            gc.disable()
+            start = time.perf_counter()
+            result = mgr.resolve(*scene)
+            elapsed += time.perf_counter() - start
+            gc.enable()
+
+        summary = summarize(result)
+        if reference is None:
+            reference = summary
+        match = "same" if summary == reference else "DIFFERENT"
+        print(
+            f"{backend:>6}: {elapsed / args.repeat * 1000:8.3f} ms/resolve"
+            f"  {len(result.events):4d} events  result {match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
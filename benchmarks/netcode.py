@@ -0,0 +1,173 @@
+"""Measure delta-compressed state frames on a crowded World.
+
+Usage: python -m benchmarks.netcode [--asteroids N[,N...]] [--players N]
+                                    [--policy NAME] [--ufos-per N]
+                                    [--lags N[,N...]] [--frames N]
+                                    [--warmup N] [--seed N]
+
+Builds the benchmarks.stress world under its PROFILE for each --asteroids
+count and plays it with bots. Every tick core.delta captures the world
+and encodes a frame for one client per --lags entry; that client's ack
+for a frame reaches the encoder that many ticks later, as over a link
+with that round trip. Each client decodes its frames, and at the end its
+state is checked against the world.
+
+Per count and lag the script prints the mean frame size and the encode
+time per client, next to the size of a full frame and of a
+core.snapshot dump of the same world, and the time capture() and
+decoding take.
+"""
+
+import argparse
+import gc
+import time
+from collections import deque
+
+import numpy as np
+
+from benchmarks.stress import PROFILE, build_world
+from core import config as C
+from core import snapshot
+from core.batch import config_overrides
+from core.bots import POLICIES
+from core.delta import KINDS, DeltaDecoder, DeltaEncoder, State
+from core.world import World
+
+
+class _Client:
+    """A decoder whose acks reach the encoder lag ticks late."""
+
+    def __init__(self, lag: int) -> None:
+        self.lag = lag
+        self.decoder = DeltaDecoder()
+        self.acks: deque[int] = deque()
+        self.state: State | None = None
+        self.bytes = 0
+        self.encode = 0.0
+        self.decode = 0.0
+
+    @property
+    def ack(self) -> int | None:
+        return self.acks[0] if self.acks else None
+
+    def receive(self, frame: bytes, tick: int) -> None:
+        start = time.perf_counter()
+        self.state = self.decoder.decode(frame)
+        self.decode += time.perf_counter() - start
+        self.acks.append(tick)
+        while len(self.acks) > self.lag:
+            self.acks.popleft()
+
+
+def run(asteroids: int, args: argparse.Namespace) -> None:
+    with config_overrides(PROFILE):
+        world = build_world(
+            args.seed, asteroids, asteroids // args.ufos_per, args.players
+        )
+        policy = POLICIES[args.policy]
+        policies = {pid: policy(args.seed + pid) for pid in world.ships}
+        encoder = DeltaEncoder()
+        clients = [_Client(lag) for lag in args.lags]
+        capture = 0.0
+        dt = 1.0 / C.TICK_RATE
+
+        gc.collect()
+        for tick in range(args.warmup + args.frames):
+            commands = {pid: policies[pid](world, pid) for pid in policies}
+            world.update(dt, commands)
+            start = time.perf_counter()
+            encoder.capture(world, tick)
+            elapsed = time.perf_counter() - start
+            measured = tick >= args.warmup
+            capture += elapsed * measured
+            for client in clients:
+                start = time.perf_counter()
+                frame = encoder.encode(client.ack)
+                elapsed = time.perf_counter() - start
+                if measured:
+                    client.encode += elapsed
+                    client.bytes += len(frame)
+                client.receive(frame, tick)
+
+        start = time.perf_counter()
+        full = encoder.encode()
+        full_ms = (time.perf_counter() - start) * 1000
+        dump = snapshot.dump(world)
+        error = max(_error(world, client.state) for client in clients)
+
+    entities = sum(len(getattr(world, kind)) for kind in KINDS)
+    print(
+        f"{asteroids} asteroids, {entities} entities: full frame"
+        f" {len(full):,} B ({full_ms:.2f} ms), snapshot {len(dump):,} B,"
+        f" capture {capture / args.frames * 1000:.2f} ms,"
+        f" max error {error:.2f} px"
+    )
+    for client in clients:
+        mean = client.bytes / args.frames
+        print(
+            f"  lag {client.lag:3d}: {mean:10,.0f} B/tick"
+            f"  {mean * C.TICK_RATE * 8 / 1e6:7.2f} Mbit/s"
+            f"  ({mean / len(full):5.1%} of full)"
+            f"  encode {client.encode / args.frames * 1000:.3f} ms"
+            f"  decode {client.decode / args.frames * 1000:.3f} ms"
+        )
+
+
+def _error(world: World, state: State) -> float:
+    """Largest distance between a decoded position and the world's, over
+    the entities a frame can place."""
+    bounds = np.array((C.ARENA_WIDTH, C.ARENA_HEIGHT))
+    error = 0.0
+    for kind in KINDS:
+        table = getattr(world.store, kind)
+        actual = np.column_stack(
+            (np.frombuffer(table.x), np.frombuffer(table.y))
+        )
+        placed = np.all(
+            (actual >= -C.NET_POS_MARGIN)
+            & (actual <= bounds + C.NET_POS_MARGIN),
+            axis=1,
+        )
+        ids = np.frombuffer(table.handle, np.int64).astype(np.uint32)
+        ids, actual = ids[placed], actual[placed]
+        order = np.argsort(ids, kind="stable")
+        if not np.array_equal(state.records[kind]["id"], ids[order]):
+            raise AssertionError(f"decoded {kind} differ from the world's")
+        if not len(ids):
+            continue
+        actual = actual[order]
+        delta = state.positions(kind) - actual
+        delta = (delta + bounds / 2) % bounds - bounds / 2
+        error = max(error, float(np.hypot(*delta.T).max()))
+    return error
+
+
+def _parse_ints(text: str) -> list[int]:
+    return [int(part) for part in text.split(",")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--asteroids", type=_parse_ints, default=[1000, 4000, 16000]
+    )
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--ufos-per", type=int, default=50)
+    parser.add_argument("--lags", type=_parse_ints, default=[1, 6, 30])
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if not 1 <= args.players <= PROFILE["MAX_PLAYERS"]:
+        parser.error(
+            f"--players must be between 1 and {PROFILE['MAX_PLAYERS']}"
+        )
+    if max(args.lags) >= C.NET_HISTORY:
+        parser.error(f"--lags must be below NET_HISTORY ({C.NET_HISTORY})")
+    for asteroids in args.asteroids:
+        run(asteroids, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Find how many entities World.update() handles at 60 Hz.
+
+Usage: python -m benchmarks.stress [--arena WxH] [--players N]
+                                   [--policy NAME] [--start N] [--factor F]
+                                   [--max N] [--ufos-per N] [--frames N]
+                                   [--warmup N] [--refine N] [--hz HZ]
+                                   [--render] [--seed N]
+
+Runs under PROFILE: a wrapped arena much larger than the window, UFOs that
+arrive in groups, and bot players that never run out of lives. Each level
+is a fresh seeded World with N large asteroids scattered over the arena,
+N / --ufos-per UFOs and --players bots spread out among them. Only
+World.update() is timed, not the bots. The asteroid count grows by
+--factor per level until the mean update rate drops below --hz. The script
+then bisects between the last level that kept up and the first that did
+not, --refine times, and prints the limit.
+
+Each level prints the entity counts it averaged, the update rate, and the
+share of the two heaviest phases. With --render, the script also times
+Renderer.clear() and draw_world() onto an offscreen window-sized surface,
+with the camera following the first player.
+"""
+
+import argparse
+import gc
+import math
+import time
+from dataclasses import dataclass, field
+from random import Random
+
+import pygame as pg
+
+from client.renderer import Renderer
+from core import config as C
+from core.batch import config_overrides
+from core.bots import POLICIES
+from core.profiling import PhaseTimer
+from core.utils import Vec
+from core.world import World
+
+# core.config values every level runs with.
+PROFILE: dict[str, object] = {
+    "ARENA_WIDTH": 6400,
+    "ARENA_HEIGHT": 4800,
+    "MAX_PLAYERS": 64,
+    "START_LIVES": 10**9,
+    "UFO_SPAWN_EVERY": 2.0,
+    "UFO_SPAWN_COUNT": 4,
+    "BULLET_POOL_SIZE": 4096,
+    "PARTICLE_CAPACITY": 65536,
+    "EVENT_CAPACITY": 4096,
+    "CLEARANCE_CELL": 80,
+}
+
+
+@dataclass
+class LevelStats:
+    """One level's mean entity counts and timings."""
+
+    asteroids: int
+    players: int
+    frames: int = 0
+    update: float = 0.0
+    draw: float | None = None
+    counts: dict[str, float] = field(default_factory=dict)
+    phases: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def hz(self) -> float:
+        return 1.0 / self.update if self.update > 0.0 else math.inf
+
+
+def build_world(seed: int, asteroids: int, ufos: int, players: int) -> World:
+    """A World crowded with asteroids, UFOs and spread-out players."""
+    world = World(seed)
+    rng = world.rng
+    for pid in range(C.LOCAL_PLAYER_ID, C.LOCAL_PLAYER_ID + players):
+        if world.get_ship(pid) is None:
+            world.spawn_player(pid)
+        world.ships[pid].pos.update(_uniform_pos(rng))
+    for _ in range(asteroids):
+        ang = rng.uniform(0, math.tau)
+        speed = rng.uniform(C.AST_VEL_MIN, C.AST_VEL_MAX)
+        vel = Vec(math.cos(ang), math.sin(ang)) * speed
+        world.spawn_asteroid(_uniform_pos(rng), vel, "L")
+    for _ in range(ufos):
+        world.spawn_ufo()
+    # Asteroids are already out, so the wave timer stays idle.
+    world.wave = 1
+    return world
+
+
+def run_level(
+    asteroids: int,
+    args: argparse.Namespace,
+    renderer: Renderer | None = None,
+) -> LevelStats:
+    """Play one level under PROFILE and measure it."""
+    with config_overrides(PROFILE):
+        world = build_world(
+            args.seed, asteroids, asteroids // args.ufos_per, args.players
+        )
+        policy = POLICIES[args.policy]
+        policies = {pid: policy(args.seed + pid) for pid in world.ships}
+        stats = LevelStats(asteroids, args.players)
+        counts = {"asteroids": 0, "bullets": 0, "ufos": 0}
+        dt = 1.0 / C.FPS
+
+        gc.collect()
+        for frame in range(args.warmup + args.frames):
+            if frame == args.warmup:
+                world.timer = PhaseTimer()
+            commands = {pid: policies[pid](world, pid) for pid in policies}
+            start = time.perf_counter()
+            world.update(dt, commands)
+            elapsed = time.perf_counter() - start
+            if frame < args.warmup:
+                continue
+            stats.update += elapsed
+            for name in counts:
+                counts[name] += len(getattr(world, name))
+            if renderer is not None:
+                start = time.perf_counter()
+                renderer.camera.follow(world.ships[C.LOCAL_PLAYER_ID].pos)
+                renderer.clear()
+                renderer.draw_world(world)
+                stats.draw = (stats.draw or 0.0) + time.perf_counter() - start
+
+    stats.frames = args.frames
+    stats.update /= args.frames
+    if stats.draw is not None:
+        stats.draw /= args.frames
+    stats.counts = {name: n / args.frames for name, n in counts.items()}
+    stats.phases = world.timer.per_frame()
+    return stats
+
+
+def describe(stats: LevelStats) -> str:
+    counts = "  ".join(f"{n:8.0f} {k}" for k, n in stats.counts.items())
+    total = sum(stats.phases.values()) or 1.0
+    top = sorted(stats.phases.items(), key=lambda kv: kv[1], reverse=True)
+    shares = "  ".join(f"{k} {t / total:.0%}" for k, t in top[:2])
+    line = (
+        f"{stats.asteroids:7d}: {counts}"
+        f"  {stats.update * 1000:8.2f} ms  {stats.hz:7.1f} Hz  ({shares})"
+    )
+    if stats.draw is not None:
+        line += f"  draw {stats.draw * 1000:.2f} ms"
+    return line
+
+
+def _uniform_pos(rng: Random) -> Vec:
+    return Vec(
+        rng.uniform(0, C.ARENA_WIDTH), rng.uniform(0, C.ARENA_HEIGHT)
+    )
+
+
+def _parse_size(text: str) -> tuple[int, int]:
+    width, sep, height = text.partition("x")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected WxH, got {text!r}")
+    return int(width), int(height)
+
+
+def _make_renderer() -> Renderer:
+    pg.font.init()
+    fonts = {
+        "font": pg.font.Font(None, C.FONT_SIZE_SMALL),
+        "big": pg.font.Font(None, C.FONT_SIZE_LARGE),
+    }
+    return Renderer(pg.Surface((C.WIDTH, C.HEIGHT)), C, fonts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--arena", type=_parse_size, default=None)
+    parser.add_argument("--players", type=int, default=16)
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--start", type=int, default=250)
+    parser.add_argument("--factor", type=float, default=2.0)
+    parser.add_argument("--max", type=int, default=64000)
+    parser.add_argument("--ufos-per", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--refine", type=int, default=3)
+    parser.add_argument("--hz", type=float, default=float(C.FPS))
+    parser.add_argument("--render", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if args.factor <= 1.0:
+        parser.error("--factor must be greater than 1")
+    if not 1 <= args.players <= PROFILE["MAX_PLAYERS"]:
+        parser.error(
+            f"--players must be between 1 and {PROFILE['MAX_PLAYERS']}"
+        )
+    if args.arena is not None:
+        PROFILE["ARENA_WIDTH"], PROFILE["ARENA_HEIGHT"] = args.arena
+
+    renderer = _make_renderer() if args.render else None
+    print(
+        f"arena {PROFILE['ARENA_WIDTH']}x{PROFILE['ARENA_HEIGHT']}"
+        f"  players {args.players} ({args.policy})  target {args.hz:g} Hz"
+    )
+
+    passed, failed = 0, None
+    asteroids = args.start
+    while asteroids <= args.max:
+        stats = run_level(asteroids, args, renderer)
+        print(describe(stats))
+        if stats.hz < args.hz:
+            failed = asteroids
+            break
+        passed = asteroids
+        asteroids = max(asteroids + 1, round(asteroids * args.factor))
+
+    if failed is None:
+        print(f"kept {args.hz:g} Hz up to {passed} asteroids (--max)")
+        return
+    for _ in range(args.refine):
+        mid = (passed + failed) // 2
+        if mid in (passed, failed):
+            break
+        stats = run_level(mid, args, renderer)
+        print(describe(stats))
+        if stats.hz < args.hz:
+            failed = mid
+        else:
+            passed = mid
+    print(
+        f"World.update() drops below {args.hz:g} Hz between"
+        f" {passed} and {failed} asteroids"
+    )
+
+
+if __name__ == "__main__":
+    main()
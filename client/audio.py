@@ -1,7 +1,7 @@
 """Game audio (client-side).
 
 - World does not play sounds (low coupling).
-- World generates events (strings) and Game decides what to play.
+- World generates typed events (core.events) and Game decides what to play.
 """
 
 from dataclasses import dataclass
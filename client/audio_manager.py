@@ -1,8 +1,12 @@
 """Audio playback manager for the game client."""
 
+from collections.abc import Iterable
+
 import pygame as pg
 
 from client.audio import SoundPack
+from core.entities import UFO
+from core.events import EventKind, EventStream
 
 
 class AudioManager:
@@ -14,17 +18,26 @@ class AudioManager:
         self._sfx_ch = pg.mixer.Channel(2)
         self._ufo_ch = pg.mixer.Channel(3)
         self._ufo_siren_kind: str | None = None
+        self._event_sounds = {
+            EventKind.PLAYER_SHOOT: sounds.player_shoot,
+            EventKind.UFO_SHOOT: sounds.ufo_shoot,
+            EventKind.ASTEROID_EXPLOSION: sounds.asteroid_explosion,
+            EventKind.SHIP_EXPLOSION: sounds.ship_explosion,
+        }
 
-    def play_events(self, events: list[str]) -> None:
-        for ev in events:
-            if ev == "player_shoot":
-                self._sfx_ch.play(self.sounds.player_shoot)
-            elif ev == "ufo_shoot":
-                self._sfx_ch.play(self.sounds.ufo_shoot)
-            elif ev == "asteroid_explosion":
-                self._sfx_ch.play(self.sounds.asteroid_explosion)
-            elif ev == "ship_explosion":
-                self._sfx_ch.play(self.sounds.ship_explosion)
+    def play_events(
+        self, events: EventStream | Iterable[EventKind | str]
+    ) -> None:
+        """Play the sound of each event; events without one are skipped."""
+        if isinstance(events, EventStream):
+            kinds = events.kinds()
+        else:
+            kinds = map(EventKind.parse, events)
+        sounds = self._event_sounds
+        for kind in kinds:
+            snd = sounds.get(kind)
+            if snd is not None:
+                self._sfx_ch.play(snd)
 
     def update_thrust(self, active: bool) -> None:
         if active:
@@ -34,7 +47,7 @@ class AudioManager:
             if self._thrust_ch.get_busy():
                 self._thrust_ch.stop()
 
-    def update_ufo_siren(self, ufos: list) -> None:
+    def update_ufo_siren(self, ufos: Iterable[UFO]) -> None:
         kind = self._choose_ufo_siren(ufos)
         if kind is None:
             if self._ufo_ch.get_busy():
@@ -61,8 +74,10 @@ class AudioManager:
             self._ufo_ch.stop()
         self._ufo_siren_kind = None
 
-    def _choose_ufo_siren(self, ufos: list) -> str | None:
-        if not ufos:
-            return None
-        has_small = any(u.small for u in ufos)
-        return "small" if has_small else "big"
+    def _choose_ufo_siren(self, ufos: Iterable[UFO]) -> str | None:
+        kind = None
+        for ufo in ufos:
+            if ufo.small:
+                return "small"
+            kind = "big"
+        return kind
@@ -0,0 +1,104 @@
+"""Window onto the wrapped arena.
+
+The arena (ARENA_WIDTH x ARENA_HEIGHT) can be larger than the window. The
+camera picks which part of it the window shows, and where on screen each
+visible point lands. Near a wrapped edge a point of a wrapping entity
+(asteroid, ship) can land more than once; the extra copies are the ghosts
+that show it crossing the edge on both sides. Bullets, UFOs and particles
+do not wrap, so they land once, at their position, or not at all.
+"""
+
+import math
+
+import numpy as np
+
+from core import config as C
+from core.utils import Vec
+
+
+class Camera:
+    """View of width x height px whose top-left corner sits at (x, y) in
+    arena coordinates, wrapping around the arena's edges.
+
+    Along an axis where the arena is no larger than the view, the camera
+    stays put with the arena centred; otherwise follow() centres it on a
+    point.
+    """
+
+    def __init__(
+        self, width: float | None = None, height: float | None = None
+    ) -> None:
+        self.width = float(width or C.WIDTH)
+        self.height = float(height or C.HEIGHT)
+        self.x = min(C.ARENA_WIDTH - self.width, 0.0) / 2
+        self.y = min(C.ARENA_HEIGHT - self.height, 0.0) / 2
+
+    def follow(self, pos: Vec) -> None:
+        """Centre the view on pos, along the axes it can scroll on."""
+        if self.width < C.ARENA_WIDTH:
+            self.x = (pos.x - self.width / 2) % C.ARENA_WIDTH
+        if self.height < C.ARENA_HEIGHT:
+            self.y = (pos.y - self.height / 2) % C.ARENA_HEIGHT
+
+    def place(
+        self, x: np.ndarray, y: np.ndarray, margin: float, wrap: bool = True
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Rows of the points (x, y) that come within margin of the view,
+        with the offset that takes each to the screen.
+
+        With wrap, a point near a wrapped edge is listed once per copy of
+        it in view, so its rows can repeat; adding the offset to any
+        position of the entity (its outline, or a blended pose) puts it on
+        screen. Without, each point is placed once, where it is, so one
+        outside the arena shows beside the arena's edge and never on the
+        opposite side.
+        """
+        if not wrap:
+            return self._place_once(x, y, margin)
+        arena_w, arena_h = C.ARENA_WIDTH, C.ARENA_HEIGHT
+        # Screen coordinate of each point's first copy, in [-margin, ...).
+        sx = (x - self.x + margin) % arena_w - margin
+        sy = (y - self.y + margin) % arena_h - margin
+        limit_x = self.width + margin
+        limit_y = self.height + margin
+        rows, off_x, off_y = [], [], []
+        for kx in range(_copies(self.width, arena_w, margin)):
+            cx = sx + kx * arena_w
+            in_x = cx < limit_x
+            for ky in range(_copies(self.height, arena_h, margin)):
+                cy = sy + ky * arena_h
+                found = np.flatnonzero(in_x & (cy < limit_y))
+                rows.append(found)
+                off_x.append(cx[found] - x[found])
+                off_y.append(cy[found] - y[found])
+        if len(rows) == 1:
+            return rows[0], off_x[0], off_y[0]
+        return (
+            np.concatenate(rows),
+            np.concatenate(off_x),
+            np.concatenate(off_y),
+        )
+
+    def _place_once(
+        self, x: np.ndarray, y: np.ndarray, margin: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        sx = x - self.x
+        sy = y - self.y
+        # A scrolling view past the arena's far edge shows its near side,
+        # which sits one arena further along on screen.
+        if self.width < C.ARENA_WIDTH:
+            sx = np.where(sx < -margin, sx + C.ARENA_WIDTH, sx)
+        if self.height < C.ARENA_HEIGHT:
+            sy = np.where(sy < -margin, sy + C.ARENA_HEIGHT, sy)
+        rows = np.flatnonzero(
+            (sx >= -margin)
+            & (sx < self.width + margin)
+            & (sy >= -margin)
+            & (sy < self.height + margin)
+        )
+        return rows, sx[rows] - x[rows], sy[rows] - y[rows]
+
+
+def _copies(view: float, arena: float, margin: float) -> int:
+    """Most copies of one point a view plus margin can hold along an axis."""
+    return max(1, math.ceil((view + 2 * margin) / arena))
@@ -1,27 +1,34 @@
 """Game loop and scenes (menu, play, game over).
 
 - InputMapper converts keyboard input into PlayerCommand.
-- World updates the simulation and generates events (strings) for Game.
+- World updates the simulation and generates typed events for Game.
 - Game handles audio and screen transitions (low coupling).
 """
 
+import os
 import sys
+from contextlib import ExitStack
 
 import pygame as pg
 
 from client.audio import load_sounds
 from client.audio_manager import AudioManager
 from client.controls import InputMapper
+from client.interpolation import Interpolator
 from client.renderer import Renderer
 from core import config as C
+from core.replay import ReplayWriter
 from core.scene import SceneState
 from core.world import World
 
 
 class Game:
-    """Orchestrates input -> update -> draw."""
+    """Orchestrates input -> update -> draw.
 
-    def __init__(self) -> None:
+    With record, run() also writes the session to that core.replay file.
+    """
+
+    def __init__(self, record: str | os.PathLike[str] | None = None) -> None:
         pg.mixer.pre_init(
             C.AUDIO_FREQUENCY,
             C.AUDIO_SIZE,
@@ -48,19 +55,37 @@ class Game:
         self.scene = SceneState.MENU
         self.world = World()
         self.input_mapper = InputMapper()
+        self.interpolator = Interpolator()
+        self.record = record
+        self.recorder: ReplayWriter | None = None
 
         self.sounds = load_sounds(C.SOUND_PATH)
         self.audio = AudioManager(self.sounds)
 
     def run(self) -> None:
-        while self.running:
-            dt = self.clock.tick(C.FPS) / 1000.0
-            self._handle_events()
-            self._update(dt)
-            self._draw()
+        with ExitStack() as stack:
+            if self.record is not None:
+                file = stack.enter_context(open(self.record, "wb"))
+                self.recorder = ReplayWriter(file, self.world)
+            self._loop()
 
         pg.quit()
 
+    def _loop(self) -> None:
+        """Fixed-step loop: the world advances in ticks of 1 / TICK_RATE s
+        whatever the frame rate, and each frame is drawn between the last
+        two ticks."""
+        tick = 1.0 / C.TICK_RATE
+        lag = 0.0
+        while self.running:
+            frame = self.clock.tick(C.FPS) / 1000.0
+            self._handle_events()
+            lag += min(frame, C.MAX_FRAME_TIME)
+            while lag >= tick:
+                self._update(tick)
+                lag -= tick
+            self._draw(lag / tick)
+
     def _handle_events(self) -> None:
         for event in pg.event.get():
             if event.type == pg.QUIT:
@@ -77,6 +102,9 @@ class Game:
             if self.scene == SceneState.GAME_OVER:
                 if event.type == pg.KEYDOWN:
                     self.world.reset()
+                    self.interpolator.capture(self.world)
+                    if self.recorder is not None:
+                        self.recorder.resync()
                     self.scene = SceneState.PLAY
                 continue
 
@@ -91,6 +119,9 @@ class Game:
         cmd = self.input_mapper.build_command(keys)
         commands = {C.LOCAL_PLAYER_ID: cmd}
 
+        if self.recorder is not None:
+            self.recorder.record(self.world, dt, commands)
+        self.interpolator.capture(self.world)
         self.world.update(dt, commands)
 
         if self.world.game_over:
@@ -99,10 +130,10 @@ class Game:
             return
 
         self.audio.update_thrust(cmd.thrust)
-        self.audio.update_ufo_siren(list(self.world.ufos))
+        self.audio.update_ufo_siren(self.world.ufos)
         self.audio.play_events(self.world.events)
 
-    def _draw(self) -> None:
+    def _draw(self, alpha: float = 0.0) -> None:
         self.renderer.clear()
 
         if self.scene == SceneState.MENU:
@@ -115,7 +146,11 @@ class Game:
             pg.display.flip()
             return
 
-        self.renderer.draw_world(self.world)
+        with self.interpolator.blend(self.world, alpha):
+            ship = self.world.get_ship(C.LOCAL_PLAYER_ID)
+            if ship is not None:
+                self.renderer.camera.follow(ship.pos)
+            self.renderer.draw_world(self.world)
         self.renderer.draw_hud(
             self.world.scores.get(C.LOCAL_PLAYER_ID, 0),
             self.world.lives.get(C.LOCAL_PLAYER_ID, 0),
@@ -0,0 +1,84 @@
+"""Render interpolation for the fixed-step loop.
+
+The simulation advances in whole ticks, but frames land between them.
+Interpolator remembers every entity's pose before the latest tick, and
+blend() shows each entity part way from that pose to its current one, so
+motion stays smooth whatever the tick rate and display rate.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from core import config as C
+from core.store import EntityTable
+from core.world import World
+
+Pose = tuple[float, float, float]
+
+
+class Interpolator:
+    """Poses of the world's entities as of the start of the last tick."""
+
+    def __init__(self) -> None:
+        # One {handle: (x, y, angle)} per table, in _tables() order.
+        # Handles are not reused by a new entity, so a pooled bullet never
+        # inherits an old pose.
+        self._poses: list[dict[int, Pose]] = []
+
+    def capture(self, world: World) -> None:
+        """Remember the current poses; call it just before each tick, and
+        after World.reset()."""
+        self._poses = [
+            {
+                entity.handle: (
+                    entity.pos.x,
+                    entity.pos.y,
+                    getattr(entity, "angle", 0.0),
+                )
+                for entity in table.entities
+            }
+            for table in _tables(world)
+        ]
+
+    @contextmanager
+    def blend(self, world: World, alpha: float) -> Iterator[None]:
+        """Within the block, entities sit alpha of the way from their last
+        pose to their current one (0 <= alpha < 1); the block is for
+        drawing only, and every pose is put back when it exits.
+
+        Moves across a wrapped edge take the short way round. Jumps of more
+        than a quarter of the arena (respawn, hyperspace) are not blended.
+        """
+        width, height = C.ARENA_WIDTH, C.ARENA_HEIGHT
+        snap_sq = (min(width, height) / 4) ** 2
+        back = 1.0 - alpha
+        saved = []
+        for table, poses in zip(_tables(world), self._poses, strict=False):
+            for entity in table.entities:
+                pose = poses.get(entity.handle)
+                if pose is None:
+                    continue
+                pos = entity.pos
+                dx = (pos.x - pose[0] + width / 2) % width - width / 2
+                dy = (pos.y - pose[1] + height / 2) % height - height / 2
+                if dx * dx + dy * dy > snap_sq:
+                    continue
+                angle = getattr(entity, "angle", None)
+                saved.append((entity, pos.x, pos.y, angle))
+                pos.x -= dx * back
+                pos.y -= dy * back
+                if angle is not None:
+                    entity.angle = angle - (angle - pose[2]) * back
+        try:
+            yield
+        finally:
+            for entity, x, y, angle in saved:
+                entity.pos.x = x
+                entity.pos.y = y
+                if angle is not None:
+                    entity.angle = angle
+
+
+def _tables(world: World) -> tuple[EntityTable, ...]:
+    store = world.store
+    return store.asteroids, store.bullets, store.ufos, store.ships
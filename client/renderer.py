@@ -1,43 +1,81 @@
 """Client-side rendering (pygame)."""
 
+from collections.abc import Callable
+
+import numpy as np
 import pygame as pg
 
+from client.camera import Camera
 from core import config as C
-from core.entities import UFO, Asteroid, Bullet, Particle, Ship
+from core.entities import UFO, Asteroid, Bullet, Ship
+from core.particles import ParticleSystem
 from core.scene import SceneState
 
+# Pixel offsets of a 2x2 particle dot.
+_DOT_DX = np.array([0, 1, 0, 1])
+_DOT_DY = np.array([0, 0, 1, 1])
+
+# How far an entity's drawing reaches past its position (a large
+# asteroid's jittered outline, a shield ring), plus a tick of motion for
+# interpolated poses; entities farther than this outside the view are
+# skipped.
+_CULL_MARGIN = 64
+
 
 class Renderer:
-    """Draws scenes and entities without coupling game rules to Game."""
+    """Draws scenes and entities without coupling game rules to Game.
+
+    The world is drawn through self.camera, which defaults to a view the
+    size of the screen; point it with camera.follow().
+    """
 
     def __init__(
         self,
         screen: pg.Surface,
         config: object = C,
         fonts: dict[str, pg.font.Font] | None = None,
+        camera: Camera | None = None,
     ) -> None:
         self.screen = screen
         self.config = config
+        self.camera = camera or Camera(*screen.get_size())
         safe_fonts = fonts or {}
         self.font = safe_fonts["font"]
         self.big = safe_fonts["big"]
 
-        self._draw_dispatch: dict[type, callable] = {
-            Bullet: self._draw_bullet,
-            Asteroid: self._draw_asteroid,
-            Ship: self._draw_ship,
-            UFO: self._draw_ufo,
-            Particle: self._draw_particle,
-        }
-
     def clear(self) -> None:
         self.screen.fill(self.config.BLACK)
 
     def draw_world(self, world: object) -> None:
-        for sprite in world.all_sprites:
-            drawer = self._draw_dispatch.get(type(sprite))
-            if drawer is not None:
-                drawer(sprite)
+        """Draw the part of the world in the camera's view.
+
+        Tables are culled on their x and y columns, so only entities in
+        view are visited. Ships go by their positions instead, because a
+        respawn moves a ship after the columns are synced. Only asteroids
+        and ships wrap and get ghost copies at the arena's edges.
+        """
+        self._draw_particles(world.particles)
+        store = world.store
+        passes = (
+            (store.asteroids, self._draw_asteroid, True),
+            (store.bullets, self._draw_bullet, False),
+            (store.ufos, self._draw_ufo, False),
+        )
+        for table, drawer, wrap in passes:
+            self._draw_table(
+                table.entities,
+                np.frombuffer(table.x),
+                np.frombuffer(table.y),
+                drawer,
+                wrap,
+            )
+        ships = store.ships.entities
+        self._draw_table(
+            ships,
+            np.array([ship.pos.x for ship in ships]),
+            np.array([ship.pos.y for ship in ships]),
+            self._draw_ship,
+        )
 
     def draw_hud(
         self,
@@ -62,6 +100,21 @@ class Renderer:
             x = (self.config.WIDTH - notice.get_width()) // 2
             self.screen.blit(notice, (x, 60))
 
+    def draw_replay_status(
+        self,
+        tick: int,
+        ticks: int,
+        paused: bool = False,
+        fast: bool = False,
+    ) -> None:
+        text = f"REPLAY  {tick}/{ticks}"
+        if paused:
+            text += "   PAUSED"
+        elif fast:
+            text += "   >>"
+        y = self.config.HEIGHT - self.font.get_height() - 10
+        self._draw_text(self.font, text, 10, y)
+
     def draw_menu(self) -> None:
         self._draw_centered(self.big, "ASTEROIDS", 90)
 
@@ -109,8 +162,24 @@ class Renderer:
         x = (self.config.WIDTH - label.get_width()) // 2
         self.screen.blit(label, (x, y))
 
-    def _draw_bullet(self, bullet: Bullet) -> None:
-        center = (int(bullet.pos.x), int(bullet.pos.y))
+    def _draw_table(
+        self,
+        entities: list,
+        x: np.ndarray,
+        y: np.ndarray,
+        drawer: Callable[[object, float, float], None],
+        wrap: bool = True,
+    ) -> None:
+        """Call drawer(entity, dx, dy) for every copy of an entity at
+        (x, y) in view; (dx, dy) takes it to the screen."""
+        rows, off_x, off_y = self.camera.place(x, y, _CULL_MARGIN, wrap)
+        for row, dx, dy in zip(
+            rows.tolist(), off_x.tolist(), off_y.tolist(), strict=True
+        ):
+            drawer(entities[row], dx, dy)
+
+    def _draw_bullet(self, bullet: Bullet, dx: float, dy: float) -> None:
+        center = (int(bullet.pos.x + dx), int(bullet.pos.y + dy))
         pg.draw.circle(
             self.screen,
             self.config.WHITE,
@@ -119,29 +188,54 @@ class Renderer:
             width=1,
         )
 
-    def _draw_particle(self, particle: Particle) -> None:
-        rect = pg.Rect(int(particle.pos.x), int(particle.pos.y), 2, 2)
-        self.screen.fill(self.config.WHITE, rect)
+    def _draw_particles(self, particles: ParticleSystem) -> None:
+        """Plot every particle in view as a 2x2 dot in one pixel-array
+        write."""
+        if not len(particles):
+            return
+        pos = particles.positions()
+        rows, off_x, off_y = self.camera.place(
+            pos[:, 0], pos[:, 1], 2, wrap=False
+        )
+        pos = pos[rows]
+        pos[:, 0] += off_x
+        pos[:, 1] += off_y
+        pos = pos.astype(np.intp)
+        if self.screen.get_bytesize() == 3:
+            # surfarray has no 2D view of 24-bit surfaces.
+            for x, y in pos.tolist():
+                self.screen.fill(self.config.WHITE, (x, y, 2, 2))
+            return
+
+        width, height = self.screen.get_size()
+        xs = (pos[:, 0, None] + _DOT_DX).ravel()
+        ys = (pos[:, 1, None] + _DOT_DY).ravel()
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        pixels = pg.surfarray.pixels2d(self.screen)
+        pixels[xs[inside], ys[inside]] = self.screen.map_rgb(
+            self.config.WHITE
+        )
+        del pixels  # unlock the surface
 
-    def _draw_asteroid(self, asteroid: Asteroid) -> None:
+    def _draw_asteroid(self, asteroid: Asteroid, dx: float, dy: float) -> None:
+        x = asteroid.pos.x + dx
+        y = asteroid.pos.y + dy
         points = []
         for point in asteroid.poly:
-            px = int(asteroid.pos.x + point.x)
-            py = int(asteroid.pos.y + point.y)
-            points.append((px, py))
+            points.append((int(x + point.x), int(y + point.y)))
         pg.draw.polygon(self.screen, self.config.WHITE, points, width=1)
 
-    def _draw_ship(self, ship: Ship) -> None:
+    def _draw_ship(self, ship: Ship, dx: float, dy: float) -> None:
         p1, p2, p3 = ship.ship_points()
         points = [
-            (int(p1.x), int(p1.y)),
-            (int(p2.x), int(p2.y)),
-            (int(p3.x), int(p3.y)),
+            (int(p1.x + dx), int(p1.y + dy)),
+            (int(p2.x + dx), int(p2.y + dy)),
+            (int(p3.x + dx), int(p3.y + dy)),
         ]
         pg.draw.polygon(self.screen, self.config.WHITE, points, width=1)
 
+        center = (int(ship.pos.x + dx), int(ship.pos.y + dy))
         if ship.invuln.active and int(ship.invuln.remaining * 10) % 2 == 0:
-            center = (int(ship.pos.x), int(ship.pos.y))
             pg.draw.circle(
                 self.screen,
                 self.config.WHITE,
@@ -151,7 +245,6 @@ class Renderer:
             )
 
         if ship.shield.active:
-            center = (int(ship.pos.x), int(ship.pos.y))
             pg.draw.circle(
                 self.screen,
                 self.config.WHITE,
@@ -160,14 +253,16 @@ class Renderer:
                 width=2,
             )
 
-    def _draw_ufo(self, ufo: UFO) -> None:
+    def _draw_ufo(self, ufo: UFO, dx: float, dy: float) -> None:
         width = ufo.r * 2
         height = ufo.r
+        x = ufo.pos.x + dx
+        y = ufo.pos.y + dy
 
         body = pg.Rect(0, 0, width, height)
-        body.center = (int(ufo.pos.x), int(ufo.pos.y))
+        body.center = (int(x), int(y))
         pg.draw.ellipse(self.screen, self.config.WHITE, body, width=1)
 
         cup = pg.Rect(0, 0, int(width * 0.5), int(height * 0.7))
-        cup.center = (int(ufo.pos.x), int(ufo.pos.y - height * 0.3))
+        cup.center = (int(x), int(y - height * 0.3))
         pg.draw.ellipse(self.screen, self.config.WHITE, cup, width=1)
@@ -0,0 +1,124 @@
+"""Replay viewer: watch a core.replay file in a window.
+
+Usage: python -m client.replay_viewer FILE [--seek TICK] [--speed X]
+
+Plays the log back through World.update() at its recorded pace (times
+--speed) and draws it with the game's Renderer. Keys: SPACE pauses,
+LEFT / RIGHT seek five seconds back / forward (via the nearest keyframe),
+F toggles fast-forward, Q or ESC quits. For playback without a display,
+at full speed, use python -m core.headless --replay FILE.
+"""
+
+import argparse
+import time
+
+import pygame as pg
+
+from client.renderer import Renderer
+from core import config as C
+from core.replay import Replay, ReplayPlayer, read
+from core.scene import SceneState
+
+SEEK_SECONDS = 5
+
+
+class ReplayViewer:
+    """Orchestrates keys -> replay playback -> draw."""
+
+    def __init__(self, replay: Replay, speed: float = 1.0) -> None:
+        pg.init()
+        self.screen = pg.display.set_mode((C.WIDTH, C.HEIGHT))
+        pg.display.set_caption("Asteroids - replay")
+        self.clock = pg.time.Clock()
+        self.running = True
+        self.paused = False
+        self.fast = False
+        self.speed = speed
+
+        font = pg.font.SysFont(C.FONT_NAME, C.FONT_SIZE_SMALL)
+        big = pg.font.SysFont(C.FONT_NAME, C.FONT_SIZE_LARGE)
+        self.renderer = Renderer(
+            self.screen, config=C, fonts={"font": font, "big": big}
+        )
+        self.player = ReplayPlayer(replay)
+        # Recorded time not yet played, in seconds.
+        self._owed = 0.0
+
+    def run(self) -> None:
+        while self.running:
+            elapsed = self.clock.tick(C.FPS) / 1000.0
+            self._handle_events()
+            if not self.paused:
+                self._advance(elapsed)
+            self._draw()
+        pg.quit()
+
+    def _handle_events(self) -> None:
+        for event in pg.event.get():
+            if event.type == pg.QUIT:
+                self.running = False
+            if event.type != pg.KEYDOWN:
+                continue
+            if event.key in (pg.K_ESCAPE, pg.K_q):
+                self.running = False
+            elif event.key == pg.K_SPACE:
+                self.paused = not self.paused
+            elif event.key == pg.K_f:
+                self.fast = not self.fast
+            elif event.key in (pg.K_LEFT, pg.K_RIGHT):
+                step = SEEK_SECONDS * C.FPS
+                if event.key == pg.K_LEFT:
+                    step = -step
+                self.player.seek(self.player.tick + step)
+                self._owed = 0.0
+
+    def _advance(self, elapsed: float) -> None:
+        player = self.player
+        if self.fast:
+            # As many ticks as fit in one frame of wall time.
+            deadline = time.perf_counter() + 1.0 / C.FPS
+            while time.perf_counter() < deadline and player.step():
+                pass
+            return
+        dts = player.replay.dts
+        self._owed += elapsed * self.speed
+        while not player.done and self._owed >= dts[player.tick]:
+            self._owed -= dts[player.tick]
+            player.step()
+        if player.done:
+            self._owed = 0.0
+
+    def _draw(self) -> None:
+        world = self.player.world
+        self.renderer.clear()
+        ship = world.get_ship(C.LOCAL_PLAYER_ID)
+        if ship is not None:
+            self.renderer.camera.follow(ship.pos)
+        self.renderer.draw_world(world)
+        self.renderer.draw_hud(
+            world.scores.get(C.LOCAL_PLAYER_ID, 0),
+            world.lives.get(C.LOCAL_PLAYER_ID, 0),
+            world.wave,
+            SceneState.PLAY,
+            world.extra_life_notice.remaining,
+        )
+        self.renderer.draw_replay_status(
+            self.player.tick, len(self.player), self.paused, self.fast
+        )
+        pg.display.flip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file")
+    parser.add_argument("--seek", type=int, default=0, metavar="TICK")
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    viewer = ReplayViewer(read(args.file), args.speed)
+    viewer.player.seek(args.seek)
+    viewer.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Batch simulation across worker processes, for balance sweeps.
+
+Usage: python -m core.batch [--runs N] [--seed N] [--workers N]
+                            [--policy NAME] [--frames N] [--dt 1/60]
+                            [--set NAME=VALUE ...] [--sweep NAME=V1,V2,...]
+
+Each run plays one seeded game with core.headless until game over (or
+--frames ticks), with some core.config values overridden, and reports a
+RunResult. --set applies to every run; --sweep repeats the batch once per
+value. Results print as they finish, followed by the mean per override set.
+
+From Python, run_batch() takes RunSpecs and yields RunResults as the
+workers finish them.
+"""
+
+import argparse
+import ast
+import os
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from core import config as C
+from core.bots import POLICIES, PolicyFactory
+from core.headless import parse_dt, run
+
+Overrides = Mapping[str, object]
+
+
+@dataclass(frozen=True)
+class RunSpec:
+    """One game to simulate.
+
+    overrides replaces core.config values for the run. Only values read
+    while the game runs are affected; defaults baked into signatures and
+    module-level tables at import time are not. policy is a name from
+    core.bots.POLICIES or a picklable policy factory.
+    """
+
+    seed: int
+    overrides: Overrides = field(default_factory=dict)
+    policy: str | PolicyFactory = "aim"
+    frames: int = C.FPS * 60 * 30
+    dt: float = 1.0 / C.FPS
+    players: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class RunResult:
+    """Outcome of one RunSpec, small enough to stream back cheaply."""
+
+    seed: int
+    overrides: tuple[tuple[str, object], ...]
+    score: int
+    waves: int
+    deaths: int
+    ticks: int
+    game_over: bool
+    wall: float
+
+
+@contextmanager
+def config_overrides(overrides: Overrides) -> Iterator[None]:
+    """Temporarily replace core.config values."""
+    unknown = [name for name in overrides if not hasattr(C, name)]
+    if unknown:
+        raise ValueError(f"unknown config values: {', '.join(unknown)}")
+    saved = {name: getattr(C, name) for name in overrides}
+    try:
+        for name, value in overrides.items():
+            setattr(C, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(C, name, value)
+
+
+def run_one(spec: RunSpec) -> RunResult:
+    """Play spec's game in this process."""
+    with config_overrides(spec.overrides):
+        stats = run(
+            spec.frames,
+            dt=spec.dt,
+            policy=spec.policy,
+            players=spec.players,
+            seed=spec.seed,
+            until_game_over=True,
+        )
+    return RunResult(
+        seed=spec.seed,
+        overrides=tuple(sorted(spec.overrides.items())),
+        score=stats.score,
+        waves=stats.waves,
+        deaths=stats.deaths,
+        ticks=stats.frames,
+        game_over=stats.game_overs > 0,
+        wall=stats.wall,
+    )
+
+
+def run_batch(
+    specs: Iterable[RunSpec],
+    workers: int | None = None,
+) -> Iterator[RunResult]:
+    """Run every spec on a process pool, yielding results as they finish.
+
+    Runs are independent and each World is seeded, so a result depends
+    only on its spec, not on the worker or the order. workers defaults to
+    the CPU count; workers=1 runs in this process, without a pool.
+    """
+    if workers == 1:
+        for spec in specs:
+            yield run_one(spec)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_one, spec) for spec in specs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sweep_specs(
+    seeds: Iterable[int],
+    sweeps: Mapping[str, Iterable[object]] | None = None,
+    base: Overrides | None = None,
+    **spec_args: object,
+) -> list[RunSpec]:
+    """One RunSpec per seed and per combination of swept values."""
+    combos: list[dict[str, object]] = [dict(base or {})]
+    for name, values in (sweeps or {}).items():
+        combos = [
+            {**combo, name: value} for combo in combos for value in values
+        ]
+    seeds = list(seeds)
+    return [
+        RunSpec(seed=seed, overrides=combo, **spec_args)
+        for combo in combos
+        for seed in seeds
+    ]
+
+
+def summarize(results: Iterable[RunResult]) -> list[str]:
+    """Mean score, waves, deaths and ticks per override set."""
+    groups: dict[tuple, list[RunResult]] = {}
+    for result in results:
+        groups.setdefault(result.overrides, []).append(result)
+    lines = []
+    for overrides, group in groups.items():
+        n = len(group)
+        label = " ".join(f"{k}={v!r}" for k, v in overrides) or "defaults"
+        lines.append(
+            f"{label}: {n} runs"
+            f"  score {sum(r.score for r in group) / n:.1f}"
+            f"  waves {sum(r.waves for r in group) / n:.2f}"
+            f"  deaths {sum(r.deaths for r in group) / n:.2f}"
+            f"  ticks {sum(r.ticks for r in group) / n:.0f}"
+        )
+    return lines
+
+
+def _parse_value(text: str) -> object:
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _parse_assignment(text: str) -> tuple[str, str]:
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+    return name, value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--policy", choices=POLICIES, default="aim")
+    parser.add_argument("--frames", type=int, default=C.FPS * 60 * 30)
+    parser.add_argument("--dt", type=parse_dt, default=f"1/{C.FPS}")
+    parser.add_argument(
+        "--set", type=_parse_assignment, action="append", default=[]
+    )
+    parser.add_argument(
+        "--sweep", type=_parse_assignment, action="append", default=[]
+    )
+    args = parser.parse_args()
+
+    base = {name: _parse_value(value) for name, value in args.set}
+    sweeps = {
+        name: [_parse_value(v) for v in values.split(",")]
+        for name, values in args.sweep
+    }
+    specs = sweep_specs(
+        range(args.seed, args.seed + args.runs),
+        sweeps,
+        base,
+        policy=args.policy,
+        frames=args.frames,
+        dt=args.dt,
+    )
+    # Fail on a bad name here rather than in every worker.
+    unknown = [name for name in {*base, *sweeps} if not hasattr(C, name)]
+    if unknown:
+        parser.error(f"unknown config values: {', '.join(unknown)}")
+
+    start = perf_counter()
+    results = []
+    for result in run_batch(specs, args.workers):
+        results.append(result)
+        label = " ".join(f"{k}={v!r}" for k, v in result.overrides)
+        print(
+            f"seed {result.seed:6d}  score {result.score:6d}"
+            f"  waves {result.waves:3d}  deaths {result.deaths:3d}"
+            f"  ticks {result.ticks:7d}  {label}",
+            flush=True,
+        )
+    wall = perf_counter() - start
+
+    print()
+    for line in summarize(results):
+        print(line)
+    ticks = sum(r.ticks for r in results)
+    print(
+        f"{len(results)} runs in {wall:.2f} s on {args.workers} workers,"
+        f" {ticks / wall:.0f} ticks/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
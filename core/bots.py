@@ -0,0 +1,92 @@
+"""Scripted players for headless runs.
+
+A policy maps (world, player_id) to that player's PlayerCommand for the
+frame. Policies only read the world, so any of them can drive any ship.
+"""
+
+import math
+import random
+from collections.abc import Callable
+
+from core.commands import PlayerCommand
+from core.entities import PlayerId
+from core.world import World
+
+Policy = Callable[[World, PlayerId], PlayerCommand]
+PolicyFactory = Callable[[int | None], Policy]
+
+IDLE = PlayerCommand()
+
+
+def idle(world: World, player_id: PlayerId) -> PlayerCommand:
+    """Never touch the controls."""
+    return IDLE
+
+
+def make_idle(seed: int | None = None) -> Policy:
+    return idle
+
+
+class RandomBot:
+    """Mash buttons at random, from its own seeded generator."""
+
+    def __init__(self, seed: int | None = None) -> None:
+        self._rng = random.Random(seed)
+
+    def __call__(self, world: World, player_id: PlayerId) -> PlayerCommand:
+        rand = self._rng.random
+        return PlayerCommand(
+            rotate_left=rand() < 0.3,
+            rotate_right=rand() < 0.1,
+            thrust=rand() < 0.3,
+            shoot=rand() < 0.5,
+            hyperspace=rand() < 0.002,
+            shield=rand() < 0.01,
+        )
+
+
+class AimBot:
+    """Turn toward the nearest asteroid and fire once roughly on target.
+
+    Raises the shield when an asteroid gets within `panic` pixels of the
+    hull. Deterministic, so runs driven by it are reproducible.
+    """
+
+    def __init__(self, seed: int | None = None, panic: float = 40.0) -> None:
+        self.panic = panic
+
+    def __call__(self, world: World, player_id: PlayerId) -> PlayerCommand:
+        ship = world.get_ship(player_id)
+        if ship is None:
+            return IDLE
+
+        nearest = None
+        best = math.inf
+        for ast in world.asteroids.entities:
+            d_sq = ship.pos.distance_squared_to(ast.pos)
+            if d_sq < best:
+                best = d_sq
+                nearest = ast
+        if nearest is None:
+            return IDLE
+
+        dx = nearest.pos.x - ship.pos.x
+        dy = nearest.pos.y - ship.pos.y
+        target = math.degrees(math.atan2(dy, dx))
+        diff = (target - ship.angle + 180.0) % 360.0 - 180.0
+        clearance = math.sqrt(best) - nearest.r - ship.r
+        return PlayerCommand(
+            rotate_left=diff < -4.0,
+            rotate_right=diff > 4.0,
+            shoot=abs(diff) < 8.0,
+            shield=clearance < self.panic,
+        )
+
+
+# Policy factories by name; each takes a seed. Factories are plain classes
+# and functions so they pickle into batch worker processes.
+POLICIES: dict[str, PolicyFactory] = {
+    "idle": make_idle,
+    "random": RandomBot,
+    "aim": AimBot,
+}
@@ -0,0 +1,319 @@
+"""Broadphase structures that narrow down collision candidates."""
+
+import math
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from core import config as C
+from core.utils import Vec
+
+
+class SpatialHash:
+    """Uniform grid that buckets entities by position.
+
+    Cell indices wrap around the arena, so an entity that sits past an edge
+    (bullets and UFOs do not wrap) still lands next to its neighbours on the
+    same side, and a pair touching across an edge lands in adjacent cells.
+    Cells are at least cell_size wide, stretched so a whole number of them
+    tiles the arena; a narrower last column would leave such a pair two
+    columns apart. With cell_size at least the largest contact distance,
+    any touching pair is in the same or an adjacent cell, so query() only
+    looks at the 3x3 block around a point.
+
+    Moving items can be inserted as a segment; they then occupy every cell
+    the segment's bounding box touches, so a query near any part of the
+    path finds them.
+
+    query() returns items in insertion order. Inserting in group order gives
+    the same candidates, in the same order, as a plain scan of the group.
+    """
+
+    def __init__(
+        self,
+        cell_size: float | None = None,
+        width: float | None = None,
+        height: float | None = None,
+    ) -> None:
+        self.cell_size = float(cell_size or C.COLLISION_CELL_SIZE)
+        width = width or C.ARENA_WIDTH
+        height = height or C.ARENA_HEIGHT
+        self.cols = max(1, math.floor(width / self.cell_size))
+        self.rows = max(1, math.floor(height / self.cell_size))
+        self._cell_w = width / self.cols
+        self._cell_h = height / self.rows
+        self._items: list[object] = []
+        self._cells: dict[int, list[int]] = {}
+        self._spans = False
+        self._neighbours = [
+            self._block(key) for key in range(self.cols * self.rows)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._cells.clear()
+        self._spans = False
+
+    def rebuild(self, items: Iterable[object]) -> None:
+        """Replace the contents with items, bucketed by their .pos."""
+        self.clear()
+        for item in items:
+            self.insert(item, item.pos)
+
+    def insert(self, item: object, pos: Vec) -> None:
+        idx = len(self._items)
+        self._items.append(item)
+        key = self._key(pos.x, pos.y)
+        bucket = self._cells.get(key)
+        if bucket is None:
+            self._cells[key] = [idx]
+        else:
+            bucket.append(idx)
+
+    def insert_segment(self, item: object, start: Vec, end: Vec) -> None:
+        """Insert item into every cell of the box around start -> end."""
+        idx = len(self._items)
+        self._items.append(item)
+        cw, ch = self._cell_w, self._cell_h
+        col0 = math.floor(min(start.x, end.x) / cw)
+        col1 = math.floor(max(start.x, end.x) / cw)
+        row0 = math.floor(min(start.y, end.y) / ch)
+        row1 = math.floor(max(start.y, end.y) / ch)
+        if col0 == col1 and row0 == row1:
+            key = self._key(start.x, start.y)
+            self._cells.setdefault(key, []).append(idx)
+            return
+        self._spans = True
+        cols = range(col0, min(col1, col0 + self.cols - 1) + 1)
+        rows = range(row0, min(row1, row0 + self.rows - 1) + 1)
+        for row in rows:
+            for col in cols:
+                key = (row % self.rows) * self.cols + col % self.cols
+                self._cells.setdefault(key, []).append(idx)
+
+    def query(self, pos: Vec) -> list[object]:
+        """Return every item in the 3x3 cell block around pos."""
+        cells = self._cells
+        found: list[int] = []
+        for key in self._neighbours[self._key(pos.x, pos.y)]:
+            bucket = cells.get(key)
+            if bucket:
+                found.extend(bucket)
+        if self._spans:
+            # Segments may sit in several cells of the block.
+            found = sorted(set(found))
+        else:
+            found.sort()
+        items = self._items
+        return [items[i] for i in found]
+
+    def _key(self, x: float, y: float) -> int:
+        col = math.floor(x / self._cell_w) % self.cols
+        row = math.floor(y / self._cell_h) % self.rows
+        return row * self.cols + col
+
+    def _block(self, key: int) -> tuple[int, ...]:
+        row, col = divmod(key, self.cols)
+        keys = {
+            ((row + dr) % self.rows) * self.cols + (col + dc) % self.cols
+            for dr in (-1, 0, 1)
+            for dc in (-1, 0, 1)
+        }
+        return tuple(sorted(keys))
+
+
+class SweepAndPrune:
+    """Persistent sweep-and-prune index, sorted on the x axis.
+
+    Entities join with add() and leave through Sprite.kill(): the index
+    follows the sprite-group protocol, so kill() removes an entity from it
+    like from any pygame group. Each update() re-sorts the entries by the
+    left edge of their bounding box with an insertion sort, which is close
+    to linear because slow, straight-moving entities barely reorder between
+    frames, then sweeps once to list every pair of entities of different
+    kinds whose boxes overlap. Swept entities get a box around their whole
+    prev_pos -> pos path.
+
+    Boxes overlap across the wrapped arena edges too. The y test checks
+    the copies one arena up and down when either box crosses an edge; in x,
+    a box that crosses an edge is swept again as a ghost one arena over,
+    against the entries a bisect on the sorted left edges picks out.
+    """
+
+    _spritegroup = True
+
+    def __init__(self) -> None:
+        self._kinds: dict[object, int] = {}
+        self._swept: set[object] = set()
+        self._order: list[object] = []
+        self._listed: set[object] = set()
+        self._pending: list[object] = []
+        self._stale = False
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def __contains__(self, entity: object) -> bool:
+        return entity in self._kinds
+
+    def add(self, entity: object, kind: int, swept: bool = False) -> None:
+        """Track entity; kind is any int, pairs of equal kind are skipped."""
+        if entity in self._kinds:
+            return
+        self._kinds[entity] = kind
+        if swept:
+            self._swept.add(entity)
+        self._pending.append(entity)
+        entity.add_internal(self)
+
+    def kind(self, entity: object) -> int:
+        return self._kinds[entity]
+
+    def add_internal(self, entity: object) -> None:
+        """Sprite-group protocol; entities join through add()."""
+
+    def has_internal(self, entity: object) -> bool:
+        return entity in self._kinds
+
+    def remove_internal(self, entity: object) -> None:
+        if self._kinds.pop(entity, None) is not None:
+            self._swept.discard(entity)
+            self._stale = True
+
+    def update(self) -> list[tuple[object, object]]:
+        """Re-sort and return candidate pairs, lower kind first."""
+        kinds = self._kinds
+        order = self._order
+        if self._stale:
+            order = [e for e in order if e in kinds]
+            self._listed.intersection_update(order)
+            self._stale = False
+        self._order = order
+
+        boxes = [self._box(e) for e in order]
+        for i in range(1, len(order)):
+            box = boxes[i]
+            key = box[0]
+            j = i - 1
+            if boxes[j][0] <= key:
+                continue
+            entity = order[i]
+            while j >= 0 and boxes[j][0] > key:
+                boxes[j + 1] = boxes[j]
+                order[j + 1] = order[j]
+                j -= 1
+            boxes[j + 1] = box
+            order[j + 1] = entity
+
+        if self._pending:
+            self._merge_pending(order, boxes)
+
+        width, height = C.ARENA_WIDTH, C.ARENA_HEIGHT
+        crosses_y = [y_lo < 0.0 or y_hi > height for _, _, y_lo, y_hi in boxes]
+        pairs: list[tuple[object, object]] = []
+        n = len(order)
+        for i in range(n):
+            a = order[i]
+            kind_a = kinds[a]
+            _, hi, y_lo, y_hi = boxes[i]
+            wraps = crosses_y[i]
+            for j in range(i + 1, n):
+                b_lo, _, b_y_lo, b_y_hi = boxes[j]
+                if b_lo >= hi:
+                    break
+                if (b_y_lo >= y_hi or y_lo >= b_y_hi) and not (
+                    (wraps or crosses_y[j])
+                    and _overlap_across(y_lo, y_hi, b_y_lo, b_y_hi, height)
+                ):
+                    continue
+                b = order[j]
+                kind_b = kinds[b]
+                if kind_a != kind_b:
+                    pairs.append((a, b) if kind_a < kind_b else (b, a))
+
+        lows = [box[0] for box in boxes]
+        widest = max((x_hi - x_lo for x_lo, x_hi, _, _ in boxes), default=0.0)
+        seen: set[tuple[object, object]] | None = None
+        for i in range(n):
+            x_lo, x_hi, y_lo, y_hi = boxes[i]
+            if x_lo < 0.0:
+                shift = width
+            elif x_hi > width:
+                shift = -width
+            else:
+                continue
+            lo = x_lo + shift
+            hi = x_hi + shift
+            a = order[i]
+            kind_a = kinds[a]
+            wraps = crosses_y[i]
+            for j in range(bisect_left(lows, lo - widest), n):
+                b_lo, b_hi, b_y_lo, b_y_hi = boxes[j]
+                if b_lo >= hi:
+                    break
+                if b_hi <= lo or j == i:
+                    continue
+                if (b_y_lo >= y_hi or y_lo >= b_y_hi) and not (
+                    (wraps or crosses_y[j])
+                    and _overlap_across(y_lo, y_hi, b_y_lo, b_y_hi, height)
+                ):
+                    continue
+                b = order[j]
+                kind_b = kinds[b]
+                if kind_a == kind_b:
+                    continue
+                pair = (a, b) if kind_a < kind_b else (b, a)
+                if seen is None:
+                    seen = set(pairs)
+                if pair not in seen:
+                    seen.add(pair)
+                    pairs.append(pair)
+        return pairs
+
+    def _box(self, entity: object) -> tuple[float, float, float, float]:
+        """Bounding box as (x_lo, x_hi, y_lo, y_hi)."""
+        x = entity.pos.x
+        y = entity.pos.y
+        r = entity.r
+        if entity not in self._swept:
+            return x - r, x + r, y - r, y + r
+        px = entity.prev_pos.x
+        py = entity.prev_pos.y
+        return min(x, px) - r, max(x, px) + r, min(y, py) - r, max(y, py) + r
+
+    def _merge_pending(
+        self,
+        order: list[object],
+        boxes: list[tuple[float, float, float, float]],
+    ) -> None:
+        """Merge newly added entities into the sorted order, in place."""
+        kinds = self._kinds
+        listed = self._listed
+        fresh = []
+        for entity in self._pending:
+            if entity in kinds and entity not in listed:
+                listed.add(entity)
+                fresh.append((self._box(entity), entity))
+        self._pending.clear()
+        if not fresh:
+            return
+        # Two sorted runs: the list sort merges them in linear time.
+        fresh.sort(key=_x_lo)
+        merged = sorted([*zip(boxes, order, strict=True), *fresh], key=_x_lo)
+        boxes[:] = [box for box, _ in merged]
+        order[:] = [entity for _, entity in merged]
+
+
+def _overlap_across(
+    lo: float, hi: float, b_lo: float, b_hi: float, period: float
+) -> bool:
+    """Whether [lo, hi) overlaps [b_lo, b_hi) one period up or down."""
+    return (b_lo + period < hi and lo < b_hi + period) or (
+        b_lo - period < hi and lo < b_hi - period
+    )
+
+
+def _x_lo(entry: tuple[tuple[float, ...], object]) -> float:
+    return entry[0][0]
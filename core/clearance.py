@@ -0,0 +1,94 @@
+"""Clearance field: where in the arena a ship can safely appear.
+
+A coarse grid over the wrapped arena holds, per cell, a lower bound on the
+distance from any point of the cell to the edge of the nearest obstacle
+(asteroid or UFO). Any point of a cell whose clearance is at least margin
+is therefore at least margin clear, so queries answer from the grid
+alone, without checking obstacles again.
+"""
+
+from random import Random
+
+import numpy as np
+
+from core import config as C
+
+# Upper bound on obstacle-cell distances computed at once in build().
+_BATCH_ELEMENTS = 1 << 20
+
+
+class ClearanceField:
+    """Clearance per grid cell, rebuilt from obstacle arrays by build().
+
+    Cells are about CLEARANCE_CELL px (core.config) on a side and tile the
+    arena exactly. The instance keeps its grid between builds; queries
+    read the latest one.
+    """
+
+    def __init__(self, cell: float | None = None) -> None:
+        cell = cell or C.CLEARANCE_CELL
+        self.width, self.height = C.ARENA_WIDTH, C.ARENA_HEIGHT
+        self.cols = max(1, round(self.width / cell))
+        self.rows = max(1, round(self.height / cell))
+        self.cell_w = self.width / self.cols
+        self.cell_h = self.height / self.rows
+        self._cx = (np.arange(self.cols) + 0.5) * self.cell_w
+        self._cy = (np.arange(self.rows) + 0.5) * self.cell_h
+        self._half_diag = 0.5 * float(np.hypot(self.cell_w, self.cell_h))
+        self.clearance = np.full((self.rows, self.cols), np.inf)
+
+    def build(self, x: np.ndarray, y: np.ndarray, r: np.ndarray) -> None:
+        """Recompute the grid for obstacles at (x, y) with radii r."""
+        self.clearance.fill(np.inf)
+        x, y, r = np.asarray(x), np.asarray(y), np.asarray(r)
+        # Obstacles go in batches, so a large arena full of them never
+        # needs an obstacles x cells array at once.
+        step = max(1, _BATCH_ELEMENTS // self.clearance.size)
+        for lo in range(0, len(x), step):
+            hi = lo + step
+            dx = np.abs(self._cx - x[lo:hi, None])
+            dx = np.minimum(dx, self.width - dx)
+            dy = np.abs(self._cy - y[lo:hi, None])
+            dy = np.minimum(dy, self.height - dy)
+            dist = np.sqrt(dy[:, :, None] ** 2 + dx[:, None, :] ** 2)
+            dist -= r[lo:hi, None, None]
+            np.minimum(self.clearance, dist.min(axis=0), out=self.clearance)
+        if len(x):
+            self.clearance -= self._half_diag
+
+    def sample(self, rng: Random, margin: float) -> tuple[float, float] | None:
+        """A uniformly random point at least margin clear, or None if no
+        cell is that clear."""
+        cells = np.flatnonzero(self.clearance >= margin)
+        if len(cells) == 0:
+            return None
+        row, col = divmod(int(cells[rng.randrange(len(cells))]), self.cols)
+        return (
+            (col + rng.random()) * self.cell_w,
+            (row + rng.random()) * self.cell_h,
+        )
+
+    def nearest(
+        self, x: float, y: float, margin: float
+    ) -> tuple[float, float] | None:
+        """(x, y) itself if it is at least margin clear, else the centre of
+        the nearest cell that is (across wrapped edges), or None."""
+        col = min(int(x / self.cell_w), self.cols - 1)
+        row = min(int(y / self.cell_h), self.rows - 1)
+        ok = self.clearance >= margin
+        if ok[row, col]:
+            return x, y
+        if not ok.any():
+            return None
+        dx = np.abs(self._cx - x)
+        dx = np.minimum(dx, self.width - dx)
+        dy = np.abs(self._cy - y)
+        dy = np.minimum(dy, self.height - dy)
+        dist_sq = np.where(ok, dy[:, None] ** 2 + dx**2, np.inf)
+        row, col = divmod(int(np.argmin(dist_sq)), self.cols)
+        return float(self._cx[col]), float(self._cy[row])
+
+    def clearest(self) -> tuple[float, float]:
+        """Centre of the cell farthest from every obstacle."""
+        row, col = divmod(int(np.argmax(self.clearance)), self.cols)
+        return float(self._cx[col]), float(self._cy[row])
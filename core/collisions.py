@@ -1,12 +1,14 @@
 """Collision detection and resolution."""
 
+import random
 from dataclasses import dataclass, field
-from random import uniform
-
-import pygame as pg
+from random import Random
 
 from core import config as C
+from core.contacts import BACKENDS
 from core.entities import UFO_BULLET_OWNER, Asteroid, PlayerId, Ship
+from core.events import EventKind, EventStream
+from core.store import EntityTable
 from core.utils import Vec, rand_unit_vec
 
 
@@ -14,7 +16,7 @@ from core.utils import Vec, rand_unit_vec
 class CollisionResult:
     """Outcome of a single collision resolution pass."""
 
-    events: list[str] = field(default_factory=list)
+    events: EventStream = field(default_factory=EventStream)
     score_deltas: dict[PlayerId, int] = field(default_factory=dict)
     ship_deaths: list[PlayerId] = field(default_factory=list)
     asteroids_to_spawn: list[tuple[Vec, Vec, str]] = field(
@@ -26,43 +28,79 @@ class CollisionResult:
 
 
 class CollisionManager:
-    """Resolves all collisions between game entities."""
+    """Resolves all collisions between game entities.
+
+    The contact finder (see core.contacts) is rebuilt once per resolve()
+    and answers every pass. backend picks it (default
+    C.COLLISION_BACKEND): "grid" and "sap" are pure Python, "numpy" is
+    vectorized, and all of them give the same CollisionResult.
+
+    Asteroid splits draw from rng (the World's generator; the global random
+    module when None).
+    """
+
+    def __init__(
+        self,
+        backend: str | None = None,
+        rng: Random | None = None,
+    ) -> None:
+        backend = backend or C.COLLISION_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"unknown collision backend: {backend!r}")
+        self.backend = backend
+        self.rng = rng or random
+        self._contacts = BACKENDS[backend]()
+
+    def track(self, entity: object) -> None:
+        """Register a newly spawned entity with the contact finder."""
+        self._contacts.track(entity)
 
     def resolve(
         self,
         ships: dict[PlayerId, Ship],
-        bullets: pg.sprite.Group,
-        asteroids: pg.sprite.Group,
-        ufos: pg.sprite.Group,
+        bullets: EntityTable,
+        asteroids: EntityTable,
+        ufos: EntityTable,
+        events: EventStream | None = None,
     ) -> CollisionResult:
-        result = CollisionResult()
+        """Resolve this frame's collisions.
+
+        Events are emitted into `events` when given (World passes its own
+        stream), otherwise into a fresh stream on the result.
+        """
+        if events is None:
+            result = CollisionResult()
+        else:
+            result = CollisionResult(events=events)
+        self._contacts.rebuild(ships, bullets, asteroids, ufos)
+
         self._bullets_vs_asteroids(bullets, asteroids, result)
-        self._ufo_vs_player_bullets(ufos, bullets, result)
-        self._ufo_vs_asteroids(ufos, asteroids, result)
-        self._ship_vs_asteroids(ships, asteroids, result)
+        self._ufo_vs_player_bullets(ufos, result)
+        self._ufo_vs_asteroids(ufos, result)
+        self._ship_vs_asteroids(ships, result)
         self._ship_vs_ufos(ships, ufos, result)
-        self._ship_vs_ufo_bullets(ships, bullets, result)
+        self._ship_vs_ufo_bullets(ships, result)
         return result
 
     def _bullets_vs_asteroids(
         self,
-        bullets: pg.sprite.Group,
-        asteroids: pg.sprite.Group,
+        bullets: EntityTable,
+        asteroids: EntityTable,
         result: CollisionResult,
     ) -> None:
-        hits = pg.sprite.groupcollide(
-            asteroids,
-            bullets,
-            False,
-            True,
-            collided=lambda a, b: (a.pos - b.pos).length_squared() < a.r * a.r,
-        )
+        for ast in list(asteroids):
+            hit_bullets = self._contacts.bullets_inside(ast)
+            if not hit_bullets:
+                continue
+            for bullet in hit_bullets:
+                bullet.kill()
 
-        for ast, hit_bullets in hits.items():
             if any(b.owner_id == UFO_BULLET_OWNER for b in hit_bullets):
                 pos = Vec(ast.pos)
                 ast.kill()
-                result.events.append("asteroid_explosion")
+                result.events.emit(
+                    EventKind.ASTEROID_EXPLOSION, pos, UFO_BULLET_OWNER, ast.r
+                )
                 result.particles_to_spawn.append((pos, "asteroid"))
                 continue
 
@@ -73,7 +111,7 @@ class CollisionManager:
     def _destroy_ufo(
         self,
         ufo: object,
-        ufos: pg.sprite.Group,
+        ufos: EntityTable,
         result: CollisionResult,
     ) -> None:
         """Kill a UFO and emit its explosion event + particles.
@@ -85,97 +123,81 @@ class CollisionManager:
         ufo.kill()
         if ufo in ufos:
             ufos.remove(ufo)
-        result.events.append("ship_explosion")
+        result.events.emit(
+            EventKind.SHIP_EXPLOSION, pos, UFO_BULLET_OWNER, ufo.r
+        )
         result.particles_to_spawn.append((pos, "ufo"))
 
     def _ufo_vs_player_bullets(
         self,
-        ufos: pg.sprite.Group,
-        bullets: pg.sprite.Group,
+        ufos: EntityTable,
         result: CollisionResult,
     ) -> None:
         for ufo in list(ufos):
-            for bullet in list(bullets):
-                if bullet.owner_id <= 0:
-                    continue
-                r_sum = ufo.r + bullet.r
-                if (ufo.pos - bullet.pos).length_squared() < r_sum * r_sum:
-                    cfg = C.UFO_SMALL if ufo.small else C.UFO_BIG
-                    score = cfg["score"]
-                    result.score_deltas[bullet.owner_id] = (
-                        result.score_deltas.get(bullet.owner_id, 0) + score
-                    )
-                    bullet.kill()
-                    self._destroy_ufo(ufo, ufos, result)
+            for bullet in self._contacts.bullets_touching(ufo):
+                cfg = C.UFO_SMALL if ufo.small else C.UFO_BIG
+                score = cfg["score"]
+                result.score_deltas[bullet.owner_id] = (
+                    result.score_deltas.get(bullet.owner_id, 0) + score
+                )
+                bullet.kill()
+                self._destroy_ufo(ufo, ufos, result)
 
     def _ufo_vs_asteroids(
         self,
-        ufos: pg.sprite.Group,
-        asteroids: pg.sprite.Group,
+        ufos: EntityTable,
         result: CollisionResult,
     ) -> None:
         """UFO hit asteroid: UFO dies, asteroid splits with no score."""
         for ufo in list(ufos):
-            for ast in list(asteroids):
-                r_sum = ufo.r + ast.r
-                if (ufo.pos - ast.pos).length_squared() < r_sum * r_sum:
-                    self._destroy_ufo(ufo, ufos, result)
-                    self._split_asteroid(ast, result=result)
-                    break
+            for ast in self._contacts.asteroids_touching(ufo):
+                self._destroy_ufo(ufo, ufos, result)
+                self._split_asteroid(ast, result=result)
+                break
 
     def _ship_vs_asteroids(
         self,
         ships: dict[PlayerId, Ship],
-        asteroids: pg.sprite.Group,
         result: CollisionResult,
     ) -> None:
         for ship in ships.values():
             if ship.invuln.active:
                 continue
-            for ast in list(asteroids):
-                r_sum = ast.r + ship.r
-                if (ast.pos - ship.pos).length_squared() < r_sum * r_sum:
-                    if ship.shield.active:
-                        # Shield deflects: split asteroid, ship survives.
-                        self._split_asteroid(ast, result=result)
-                        continue
-                    result.ship_deaths.append(ship.player_id)
-                    return
+            for ast in self._contacts.asteroids_touching(ship):
+                if ship.shield.active:
+                    # Shield deflects: split asteroid, ship survives.
+                    self._split_asteroid(ast, result=result)
+                    continue
+                result.ship_deaths.append(ship.player_id)
+                return
 
     def _ship_vs_ufos(
         self,
         ships: dict[PlayerId, Ship],
-        ufos: pg.sprite.Group,
+        ufos: EntityTable,
         result: CollisionResult,
     ) -> None:
         """Active shield destroys any UFO that touches the ship. No score."""
         for ship in ships.values():
             if not ship.shield.active:
                 continue
-            for ufo in list(ufos):
-                r_sum = ufo.r + ship.r
-                if (ufo.pos - ship.pos).length_squared() < r_sum * r_sum:
-                    self._destroy_ufo(ufo, ufos, result)
+            for ufo in self._contacts.ufos_touching(ship):
+                self._destroy_ufo(ufo, ufos, result)
 
     def _ship_vs_ufo_bullets(
         self,
         ships: dict[PlayerId, Ship],
-        bullets: pg.sprite.Group,
         result: CollisionResult,
     ) -> None:
         for ship in ships.values():
             if ship.invuln.active:
                 continue
-            for bullet in list(bullets):
-                if bullet.owner_id != UFO_BULLET_OWNER:
+            for bullet in self._contacts.bullets_touching(ship):
+                bullet.kill()
+                if ship.shield.active:
                     continue
-                r_sum = bullet.r + ship.r
-                if (bullet.pos - ship.pos).length_squared() < r_sum * r_sum:
-                    bullet.kill()
-                    if ship.shield.active:
-                        continue
-                    result.ship_deaths.append(ship.player_id)
-                    return
+                result.ship_deaths.append(ship.player_id)
+                return
 
     def _split_asteroid(
         self,
@@ -197,13 +219,15 @@ class CollisionManager:
         pos = Vec(ast.pos)
         ast.kill()
 
-        result.events.append("asteroid_explosion")
+        result.events.emit(
+            EventKind.ASTEROID_EXPLOSION, pos, scorer_id or 0, ast.r
+        )
         result.particles_to_spawn.append((pos, "asteroid"))
 
         for new_size in split:
-            dirv = rand_unit_vec()
+            dirv = rand_unit_vec(self.rng)
             speed = (
-                uniform(C.AST_VEL_MIN, C.AST_VEL_MAX)
+                self.rng.uniform(C.AST_VEL_MIN, C.AST_VEL_MAX)
                 * C.AST_SPLIT_SPEED_MULT
             )
             result.asteroids_to_spawn.append((pos, dirv * speed, new_size))
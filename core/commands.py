@@ -2,6 +2,14 @@
 
 from dataclasses import dataclass
 
+# One bit per control, in field order, for packed command bytes.
+ROTATE_LEFT = 1 << 0
+ROTATE_RIGHT = 1 << 1
+THRUST = 1 << 2
+SHOOT = 1 << 3
+HYPERSPACE = 1 << 4
+SHIELD = 1 << 5
+
 
 @dataclass(frozen=True, slots=True)
 class PlayerCommand:
@@ -13,3 +21,25 @@ class PlayerCommand:
     shoot: bool = False
     hyperspace: bool = False
     shield: bool = False
+
+    def to_bits(self) -> int:
+        """The command packed into one byte (ROTATE_LEFT | THRUST ...)."""
+        return (
+            ROTATE_LEFT * self.rotate_left
+            | ROTATE_RIGHT * self.rotate_right
+            | THRUST * self.thrust
+            | SHOOT * self.shoot
+            | HYPERSPACE * self.hyperspace
+            | SHIELD * self.shield
+        )
+
+    @classmethod
+    def from_bits(cls, bits: int) -> "PlayerCommand":
+        return cls(
+            rotate_left=bool(bits & ROTATE_LEFT),
+            rotate_right=bool(bits & ROTATE_RIGHT),
+            thrust=bool(bits & THRUST),
+            shoot=bool(bits & SHOOT),
+            hyperspace=bool(bits & HYPERSPACE),
+            shield=bool(bits & SHIELD),
+        )
@@ -2,9 +2,20 @@
 
 import os
 
+# Window size.
 WIDTH = 800
 HEIGHT = 600
+# Size of the wrapped arena the simulation runs in. It can be larger than
+# the window; benchmarks.stress runs with a much larger one.
+ARENA_WIDTH = WIDTH
+ARENA_HEIGHT = HEIGHT
 FPS = 60
+# Simulation ticks per second in the client's fixed-step loop; frames are
+# drawn at FPS and interpolated between ticks.
+TICK_RATE = 60
+# Longest frame the loop catches up on. After a longer stall the game
+# slows down instead of running a burst of ticks.
+MAX_FRAME_TIME = 0.25
 
 MAX_PLAYERS = 8
 LOCAL_PLAYER_ID = 1
@@ -19,12 +30,17 @@ EXTRA_LIFE_NOTICE_TIME = 1.5
 SHIP_RADIUS = 15
 SHIP_TURN_SPEED = 220.0
 SHIP_THRUST = 220.0
+# Share of velocity kept per 1/FPS seconds (scaled to the actual dt).
 SHIP_FRICTION = 0.995
 SHIP_FIRE_RATE = 0.2
 SHIP_BULLET_SPEED = 420.0
 HYPERSPACE_COST = 250
-HYPERSPACE_ATTEMPTS = 20
 HYPERSPACE_SAFE_MARGIN = 20
+# Clearance a respawning ship needs beyond its radius; it moves off the
+# centre to the nearest spot that has it.
+RESPAWN_SAFE_MARGIN = 60
+# Grid cell of the clearance field used to place ships; see core.clearance.
+CLEARANCE_CELL = 20
 SHIELD_DURATION = 3.0
 SHIELD_COOLDOWN = 10.0
 
@@ -42,6 +58,9 @@ AST_POLY_STEPS = {"L": 12, "M": 10, "S": 8}
 AST_POLY_JITTER_MIN = 0.75
 AST_POLY_JITTER_MAX = 1.2
 AST_MIN_SPAWN_DIST = 150
+# When no edge position is AST_MIN_SPAWN_DIST from every ship, a wave
+# spawns where the distance is at least this share of the largest one.
+AST_FALLBACK_SPAWN_SHARE = 0.5
 AST_SPLIT_SPEED_MULT = 1.2
 AST_SIZES = {
     "L": {"r": 46, "score": 20, "split": ["M", "M"]},
@@ -53,7 +72,52 @@ BULLET_RADIUS = 2
 BULLET_TTL = 1.0
 MAX_BULLETS_PER_PLAYER = 4
 
+# Idle objects kept for reuse; see core.pool.
+BULLET_POOL_SIZE = 256
+
+# Live particles at once; see core.particles.
+PARTICLE_CAPACITY = 8192
+
+# Events buffered per frame; see core.events.
+EVENT_CAPACITY = 256
+
+# Observation slots per entity kind, nearest first; see core.env.
+OBS_ASTEROIDS = 8
+OBS_BULLETS = 4
+OBS_UFOS = 2
+
+# Ticks between replay keyframes; see core.replay.
+REPLAY_KEYFRAME_EVERY = 5 * FPS
+
+# Network state frames; see core.delta. Positions go out in 16 bits, in
+# steps of NET_POS_STEP px from NET_POS_MARGIN px before the arena's edge,
+# which covers arenas up to 8064 px across at these values. Entities
+# further out than that margin are left out of frames.
+NET_POS_STEP = 0.125
+NET_POS_MARGIN = 64
+NET_VEL_STEP = 0.0625
+# How far a client's extrapolation of an entity may drift before the
+# entity is sent again, in px.
+NET_POS_TOLERANCE = 0.5
+# Past ticks kept as baselines for clients whose acks lag behind.
+NET_HISTORY = 2 * TICK_RATE
+
+# Game server; see server.server.
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7777
+SERVER_MAX_ROOMS = 1024
+# Longest the server's scheduler steps rooms before letting network I/O
+# in, in seconds.
+SERVER_SLICE = 0.002
+# How far the scheduler may fall behind before it drops ticks rather than
+# catching up, in seconds.
+SERVER_MAX_LAG = 0.1
+# Bytes a player's connection may have queued before the server skips
+# sending them state frames until it drains.
+SERVER_SEND_BUFFER = 1 << 18
+
 UFO_SPAWN_EVERY = 12.0
+UFO_SPAWN_COUNT = 1
 UFO_SPEED_BIG = 95.0
 UFO_SPEED_SMALL = 120.0
 UFO_BIG = {"r": 18, "score": 200}
@@ -64,6 +128,19 @@ UFO_FIRE_RATE_SMALL = 0.55
 UFO_BULLET_SPEED = 360.0
 UFO_BULLET_TTL = 1.3
 
+# Broadphase grid cell: twice the largest collider radius, so any touching
+# pair is always in the same or an adjacent cell.
+COLLISION_CELL_SIZE = 2 * max(
+    max(size["r"] for size in AST_SIZES.values()),
+    UFO_BIG["r"],
+    SHIP_RADIUS,
+)
+# "grid" (spatial hash), "sap" (sweep and prune) or "numpy" (vectorized);
+# see core.contacts.
+COLLISION_BACKEND = "grid"
+# Upper bound on pair-matrix elements per batch in the numpy backend.
+COLLISION_NUMPY_BATCH = 65536
+
 # Aim: small UFO is precise, big UFO is inaccurate.
 UFO_AIM_JITTER_DEG_BIG = 28.0
 UFO_AIM_JITTER_DEG_SMALL = 6.0
@@ -83,6 +160,7 @@ FONT_SIZE_SMALL = 22
 FONT_SIZE_LARGE = 64
 FONT_NAME = "consolas"
 
+# Seed for each World's generator; None draws a fresh one per World.
 RANDOM_SEED = None
 
 # Paths (work from any execution directory).
@@ -0,0 +1,397 @@
+"""Contact finders: the narrowphase backends behind CollisionManager.
+
+A contact finder is rebuilt once per resolve() and then answers "what does
+this entity touch right now?" for each collision pass. Every backend returns
+contacts in group order and skips entities that were killed earlier in the
+same resolve(), so all of them produce identical CollisionResults.
+
+Bullets are tested along their whole prev_pos -> pos segment (swept), so a
+slow tick rate cannot make them tunnel through small targets. Every
+distance is measured across the wrapped arena edges (core.utils.wrap_delta),
+so an asteroid overlapping a ship across an edge hits it, as drawn.
+Asteroids are hit by every bullet, but bullets_touching() is filtered by
+owner: UFOs only see player bullets and ships only see UFO bullets.
+"""
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from core import config as C
+from core.broadphase import SpatialHash, SweepAndPrune
+from core.entities import UFO, UFO_BULLET_OWNER, Asteroid, PlayerId, Ship
+from core.store import EntityTable
+from core.utils import Vec, segment_dist_sq, wrap_delta
+
+
+class GridContacts:
+    """Pure-Python backend: spatial-hash query plus a per-pair test.
+
+    Player and UFO bullets also get a grid each, so a ship's query never
+    wades through player bullets, nor a UFO's through UFO bullets.
+    """
+
+    def __init__(self) -> None:
+        self._bullet_grid = SpatialHash()
+        self._player_shot_grid = SpatialHash()
+        self._ufo_shot_grid = SpatialHash()
+        self._asteroid_grid = SpatialHash()
+        self._ufo_grid = SpatialHash()
+
+    def track(self, entity: object) -> None:
+        """The grids are rebuilt from the groups; nothing to track."""
+
+    def rebuild(
+        self,
+        ships: dict[PlayerId, Ship],
+        bullets: EntityTable,
+        asteroids: EntityTable,
+        ufos: EntityTable,
+    ) -> None:
+        grids = self._bullet_grid, self._player_shot_grid, self._ufo_shot_grid
+        for grid in grids:
+            grid.clear()
+        for bullet in bullets:
+            start = bullet.prev_pos
+            end = bullet.pos
+            self._bullet_grid.insert_segment(bullet, start, end)
+            if bullet.owner_id > 0:
+                self._player_shot_grid.insert_segment(bullet, start, end)
+            elif bullet.owner_id == UFO_BULLET_OWNER:
+                self._ufo_shot_grid.insert_segment(bullet, start, end)
+        self._asteroid_grid.rebuild(asteroids)
+        self._ufo_grid.rebuild(ufos)
+
+    def bullets_inside(self, ast: object) -> list[object]:
+        """Live bullets whose path this frame passed inside the asteroid."""
+        r_sq = ast.r * ast.r
+        return [
+            b
+            for b in self._bullet_grid.query(ast.pos)
+            if b.alive() and segment_dist_sq(b.prev_pos, b.pos, ast.pos) < r_sq
+        ]
+
+    def bullets_touching(self, entity: object) -> list[object]:
+        """Live hostile bullets whose path this frame touched entity."""
+        if isinstance(entity, UFO):
+            grid = self._player_shot_grid
+        else:
+            grid = self._ufo_shot_grid
+        hits = []
+        for bullet in grid.query(entity.pos):
+            if not bullet.alive():
+                continue
+            r_sum = entity.r + bullet.r
+            d_sq = segment_dist_sq(bullet.prev_pos, bullet.pos, entity.pos)
+            if d_sq < r_sum * r_sum:
+                hits.append(bullet)
+        return hits
+
+    def asteroids_touching(self, entity: object) -> list[object]:
+        return self._touching(self._asteroid_grid, entity)
+
+    def ufos_touching(self, entity: object) -> list[object]:
+        return self._touching(self._ufo_grid, entity)
+
+    @staticmethod
+    def _touching(grid: SpatialHash, entity: object) -> list[object]:
+        hits = []
+        for other in grid.query(entity.pos):
+            if not other.alive():
+                continue
+            r_sum = entity.r + other.r
+            if _dist_sq(entity.pos, other.pos) < r_sum * r_sum:
+                hits.append(other)
+        return hits
+
+
+class _Packed:
+    """One group flattened into contiguous arrays.
+
+    EntityTables already hold their state in typed columns (synced by World
+    before collisions), which are copied in bulk; other iterables are
+    packed entity by entity.
+    """
+
+    __slots__ = ("items", "pos", "r", "owner", "prev")
+
+    def __init__(self, items: Iterable[object], bullets: bool = False) -> None:
+        if isinstance(items, EntityTable):
+            self._from_table(items, bullets)
+            return
+        self.items = list(items)
+        n = len(self.items)
+        self.pos = np.empty((n, 2), dtype=np.float64)
+        self.r = np.empty(n, dtype=np.float64)
+        self.owner = np.empty(n, dtype=np.int64) if bullets else None
+        self.prev = np.empty((n, 2), dtype=np.float64) if bullets else None
+        for i, item in enumerate(self.items):
+            self.pos[i, 0] = item.pos.x
+            self.pos[i, 1] = item.pos.y
+            self.r[i] = item.r
+            if bullets:
+                self.owner[i] = item.owner_id
+                self.prev[i, 0] = item.prev_pos.x
+                self.prev[i, 1] = item.prev_pos.y
+
+    def _from_table(self, table: EntityTable, bullets: bool) -> None:
+        # Every result below is a copy, so no buffer export outlives this
+        # call and blocks the table's arrays from resizing.
+        self.items = table.sprites()
+        self.pos = _stack(table.x, table.y)
+        self.r = np.array(table.r, dtype=np.float64)
+        self.owner = np.array(table.owner, dtype=np.int64) if bullets else None
+        self.prev = _stack(table.prev_x, table.prev_y) if bullets else None
+
+
+def _stack(xs: object, ys: object) -> np.ndarray:
+    """Two float columns as one (n, 2) array."""
+    return np.array((xs, ys), dtype=np.float64).T
+
+
+class NumpyContacts:
+    """Vectorized backend: every overlapping pair found in batched tests.
+
+    Each group is packed into arrays once, and each pair of groups is tested
+    with one broadcast distance computation per batch of rows (a point to
+    segment distance when b holds bullets). Batches keep the temporary
+    matrices under C.COLLISION_NUMPY_BATCH elements.
+    """
+
+    def __init__(self) -> None:
+        self._inside: dict[object, list[object]] = {}
+        self._bullets: dict[object, list[object]] = {}
+        self._asteroids: dict[object, list[object]] = {}
+        self._ufos: dict[object, list[object]] = {}
+
+    def track(self, entity: object) -> None:
+        """The arrays are packed from the groups; nothing to track."""
+
+    def rebuild(
+        self,
+        ships: dict[PlayerId, Ship],
+        bullets: EntityTable,
+        asteroids: EntityTable,
+        ufos: EntityTable,
+    ) -> None:
+        ps = _Packed(ships.values())
+        pb = _Packed(bullets, bullets=True)
+        pa = _Packed(asteroids)
+        pu = _Packed(ufos)
+
+        player_shots = pb.owner > 0
+        ufo_shots = pb.owner == UFO_BULLET_OWNER
+
+        self._inside = _pairs(pa, pb, use_b_radius=False)
+        self._bullets = _pairs(pu, pb, b_mask=player_shots)
+        self._bullets.update(_pairs(ps, pb, b_mask=ufo_shots))
+        self._asteroids = _pairs(pu, pa)
+        self._asteroids.update(_pairs(ps, pa))
+        self._ufos = _pairs(ps, pu)
+
+    def bullets_inside(self, ast: object) -> list[object]:
+        """Live bullets whose path this frame passed inside the asteroid."""
+        return _alive(self._inside.get(ast))
+
+    def bullets_touching(self, entity: object) -> list[object]:
+        return _alive(self._bullets.get(entity))
+
+    def asteroids_touching(self, entity: object) -> list[object]:
+        return _alive(self._asteroids.get(entity))
+
+    def ufos_touching(self, entity: object) -> list[object]:
+        return _alive(self._ufos.get(entity))
+
+
+# Sweep-and-prune kinds. Pairs come out ordered low kind first, so the
+# ship, UFO, asteroid, bullet order below decides which side is which.
+_SHIP, _UFO, _ASTEROID, _BULLET = range(4)
+
+
+class SweepContacts:
+    """Pure-Python backend driven by a persistent sweep-and-prune index.
+
+    World reports every spawn through track(); kills leave the index on
+    their own. rebuild() only runs the exact tests on the candidate pairs
+    the index produces.
+    """
+
+    def __init__(self) -> None:
+        self.index = SweepAndPrune()
+        self._inside: dict[object, list[object]] = {}
+        self._bullets: dict[object, list[object]] = {}
+        self._asteroids: dict[object, list[object]] = {}
+        self._ufos: dict[object, list[object]] = {}
+
+    def track(self, entity: object) -> None:
+        if isinstance(entity, Ship):
+            self.index.add(entity, _SHIP)
+        elif isinstance(entity, UFO):
+            self.index.add(entity, _UFO)
+        elif isinstance(entity, Asteroid):
+            self.index.add(entity, _ASTEROID)
+        else:
+            self.index.add(entity, _BULLET, swept=True)
+
+    def rebuild(
+        self,
+        ships: dict[PlayerId, Ship],
+        bullets: EntityTable,
+        asteroids: EntityTable,
+        ufos: EntityTable,
+    ) -> None:
+        inside: dict[object, list[object]] = {}
+        touching: dict[int, dict[object, list[object]]] = {
+            _BULLET: {},
+            _ASTEROID: {},
+            _UFO: {},
+        }
+
+        kind = self.index.kind
+        for a, b in self.index.update():
+            kind_b = kind(b)
+            if kind_b == _BULLET:
+                d_sq = segment_dist_sq(b.prev_pos, b.pos, a.pos)
+                kind_a = kind(a)
+                if kind_a == _ASTEROID:
+                    if d_sq < a.r * a.r:
+                        inside.setdefault(a, []).append(b)
+                    continue
+                if kind_a == _UFO:
+                    wanted = b.owner_id > 0
+                else:
+                    wanted = b.owner_id == UFO_BULLET_OWNER
+                if not wanted:
+                    continue
+            else:
+                d_sq = _dist_sq(a.pos, b.pos)
+            r_sum = a.r + b.r
+            if d_sq < r_sum * r_sum:
+                touching[kind_b].setdefault(a, []).append(b)
+
+        # Candidate pairs come out in sweep order; restore group order.
+        rank = {}
+        for group in (ships.values(), bullets, asteroids, ufos):
+            for i, entity in enumerate(group):
+                rank[entity] = i
+        for hits in (inside, *touching.values()):
+            for others in hits.values():
+                others.sort(key=rank.__getitem__)
+
+        self._inside = inside
+        self._bullets = touching[_BULLET]
+        self._asteroids = touching[_ASTEROID]
+        self._ufos = touching[_UFO]
+
+    def bullets_inside(self, ast: object) -> list[object]:
+        """Live bullets whose path this frame passed inside the asteroid."""
+        return _alive(self._inside.get(ast))
+
+    def bullets_touching(self, entity: object) -> list[object]:
+        return _alive(self._bullets.get(entity))
+
+    def asteroids_touching(self, entity: object) -> list[object]:
+        return _alive(self._asteroids.get(entity))
+
+    def ufos_touching(self, entity: object) -> list[object]:
+        return _alive(self._ufos.get(entity))
+
+
+def _pairs(
+    a: _Packed,
+    b: _Packed,
+    use_b_radius: bool = True,
+    b_mask: np.ndarray | None = None,
+) -> dict[object, list[object]]:
+    """Map each item of a to the items of b it overlaps, in b's order."""
+    out: dict[object, list[object]] = {}
+    n_a = len(a.items)
+    n_b = len(b.items)
+    if n_a == 0 or n_b == 0:
+        return out
+
+    b_idx = np.arange(n_b) if b_mask is None else np.flatnonzero(b_mask)
+    if len(b_idx) == 0:
+        return out
+    b_x = b.pos[b_idx, 0]
+    b_y = b.pos[b_idx, 1]
+    b_r = b.r[b_idx] if use_b_radius else 0.0
+    b_items = [b.items[k] for k in b_idx.tolist()]
+    if b.prev is not None:
+        # Swept bullets: distance to the prev -> pos segment, computed in
+        # the same operation order as core.utils.segment_dist_sq.
+        start_x = b.prev[b_idx, 0]
+        start_y = b.prev[b_idx, 1]
+        seg_x = b_x - start_x
+        seg_y = b_y - start_y
+        len_sq = seg_x * seg_x + seg_y * seg_y
+        moving = len_sq > 0.0
+        safe_len_sq = np.where(moving, len_sq, 1.0)
+
+    rows = max(1, C.COLLISION_NUMPY_BATCH // len(b_idx))
+    for start in range(0, n_a, rows):
+        stop = min(start + rows, n_a)
+        reach = a.r[start:stop, None] + b_r
+        if b.prev is None:
+            dx, dy = wrap_delta(
+                a.pos[start:stop, 0, None] - b_x,
+                a.pos[start:stop, 1, None] - b_y,
+            )
+        else:
+            rel_x, rel_y = wrap_delta(
+                a.pos[start:stop, 0, None] - start_x,
+                a.pos[start:stop, 1, None] - start_y,
+            )
+            t = np.where(
+                moving,
+                np.minimum(
+                    np.maximum(
+                        (rel_x * seg_x + rel_y * seg_y) / safe_len_sq, 0.0
+                    ),
+                    1.0,
+                ),
+                0.0,
+            )
+            dx = rel_x - seg_x * t
+            dy = rel_y - seg_y * t
+        ai, bj = np.nonzero(dx * dx + dy * dy < reach * reach)
+        if len(ai) == 0:
+            continue
+        # nonzero() is row-major: cut the hits into one run per a-row.
+        cuts = (np.flatnonzero(np.diff(ai)) + 1).tolist()
+        heads = ai[[0, *cuts]].tolist()
+        cols = bj.tolist()
+        spans = zip(heads, [0, *cuts], [*cuts, len(cols)], strict=True)
+        for i, lo, hi in spans:
+            out[a.items[start + i]] = [b_items[j] for j in cols[lo:hi]]
+    return out
+
+
+def _dist_sq(a: Vec, b: Vec) -> float:
+    """Squared distance from a to b across the wrapped arena edges."""
+    # wrap_delta(), inlined: this runs for every candidate pair.
+    width, height = C.ARENA_WIDTH, C.ARENA_HEIGHT
+    dx = a.x - b.x
+    if dx > width / 2:
+        dx -= width
+    elif dx < -width / 2:
+        dx += width
+    dy = a.y - b.y
+    if dy > height / 2:
+        dy -= height
+    elif dy < -height / 2:
+        dy += height
+    return dx * dx + dy * dy
+
+
+def _alive(items: list[object] | None) -> list[object]:
+    if not items:
+        return []
+    return [item for item in items if item.alive()]
+
+
+BACKENDS = {
+    "grid": GridContacts,
+    "sap": SweepContacts,
+    "numpy": NumpyContacts,
+}
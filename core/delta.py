@@ -0,0 +1,403 @@
+"""Delta-compressed World state for network clients.
+
+DeltaEncoder.capture() records, once per tick, every asteroid, bullet, UFO
+and ship as a quantized trajectory: where it was at some tick and its
+velocity. A record holds while the entity keeps to it, so an asteroid or
+a bullet flying straight is sent once, when it appears. An entity gets a
+new record when its velocity, angle or flags change, or when extrapolating
+the old record would put it more than NET_POS_TOLERANCE px off (core.config).
+
+encode(ack) packs a frame for a client whose latest acknowledged frame
+was tick ack: the records made since then, and the ids of the entities
+that are gone. A client that has acknowledged nothing, or whose tick is
+older than the NET_HISTORY ticks kept, gets a full frame. A frame is:
+
+    header    version, tick, baseline tick (NO_BASELINE for a full frame)
+    per kind  asteroids, bullets, ufos, ships: removed count, record
+              count, the removed ids (u32), then the records (RECORD)
+    outlines  count, then per asteroid new to the client: id, vertex
+              count, one byte of radius jitter per vertex
+
+An entity further than NET_POS_MARGIN outside the arena, such as a bullet
+flying off it, has no quantized position: it is left out of the frame,
+and a client that had it sees it removed.
+
+DeltaDecoder applies each frame to the baseline it names and returns a
+State, whose positions() extrapolate the records as the encoder does.
+Ids are entity handles cut to 32 bits (the slot and 8 bits of its
+generation), so they are unique among entities alive around the same tick.
+"""
+
+import math
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from core import config as C
+from core.store import EntityTable
+
+VERSION = 1
+NO_BASELINE = 0xFFFFFFFF
+
+# version, tick, baseline tick
+HEADER = struct.Struct("<BII")
+# removed ids, records
+COUNTS = struct.Struct("<II")
+# asteroid id, vertices
+OUTLINE = struct.Struct("<IB")
+
+# One entity's trajectory. tick is when the entity was at (x, y); a is
+# fixed for the entity's life (asteroid size index, bullet owner, UFO
+# small flag, ship player id) and b holds ship flags.
+RECORD = np.dtype(
+    [
+        ("id", "<u4"),
+        ("tick", "<u4"),
+        ("x", "<u2"),
+        ("y", "<u2"),
+        ("vx", "<i2"),
+        ("vy", "<i2"),
+        ("angle", "<u2"),
+        ("a", "u1"),
+        ("b", "u1"),
+    ]
+)
+
+KINDS = ("asteroids", "bullets", "ufos", "ships")
+# Whether the kind wraps around the arena (bullets and UFOs fly off it).
+WRAPS = {"asteroids": True, "bullets": False, "ufos": False, "ships": True}
+SIZES = "LMS"
+
+# Ship flags in field b.
+INVULN = 1 << 0
+SHIELD = 1 << 1
+
+_EMPTY = np.empty(0, RECORD)
+
+
+@dataclass
+class State:
+    """Every entity as a client knows it after decoding one frame.
+
+    records holds one RECORD array per kind, sorted by id.
+    """
+
+    tick: int
+    records: dict[str, np.ndarray]
+
+    def positions(self, kind: str, tick: int | None = None) -> np.ndarray:
+        """Positions of that kind's entities at tick (default: self.tick),
+        extrapolated from their records, as an (n, 2) array in id order."""
+        return _positions(
+            self.records[kind], self.tick if tick is None else tick, kind
+        )
+
+
+class DeltaEncoder:
+    """Tracks one World's entities and encodes frames of them.
+
+    Call capture() once per tick after World.update(), then encode() once
+    per client. Ticks count up by one per 1 / TICK_RATE s. A World.reset()
+    starts over with full frames, since the handles start over too.
+    World.restore() refills entities in place, so use a new encoder after
+    one.
+    """
+
+    def __init__(self, history: int | None = None) -> None:
+        self.history = history or C.NET_HISTORY
+        # Tick of the latest capture(), None before the first.
+        self.tick: int | None = None
+        self._store: object = None
+        self._current: dict[str, np.ndarray] = {}
+        self._states: dict[int, dict[str, np.ndarray]] = {}
+        self._outlines: dict[int, bytes] = {}
+
+    def capture(self, world: object, tick: int) -> None:
+        """Record the world's entities as of tick."""
+        store = world.store
+        if store is not self._store:
+            self._store = store
+            self._states.clear()
+            self._outlines.clear()
+            self._current = dict.fromkeys(KINDS, _EMPTY)
+
+        state = {}
+        for kind in KINDS[:3]:
+            table = getattr(store, kind)
+            state[kind] = self._capture(kind, table, tick, *_columns(table))
+        ships = store.ships.entities
+        angle = np.array([ship.angle for ship in ships])
+        flags = [
+            INVULN * ship.invuln.active | SHIELD * ship.shield.active
+            for ship in ships
+        ]
+        state["ships"] = self._capture(
+            "ships",
+            store.ships,
+            tick,
+            np.array([ship.pos.x for ship in ships]),
+            np.array([ship.pos.y for ship in ships]),
+            np.array([ship.vel.x for ship in ships]),
+            np.array([ship.vel.y for ship in ships]),
+            np.rint(angle % 360.0 * (65536 / 360.0)) % 65536,
+            np.array(flags, dtype=np.uint8),
+        )
+
+        self.tick = tick
+        self._current = state
+        self._states[tick] = state
+        for old in [t for t in self._states if t <= tick - self.history]:
+            del self._states[old]
+        live = len(state["asteroids"])
+        if len(self._outlines) > 2 * live + 64:
+            ids = state["asteroids"]["id"].tolist()
+            self._outlines = {i: self._outlines[i] for i in ids}
+
+    def encode(self, ack: int | None = None) -> bytes:
+        """The frame taking a client from tick ack to the captured tick."""
+        base = None if ack is None else self._states.get(ack)
+        baseline = NO_BASELINE if base is None else ack
+        parts = [HEADER.pack(VERSION, self.tick, baseline)]
+        new_asteroids = None
+        for kind in KINDS:
+            current = self._current[kind]
+            if base is None:
+                sent, removed, new = current, _EMPTY["id"], current["id"]
+            else:
+                old = base[kind]
+                idx, found = _match(old["id"], current["id"])
+                same = found.copy()
+                same[found] = old["tick"][idx[found]] == current["tick"][found]
+                sent = current[~same]
+                new = current["id"][~found]
+                _, kept = _match(current["id"], old["id"])
+                removed = old["id"][~kept]
+            parts += [
+                COUNTS.pack(len(removed), len(sent)),
+                removed.tobytes(),
+                sent.tobytes(),
+            ]
+            if kind == "asteroids":
+                new_asteroids = new.tolist()
+
+        outlines = self._outlines
+        parts.append(struct.pack("<I", len(new_asteroids)))
+        for asteroid_id in new_asteroids:
+            outline = outlines[asteroid_id]
+            parts += [OUTLINE.pack(asteroid_id, len(outline)), outline]
+        return b"".join(parts)
+
+    def _capture(
+        self,
+        kind: str,
+        table: EntityTable,
+        tick: int,
+        x: np.ndarray,
+        y: np.ndarray,
+        vx: np.ndarray,
+        vy: np.ndarray,
+        angle: np.ndarray | int = 0,
+        flags: np.ndarray | int = 0,
+    ) -> np.ndarray:
+        ids = np.frombuffer(table.handle, np.int64).astype(np.uint32)
+        # Table rows of the entities the frame can place.
+        inside = np.flatnonzero(
+            _quantizable(x, C.ARENA_WIDTH) & _quantizable(y, C.ARENA_HEIGHT)
+        )
+        if len(inside) < len(ids):
+            ids, x, y, vx, vy = (v[inside] for v in (ids, x, y, vx, vy))
+            if isinstance(angle, np.ndarray):
+                angle, flags = angle[inside], flags[inside]
+        rec = np.empty(len(ids), RECORD)
+        rec["id"] = ids
+        rec["tick"] = tick
+        rec["x"] = _quantize(x)
+        rec["y"] = _quantize(y)
+        rec["vx"] = np.clip(np.rint(vx / C.NET_VEL_STEP), -32768, 32767)
+        rec["vy"] = np.clip(np.rint(vy / C.NET_VEL_STEP), -32768, 32767)
+        rec["angle"] = angle
+        rec["b"] = flags
+
+        prev = self._current[kind]
+        idx, found = _match(prev["id"], ids)
+        rows = np.flatnonzero(found)
+        old = prev[idx[rows]]
+        rec["a"][rows] = old["a"]
+        new_rows = np.flatnonzero(~found)
+        if len(new_rows):
+            rec["a"][new_rows] = self._fixed(
+                kind, table, inside[new_rows].tolist(), ids[new_rows].tolist()
+            )
+
+        px, py = _positions(old, tick, kind).T
+        dx = px - x[rows]
+        dy = py - y[rows]
+        if WRAPS[kind]:
+            dx = (dx + C.ARENA_WIDTH / 2) % C.ARENA_WIDTH - C.ARENA_WIDTH / 2
+            dy = (dy + C.ARENA_HEIGHT / 2) % C.ARENA_HEIGHT
+            dy -= C.ARENA_HEIGHT / 2
+        current = rec[rows]
+        keep = (
+            (old["vx"] == current["vx"])
+            & (old["vy"] == current["vy"])
+            & (old["angle"] == current["angle"])
+            & (old["b"] == current["b"])
+            & (dx * dx + dy * dy <= C.NET_POS_TOLERANCE**2)
+        )
+        rec[rows[keep]] = old[keep]
+        return rec[np.argsort(ids, kind="stable")]
+
+    def _fixed(
+        self,
+        kind: str,
+        table: EntityTable,
+        rows: list[int],
+        ids: list[int],
+    ) -> list[int]:
+        """Field a for the entities new this tick, in those table rows
+        with those ids; keeps asteroid outlines."""
+        entities = table.entities
+        if kind == "bullets":
+            return [max(table.owner[row], 0) for row in rows]
+        if kind == "ufos":
+            return [int(entities[row].small) for row in rows]
+        if kind == "ships":
+            return [entities[row].player_id for row in rows]
+        span = C.AST_POLY_JITTER_MAX - C.AST_POLY_JITTER_MIN
+        sizes = []
+        for row, asteroid_id in zip(rows, ids, strict=True):
+            asteroid = entities[row]
+            self._outlines[asteroid_id] = bytes(
+                round((p.length() / asteroid.r - C.AST_POLY_JITTER_MIN)
+                      / span * 255)
+                for p in asteroid.poly
+            )
+            sizes.append(SIZES.index(asteroid.size))
+        return sizes
+
+
+class DeltaDecoder:
+    """Client side of DeltaEncoder: rebuilds a State from each frame.
+
+    Keeps the States of the last NET_HISTORY ticks it decoded, since the
+    server may send a frame against any of them. Acknowledge self.ack
+    after each decode().
+    """
+
+    def __init__(self, history: int | None = None) -> None:
+        self.history = history or C.NET_HISTORY
+        self.ack: int | None = None
+        # Radius jitter per vertex, by asteroid id; see outline().
+        self.outlines: dict[int, bytes] = {}
+        self._states: dict[int, State] = {}
+
+    def decode(self, frame: bytes | memoryview) -> State:
+        """Apply a frame; raises ValueError if it is malformed or its
+        baseline is no longer (or was never) known here."""
+        frame = memoryview(frame)
+        try:
+            version, tick, baseline = HEADER.unpack_from(frame)
+            if version != VERSION:
+                raise ValueError(f"unsupported frame version: {version}")
+            base = None
+            if baseline != NO_BASELINE:
+                base = self._states.get(baseline)
+                if base is None:
+                    raise ValueError(f"unknown baseline tick: {baseline}")
+
+            offset = HEADER.size
+            records = {}
+            for kind in KINDS:
+                n_removed, n_sent = COUNTS.unpack_from(frame, offset)
+                offset += COUNTS.size
+                removed = np.frombuffer(frame, "<u4", n_removed, offset)
+                offset += removed.nbytes
+                sent = np.frombuffer(frame, RECORD, n_sent, offset)
+                offset += sent.nbytes
+                if base is None:
+                    merged = sent.copy()
+                else:
+                    old = base.records[kind]
+                    stale = np.isin(old["id"], removed)
+                    stale |= np.isin(old["id"], sent["id"])
+                    merged = np.concatenate((old[~stale], sent))
+                records[kind] = merged[np.argsort(merged["id"], kind="stable")]
+
+            (count,) = struct.unpack_from("<I", frame, offset)
+            offset += 4
+            for _ in range(count):
+                asteroid_id, vertices = OUTLINE.unpack_from(frame, offset)
+                offset += OUTLINE.size
+                self.outlines[asteroid_id] = bytes(
+                    frame[offset : offset + vertices]
+                )
+                offset += vertices
+        except struct.error as exc:
+            raise ValueError(f"truncated frame: {exc}") from None
+
+        state = State(tick, records)
+        self._states[tick] = state
+        for old_tick in [t for t in self._states if t <= tick - self.history]:
+            del self._states[old_tick]
+        self.ack = tick if self.ack is None else max(self.ack, tick)
+        live = len(records["asteroids"])
+        if len(self.outlines) > 2 * live + 64:
+            ids = records["asteroids"]["id"].tolist()
+            self.outlines = {i: self.outlines[i] for i in ids}
+        return state
+
+    def outline(self, record: np.void) -> list[tuple[float, float]]:
+        """An asteroid's vertices relative to its centre, from its record."""
+        size = SIZES[record["a"]]
+        r = C.AST_SIZES[size]["r"]
+        jitter = self.outlines[int(record["id"])]
+        span = C.AST_POLY_JITTER_MAX - C.AST_POLY_JITTER_MIN
+        step = 2 * math.pi / len(jitter)
+        points = []
+        for i, q in enumerate(jitter):
+            rr = r * (C.AST_POLY_JITTER_MIN + q / 255 * span)
+            points.append((rr * math.cos(i * step), rr * math.sin(i * step)))
+        return points
+
+
+def _columns(table: EntityTable) -> tuple[np.ndarray, ...]:
+    return tuple(
+        np.frombuffer(column)
+        for column in (table.x, table.y, table.vx, table.vy)
+    )
+
+
+def _quantizable(v: np.ndarray, extent: float) -> np.ndarray:
+    """Whether each coordinate along an axis of that extent fits a u2."""
+    top = min(
+        extent + C.NET_POS_MARGIN,
+        65535 * C.NET_POS_STEP - C.NET_POS_MARGIN,
+    )
+    return (v >= -C.NET_POS_MARGIN) & (v <= top)
+
+
+def _quantize(v: np.ndarray) -> np.ndarray:
+    return np.rint((v + C.NET_POS_MARGIN) / C.NET_POS_STEP)
+
+
+def _positions(records: np.ndarray, tick: int, kind: str) -> np.ndarray:
+    age = (tick - records["tick"].astype(np.int64)) / C.TICK_RATE
+    pos = np.empty((len(records), 2))
+    for axis, (p, v) in enumerate((("x", "vx"), ("y", "vy"))):
+        pos[:, axis] = records[p] * C.NET_POS_STEP - C.NET_POS_MARGIN
+        pos[:, axis] += records[v] * C.NET_VEL_STEP * age
+    if WRAPS[kind]:
+        pos %= (C.ARENA_WIDTH, C.ARENA_HEIGHT)
+    return pos
+
+
+def _match(
+    sorted_ids: np.ndarray, ids: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """For each of ids, its index in sorted_ids and whether it is there."""
+    if not len(sorted_ids):
+        return np.zeros(len(ids), np.intp), np.zeros(len(ids), bool)
+    idx = np.searchsorted(sorted_ids, ids)
+    idx[idx == len(sorted_ids)] = 0
+    return idx, sorted_ids[idx] == ids
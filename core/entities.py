@@ -1,13 +1,20 @@
-"""Game entities (sprites)."""
+"""Game entities."""
 
 import math
-from random import choice, random, uniform
-
-import pygame as pg
+import random
+from random import Random
 
 from core import config as C
 from core.commands import PlayerCommand
-from core.utils import Countdown, Vec, angle_to_vec, wrap_pos
+from core.pool import Pool
+from core.store import BulletTable, Entity
+from core.utils import (
+    Countdown,
+    Vec,
+    angle_to_vec,
+    integrate,
+    integrate_wrap,
+)
 
 PlayerId = int
 
@@ -24,36 +31,44 @@ def rotate_vec(v: Vec, deg: float) -> Vec:
     return Vec(v.x * c - v.y * s, v.x * s + v.y * c)
 
 
-class Particle(pg.sprite.Sprite):
-    """Short-lived debris particle for explosion effects. Non-interacting.
+def ufo_shot_dir(
+    small: bool,
+    pos: Vec,
+    target_pos: Vec,
+    rng: Random,
+) -> Vec | None:
+    """Direction of a UFO shot from pos at target_pos, jitter included.
 
-    Particles don't wrap the screen — they live ~1s and travel ≤200px,
-    so wrapping would teleport stray particles to the opposite edge
-    and look like a bug.
+    Big UFOs sometimes fire at random instead. None when the UFO sits on
+    its target. core.vecworld aims with this too, so its draws from rng
+    stay in step with UFO.try_fire().
     """
+    if not small and rng.random() < C.UFO_BIG_MISS_CHANCE:
+        ang = rng.uniform(0.0, 360.0)
+        dirv = Vec(
+            math.cos(math.radians(ang)),
+            math.sin(math.radians(ang)),
+        )
+    else:
+        to_target = target_pos - pos
+        if to_target.length_squared() < 1e-6:
+            return None
+        dirv = to_target.normalize()
 
-    def __init__(self, pos: Vec, vel: Vec, ttl: float) -> None:
-        super().__init__()
-        self.pos = Vec(pos)
-        self.vel = Vec(vel)
-        self.ttl = float(ttl)
-        self.rect = pg.Rect(int(pos.x), int(pos.y), 1, 1)
-
-    def update(self, dt: float) -> None:
-        self.pos += self.vel * dt
-        self.ttl -= dt
-        if self.ttl <= 0.0:
-            self.kill()
-            return
-        self.rect.center = (int(self.pos.x), int(self.pos.y))
+    jitter = C.UFO_AIM_JITTER_DEG_SMALL if small else C.UFO_AIM_JITTER_DEG_BIG
+    return rotate_vec(dirv, rng.uniform(-jitter, jitter))
 
 
-class Bullet(pg.sprite.Sprite):
+class Bullet(Entity):
     """Generic projectile.
 
     Bullets do not wrap the screen. Their range is bounded by TTL, so wrapping
     would let a shot fired at one edge instantly reappear on the opposite side
     and hit something the player never aimed at.
+
+    prev_pos is where the bullet was before its last update. Collisions test
+    the whole prev_pos -> pos segment, so a fast bullet cannot skip over a
+    small target when the simulation ticks slowly.
     """
 
     def __init__(
@@ -66,38 +81,62 @@ class Bullet(pg.sprite.Sprite):
         super().__init__()
         self.owner_id = owner_id
         self.pos = Vec(pos)
+        self.prev_pos = Vec(pos)
         self.vel = Vec(vel)
         self.ttl = float(ttl)
         self.r = int(C.BULLET_RADIUS)
-        self.rect = pg.Rect(0, 0, self.r * 2, self.r * 2)
+
+    def reset(
+        self,
+        owner_id: PlayerId,
+        pos: Vec,
+        vel: Vec,
+        ttl: float = C.BULLET_TTL,
+    ) -> None:
+        """Reinitialise in place when reused from a Pool."""
+        self.owner_id = owner_id
+        self.pos.update(pos)
+        self.prev_pos.update(pos)
+        self.vel.update(vel)
+        self.ttl = float(ttl)
 
     def update(self, dt: float) -> None:
-        self.pos += self.vel * dt
+        self.prev_pos.update(self.pos)
+        integrate(self.pos, self.vel, dt)
         self.ttl -= dt
         if self.ttl <= 0.0:
             self.kill()
-            return
-        self.rect.center = (int(self.pos.x), int(self.pos.y))
 
 
-class Asteroid(pg.sprite.Sprite):
-    """Asteroid with irregular polygon shape."""
+class Asteroid(Entity):
+    """Asteroid with irregular polygon shape.
+
+    The outline's jitter comes from rng (the World's generator; the global
+    random module when None).
+    """
 
-    def __init__(self, pos: Vec, vel: Vec, size: str) -> None:
+    def __init__(
+        self,
+        pos: Vec,
+        vel: Vec,
+        size: str,
+        rng: Random | None = None,
+    ) -> None:
         super().__init__()
         self.pos = Vec(pos)
         self.vel = Vec(vel)
         self.size = size
         self.r = int(C.AST_SIZES[size]["r"])
-        self.poly = self._make_poly()
-        self.rect = pg.Rect(0, 0, self.r * 2, self.r * 2)
+        self.poly = self._make_poly(rng or random)
 
-    def _make_poly(self) -> list[Vec]:
+    def _make_poly(self, rng: Random) -> list[Vec]:
         steps = C.AST_POLY_STEPS[self.size]
         pts: list[Vec] = []
         for i in range(steps):
             ang = i * (360 / steps)
-            jitter = uniform(C.AST_POLY_JITTER_MIN, C.AST_POLY_JITTER_MAX)
+            jitter = rng.uniform(
+                C.AST_POLY_JITTER_MIN, C.AST_POLY_JITTER_MAX
+            )
             rr = self.r * jitter
             v = Vec(
                 math.cos(math.radians(ang)),
@@ -107,12 +146,10 @@ class Asteroid(pg.sprite.Sprite):
         return pts
 
     def update(self, dt: float) -> None:
-        self.pos += self.vel * dt
-        self.pos = wrap_pos(self.pos)
-        self.rect.center = (int(self.pos.x), int(self.pos.y))
+        integrate_wrap(self.pos, self.vel, dt)
 
 
-class Ship(pg.sprite.Sprite):
+class Ship(Entity):
     """Ship controlled by command (does not read keyboard)."""
 
     def __init__(self, player_id: PlayerId, pos: Vec) -> None:
@@ -127,13 +164,16 @@ class Ship(pg.sprite.Sprite):
         self.shield = Countdown()
         self.shield_cd = Countdown()
         self.r = int(C.SHIP_RADIUS)
-        self.rect = pg.Rect(0, 0, self.r * 2, self.r * 2)
+        # Scratch vectors reused by apply_command() and ship_points().
+        self._dir = Vec()
+        self._points = (Vec(), Vec(), Vec())
 
     def apply_command(
         self,
         cmd: PlayerCommand,
         dt: float,
-        bullets: pg.sprite.Group,
+        bullets: BulletTable,
+        pool: Pool | None = None,
     ) -> "Bullet | None":
         if cmd.rotate_left and not cmd.rotate_right:
             self.angle -= C.SHIP_TURN_SPEED * dt
@@ -141,25 +181,26 @@ class Ship(pg.sprite.Sprite):
             self.angle += C.SHIP_TURN_SPEED * dt
 
         if cmd.thrust:
-            self.vel += angle_to_vec(self.angle) * C.SHIP_THRUST * dt
+            dirv = angle_to_vec(self.angle, self._dir)
+            self.vel.x += dirv.x * C.SHIP_THRUST * dt
+            self.vel.y += dirv.y * C.SHIP_THRUST * dt
 
-        self.vel *= C.SHIP_FRICTION
+        self.vel *= C.SHIP_FRICTION ** (dt * C.FPS)
 
         if cmd.shoot:
-            return self._try_fire(bullets)
+            return self._try_fire(bullets, pool)
 
         return None
 
-    def _try_fire(self, bullets: pg.sprite.Group) -> "Bullet | None":
+    def _try_fire(
+        self,
+        bullets: BulletTable,
+        pool: Pool | None = None,
+    ) -> "Bullet | None":
         if self.cool.active:
             return None
 
-        count = 0
-        for bullet in bullets:
-            if bullet.owner_id == self.player_id:
-                count += 1
-
-        if count >= C.MAX_BULLETS_PER_PLAYER:
+        if bullets.count(self.player_id) >= C.MAX_BULLETS_PER_PLAYER:
             return None
 
         dirv = angle_to_vec(self.angle)
@@ -167,11 +208,12 @@ class Ship(pg.sprite.Sprite):
         vel = self.vel + dirv * C.SHIP_BULLET_SPEED
 
         self.cool.reset(C.SHIP_FIRE_RATE)
-        return Bullet(self.player_id, pos, vel, ttl=C.BULLET_TTL)
+        make = pool.acquire if pool is not None else Bullet
+        return make(self.player_id, pos, vel, C.BULLET_TTL)
 
     def hyperspace(self, pos: Vec) -> None:
         """Teleport to the given position; caller picks a safe spot."""
-        self.pos = Vec(pos)
+        self.pos.update(pos)
         self.vel.xy = (0, 0)
         self.invuln.reset(C.SAFE_SPAWN_TIME)
 
@@ -189,32 +231,46 @@ class Ship(pg.sprite.Sprite):
         self.shield.tick(dt)
         self.shield_cd.tick(dt)
 
-        self.pos += self.vel * dt
-        self.pos = wrap_pos(self.pos)
-        self.rect.center = (int(self.pos.x), int(self.pos.y))
+        integrate_wrap(self.pos, self.vel, dt)
 
     def ship_points(self) -> tuple[Vec, Vec, Vec]:
-        """Return the 3 vertices of the ship triangle."""
-        dirv = angle_to_vec(self.angle)
-        left = angle_to_vec(self.angle + C.SHIP_NOSE_ANGLE)
-        right = angle_to_vec(self.angle - C.SHIP_NOSE_ANGLE)
-
-        p1 = self.pos + dirv * self.r
-        p2 = self.pos + left * self.r * C.SHIP_NOSE_SCALE
-        p3 = self.pos + right * self.r * C.SHIP_NOSE_SCALE
-        return p1, p2, p3
-
-
-class UFO(pg.sprite.Sprite):
-    """UFO with two movement behaviors and shooting."""
+        """Return the 3 vertices of the ship triangle.
+
+        The vectors are reused by the next call; copy them to keep them.
+        """
+        p1, p2, p3 = self._points
+        pos = self.pos
+        r = self.r
+        scale = C.SHIP_NOSE_SCALE
+
+        dirv = angle_to_vec(self.angle, self._dir)
+        p1.x = pos.x + dirv.x * r
+        p1.y = pos.y + dirv.y * r
+        left = angle_to_vec(self.angle + C.SHIP_NOSE_ANGLE, self._dir)
+        p2.x = pos.x + left.x * r * scale
+        p2.y = pos.y + left.y * r * scale
+        right = angle_to_vec(self.angle - C.SHIP_NOSE_ANGLE, self._dir)
+        p3.x = pos.x + right.x * r * scale
+        p3.y = pos.y + right.y * r * scale
+        return self._points
+
+
+class UFO(Entity):
+    """UFO with two movement behaviors and shooting.
+
+    Its heading, crossing path and aim all draw from rng (the World's
+    generator; the global random module when None).
+    """
 
     def __init__(
         self,
         pos: Vec,
         small: bool,
         target_pos: Vec | None = None,
+        rng: Random | None = None,
     ) -> None:
         super().__init__()
+        self._rng = rng or random
         self.small = small
         cfg = C.UFO_SMALL if small else C.UFO_BIG
         self.r = int(cfg["r"])
@@ -229,13 +285,15 @@ class UFO(pg.sprite.Sprite):
 
         if self.small:
             self._lock_small_move_dir(target_pos)
+            # Moving from the start, so the velocity column and
+            # observations see it before the first update.
+            self.vel = self.move_dir * self.speed
 
         self._setup_crossing_if_needed()
-        self.rect = pg.Rect(0, 0, self.r * 2, self.r * 2)
 
     def _lock_small_move_dir(self, target_pos: Vec | None) -> None:
         if target_pos is None:
-            ang = uniform(0.0, 360.0)
+            ang = self._rng.uniform(0.0, 360.0)
             self.move_dir = Vec(
                 math.cos(math.radians(ang)),
                 math.sin(math.radians(ang)),
@@ -244,7 +302,7 @@ class UFO(pg.sprite.Sprite):
 
         to_target = Vec(target_pos) - self.pos
         if to_target.length_squared() < 1e-6:
-            ang = uniform(0.0, 360.0)
+            ang = self._rng.uniform(0.0, 360.0)
             self.move_dir = Vec(
                 math.cos(math.radians(ang)),
                 math.sin(math.radians(ang)),
@@ -257,29 +315,29 @@ class UFO(pg.sprite.Sprite):
         if self.small:
             return
 
-        mode = choice(["h", "v", "d"])
+        mode = self._rng.choice(["h", "v", "d"])
         if mode == "h":
-            y = uniform(0, C.HEIGHT)
-            left_to_right = uniform(0, 1) < 0.5
-            self.pos = Vec(0 if left_to_right else C.WIDTH, y)
+            y = self._rng.uniform(0, C.ARENA_HEIGHT)
+            left_to_right = self._rng.uniform(0, 1) < 0.5
+            self.pos = Vec(0 if left_to_right else C.ARENA_WIDTH, y)
             self.vel = Vec(1 if left_to_right else -1, 0) * self.speed
             return
 
         if mode == "v":
-            x = uniform(0, C.WIDTH)
-            top_to_bottom = uniform(0, 1) < 0.5
-            self.pos = Vec(x, 0 if top_to_bottom else C.HEIGHT)
+            x = self._rng.uniform(0, C.ARENA_WIDTH)
+            top_to_bottom = self._rng.uniform(0, 1) < 0.5
+            self.pos = Vec(x, 0 if top_to_bottom else C.ARENA_HEIGHT)
             self.vel = Vec(0, 1 if top_to_bottom else -1) * self.speed
             return
 
         corners = [
             Vec(0, 0),
-            Vec(C.WIDTH, 0),
-            Vec(0, C.HEIGHT),
-            Vec(C.WIDTH, C.HEIGHT),
+            Vec(C.ARENA_WIDTH, 0),
+            Vec(0, C.ARENA_HEIGHT),
+            Vec(C.ARENA_WIDTH, C.ARENA_HEIGHT),
         ]
-        start = choice(corners)
-        target = Vec(C.WIDTH - start.x, C.HEIGHT - start.y)
+        start = self._rng.choice(corners)
+        target = Vec(C.ARENA_WIDTH - start.x, C.ARENA_HEIGHT - start.y)
         self.pos = Vec(start)
         dirv = target - start
         if dirv.length_squared() > 0:
@@ -294,52 +352,35 @@ class UFO(pg.sprite.Sprite):
         else:
             self._update_cross(dt)
 
-        self.rect.center = (int(self.pos.x), int(self.pos.y))
-
     def _update_pursue(self, dt: float) -> None:
         if self.move_dir is not None:
-            self.vel = self.move_dir * self.speed
+            self.vel.x = self.move_dir.x * self.speed
+            self.vel.y = self.move_dir.y * self.speed
 
-        self.pos += self.vel * dt
+        integrate(self.pos, self.vel, dt)
         self._kill_if_outside_screen()
 
     def _update_cross(self, dt: float) -> None:
-        self.pos += self.vel * dt
+        integrate(self.pos, self.vel, dt)
         self._kill_if_outside_screen()
 
     def _kill_if_outside_screen(self) -> None:
         margin = self.r
-        out_x = self.pos.x < -margin or self.pos.x > C.WIDTH + margin
-        out_y = self.pos.y < -margin or self.pos.y > C.HEIGHT + margin
+        out_x = self.pos.x < -margin or self.pos.x > C.ARENA_WIDTH + margin
+        out_y = self.pos.y < -margin or self.pos.y > C.ARENA_HEIGHT + margin
         if out_x or out_y:
             self.kill()
 
-    def try_fire(self) -> "Bullet | None":
+    def try_fire(self, pool: Pool | None = None) -> "Bullet | None":
         if self.cool.active:
             return None
 
-        target_pos = self.target_pos
-        if target_pos is None:
+        if self.target_pos is None:
             return None
 
-        if not self.small and random() < C.UFO_BIG_MISS_CHANCE:
-            ang = uniform(0.0, 360.0)
-            dirv = Vec(
-                math.cos(math.radians(ang)),
-                math.sin(math.radians(ang)),
-            )
-        else:
-            to_target = target_pos - self.pos
-            if to_target.length_squared() < 1e-6:
-                return None
-            dirv = to_target.normalize()
-
-        jitter = (
-            C.UFO_AIM_JITTER_DEG_SMALL
-            if self.small
-            else C.UFO_AIM_JITTER_DEG_BIG
-        )
-        dirv = rotate_vec(dirv, uniform(-jitter, jitter))
+        dirv = ufo_shot_dir(self.small, self.pos, self.target_pos, self._rng)
+        if dirv is None:
+            return None
 
         vel = dirv * C.UFO_BULLET_SPEED
         ttl = float(C.UFO_BULLET_TTL)
@@ -347,4 +388,5 @@ class UFO(pg.sprite.Sprite):
         rate = C.UFO_FIRE_RATE_SMALL if self.small else C.UFO_FIRE_RATE_BIG
         self.cool.reset(rate)
 
-        return Bullet(UFO_BULLET_OWNER, self.pos, vel, ttl=ttl)
+        make = pool.acquire if pool is not None else Bullet
+        return make(UFO_BULLET_OWNER, self.pos, vel, ttl)
@@ -0,0 +1,341 @@
+"""Gym-style environments over the simulation, for training agents.
+
+AsteroidsEnv wraps one World: reset(seed) returns an observation and
+step(action) returns (observation, reward, done, info), as in the classic
+gym API. VecEnv steps many games per call on a core.vecworld.VecWorld and
+returns batched arrays, resetting finished games as it goes.
+
+An action is a packed command byte (core.commands), so the N_ACTIONS
+discrete actions cover every PlayerCommand; COMMANDS[action] is the
+command it stands for. The reward is the score gained during the step
+and done is game over.
+
+An observation is a float32 vector: the ship's own state, then the
+nearest OBS_ASTEROIDS asteroids, OBS_BULLETS bullets and OBS_UFOS UFOs
+(core.config), each relative to the ship across the wrapped arena, with a
+presence flag so empty slots read as zeros. Both environments fill it
+from array columns (EntityTable's or VecWorld's) into preallocated
+buffers, without building per-entity Python objects.
+"""
+
+import numpy as np
+
+from core import config as C
+from core.commands import PlayerCommand
+from core.entities import UFO_BULLET_OWNER
+from core.vecworld import VecWorld
+from core.world import World
+
+N_ACTIONS = 64
+COMMANDS = tuple(PlayerCommand.from_bits(bits) for bits in range(N_ACTIONS))
+
+# x, y, vx, vy, cos and sin of the heading, shield up, shield ready,
+# invulnerable, gun ready, lives.
+SHIP_FEATURES = 11
+# Per slot: present, dx, dy, vx, vy, then the radius (asteroids and UFOs)
+# or whether a UFO fired it (bullets).
+SLOT_FEATURES = 6
+
+
+def observation_size(
+    asteroids: int | None = None,
+    bullets: int | None = None,
+    ufos: int | None = None,
+) -> int:
+    slots = (
+        (asteroids or C.OBS_ASTEROIDS)
+        + (bullets or C.OBS_BULLETS)
+        + (ufos or C.OBS_UFOS)
+    )
+    return SHIP_FEATURES + SLOT_FEATURES * slots
+
+
+class _Encoder:
+    """Writes observations for n ships into a preallocated (n, size) array.
+
+    Inputs are batched: ship arrays are (n, ...) and each entity kind comes
+    as (n, rows, ...) arrays plus a (n, rows) mask of live rows.
+    """
+
+    def __init__(self, n: int) -> None:
+        self.slots = (C.OBS_ASTEROIDS, C.OBS_BULLETS, C.OBS_UFOS)
+        self.size = observation_size(*self.slots)
+        self.obs = np.zeros((n, self.size), dtype=np.float32)
+        self._row_index = np.arange(n)[:, None]
+        self._half = np.array([C.ARENA_WIDTH / 2, C.ARENA_HEIGHT / 2])
+        self._arena = np.array(
+            [C.ARENA_WIDTH, C.ARENA_HEIGHT], dtype=np.float64
+        )
+        self._speed = float(C.SHIP_BULLET_SPEED)
+        self.radius = float(max(s["r"] for s in C.AST_SIZES.values()))
+
+    def ship(
+        self,
+        pos: np.ndarray,
+        vel: np.ndarray,
+        angle: np.ndarray,
+        flags: np.ndarray,
+        lives: np.ndarray,
+    ) -> None:
+        """Fill the ship features; flags is (n, 4) booleans (shield up,
+        shield ready, invulnerable, gun ready)."""
+        out = self.obs
+        rad = np.radians(angle)
+        out[:, 0:2] = pos / self._arena
+        out[:, 2:4] = vel / self._speed
+        out[:, 4] = np.cos(rad)
+        out[:, 5] = np.sin(rad)
+        out[:, 6:10] = flags
+        out[:, 10] = lives / C.START_LIVES
+
+    def nearest(
+        self,
+        kind: int,
+        ship_pos: np.ndarray,
+        pos: np.ndarray,
+        vel: np.ndarray,
+        extra: np.ndarray,
+        live: np.ndarray,
+    ) -> None:
+        """Fill kind's slots (0 asteroids, 1 bullets, 2 UFOs), nearest
+        first."""
+        k = self.slots[kind]
+        lo = SHIP_FEATURES + SLOT_FEATURES * sum(self.slots[:kind])
+        view = self.obs[:, lo : lo + SLOT_FEATURES * k]
+        view[:] = 0.0
+        rows = pos.shape[1]
+        if rows == 0 or k == 0:
+            return
+
+        # Offsets to the nearest image across the wrapped edges.
+        delta = pos - ship_pos[:, None]
+        delta = (delta + self._half) % self._arena - self._half
+        d_sq = np.where(live, (delta * delta).sum(axis=-1), np.inf)
+        ri = self._row_index
+        if rows > k:
+            pick = np.argpartition(d_sq, k - 1, axis=1)[:, :k]
+            pick = pick[ri, np.argsort(d_sq[ri, pick], axis=1)]
+        else:
+            pick = np.argsort(d_sq, axis=1)
+
+        present = np.isfinite(d_sq[ri, pick])
+        slots = view.reshape(len(pos), k, SLOT_FEATURES)
+        taken = slots[:, : pick.shape[1]]
+        taken[..., 0] = present
+        taken[..., 1:3] = delta[ri, pick] / self._half
+        taken[..., 3:5] = vel[ri, pick] / self._speed
+        taken[..., 5] = extra[ri, pick]
+        taken[~present] = 0.0
+
+
+class AsteroidsEnv:
+    """One World behind reset()/step(), playing as the local player.
+
+    The observation array is reused by the next reset() or step(); copy it
+    to keep it.
+    """
+
+    n_actions = N_ACTIONS
+
+    def __init__(self, dt: float | None = None) -> None:
+        self.dt = dt or 1.0 / C.FPS
+        self.player_id = C.LOCAL_PLAYER_ID
+        self.world: World | None = None
+        self._encoder = _Encoder(1)
+        self.observation_size = self._encoder.size
+        self._score = 0
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """Start a new game; a seed makes it reproducible.
+
+        Without one, the first game seeds from C.RANDOM_SEED and later ones
+        continue the current world's generator.
+        """
+        if seed is not None or self.world is None:
+            self.world = World(seed)
+        else:
+            self.world.reset()
+        self._score = 0
+        return self._observe()
+
+    def step(
+        self,
+        action: int | PlayerCommand,
+    ) -> tuple[np.ndarray, float, bool, dict[str, int]]:
+        world = self.world
+        if world is None:
+            raise RuntimeError("call reset() before step()")
+        if not isinstance(action, PlayerCommand):
+            action = COMMANDS[action]
+        world.update(self.dt, {self.player_id: action})
+
+        pid = self.player_id
+        score = world.scores[pid]
+        reward = float(score - self._score)
+        self._score = score
+        info = {"score": score, "lives": world.lives[pid], "wave": world.wave}
+        return self._observe(), reward, world.game_over, info
+
+    def _observe(self) -> np.ndarray:
+        world = self.world
+        ship = world.ships[self.player_id]
+        encoder = self._encoder
+        ship_pos = np.array([[ship.pos.x, ship.pos.y]])
+        encoder.ship(
+            ship_pos,
+            np.array([[ship.vel.x, ship.vel.y]]),
+            np.array([ship.angle]),
+            np.array(
+                [
+                    [
+                        ship.shield.active,
+                        not ship.shield_cd.active,
+                        ship.invuln.active,
+                        not ship.cool.active,
+                    ]
+                ]
+            ),
+            np.array([world.lives[self.player_id]]),
+        )
+
+        asteroids, bullets, ufos = world.asteroids, world.bullets, world.ufos
+        encoder.nearest(
+            0,
+            ship_pos,
+            _columns(asteroids.x, asteroids.y),
+            _columns(asteroids.vx, asteroids.vy),
+            np.frombuffer(asteroids.r)[None] / encoder.radius,
+            np.ones((1, len(asteroids)), dtype=bool),
+        )
+        encoder.nearest(
+            1,
+            ship_pos,
+            _columns(bullets.x, bullets.y),
+            _columns(bullets.vx, bullets.vy),
+            np.frombuffer(bullets.owner, dtype=np.int64)[None]
+            == UFO_BULLET_OWNER,
+            np.ones((1, len(bullets)), dtype=bool),
+        )
+        encoder.nearest(
+            2,
+            ship_pos,
+            _columns(ufos.x, ufos.y),
+            _columns(ufos.vx, ufos.vy),
+            np.frombuffer(ufos.r)[None] / encoder.radius,
+            np.ones((1, len(ufos)), dtype=bool),
+        )
+        return encoder.obs[0]
+
+
+def _columns(xs: object, ys: object) -> np.ndarray:
+    """Two table columns as a (1, rows, 2) array (a copy)."""
+    out = np.empty((1, len(xs), 2))
+    out[0, :, 0] = xs
+    out[0, :, 1] = ys
+    return out
+
+
+class VecEnv:
+    """num_envs single-player games stepped together on a VecWorld.
+
+    step() takes one action per game and returns (observations, rewards,
+    dones, info) as arrays. A game that ends is reset right away, so its
+    row of the returned observations is already the new game's first;
+    rewards, dones and info still describe the step that ended it. The
+    returned arrays are reused by the next call; copy them to keep them.
+    """
+
+    n_actions = N_ACTIONS
+
+    def __init__(self, num_envs: int, dt: float | None = None) -> None:
+        self.num_envs = num_envs
+        self.dt = dt or 1.0 / C.FPS
+        self.sim: VecWorld | None = None
+        self._encoder = _Encoder(num_envs)
+        self.observation_size = self._encoder.size
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._commands = np.zeros((num_envs, 1), dtype=np.uint8)
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """Start every game over; game i is seeded with seed + i."""
+        if seed is not None or self.sim is None:
+            seeds = None
+            if seed is not None:
+                seeds = range(seed, seed + self.num_envs)
+            self.sim = VecWorld(self.num_envs, seeds)
+        else:
+            self.sim.reset()
+        return self._observe()
+
+    def step(
+        self,
+        actions: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+        sim = self.sim
+        if sim is None:
+            raise RuntimeError("call reset() before step()")
+        self._commands[:, 0] = actions
+        before = sim.scores[:, 0].copy()
+        sim.step(self.dt, self._commands)
+
+        scores = sim.scores[:, 0]
+        np.subtract(scores, before, out=self._rewards, casting="unsafe")
+        dones = sim.game_over.copy()
+        info = {
+            "score": scores.copy(),
+            "lives": sim.lives[:, 0].copy(),
+            "wave": sim.wave.copy(),
+        }
+        if dones.any():
+            sim.reset(np.flatnonzero(dones).tolist())
+        return self._observe(), self._rewards, dones, info
+
+    def _observe(self) -> np.ndarray:
+        sim = self.sim
+        encoder = self._encoder
+        ship_pos = sim.ship_pos[:, 0]
+        encoder.ship(
+            ship_pos,
+            sim.ship_vel[:, 0],
+            sim.ship_angle[:, 0],
+            np.stack(
+                (
+                    sim.shield[:, 0] > 0.0,
+                    sim.shield_cd[:, 0] <= 0.0,
+                    sim.invuln[:, 0] > 0.0,
+                    sim.ship_cool[:, 0] <= 0.0,
+                ),
+                axis=-1,
+            ),
+            sim.lives[:, 0],
+        )
+
+        asteroids, bullets, ufos = sim.asteroids, sim.bullets, sim.ufos
+        n = int(asteroids.count.max())
+        encoder.nearest(
+            0,
+            ship_pos,
+            asteroids.pos[:, :n],
+            asteroids.vel[:, :n],
+            sim.ast_radius[asteroids.size[:, :n]] / encoder.radius,
+            asteroids.rows()[:, :n],
+        )
+        n = int(bullets.count.max())
+        encoder.nearest(
+            1,
+            ship_pos,
+            bullets.pos[:, :n],
+            bullets.vel[:, :n],
+            bullets.owner[:, :n] == UFO_BULLET_OWNER,
+            bullets.rows()[:, :n],
+        )
+        n = int(ufos.count.max())
+        encoder.nearest(
+            2,
+            ship_pos,
+            ufos.pos[:, :n],
+            ufos.vel[:, :n],
+            ufos.r[:, :n] / encoder.radius,
+            ufos.rows()[:, :n],
+        )
+        return encoder.obs
@@ -0,0 +1,178 @@
+"""Typed game events.
+
+World reports what happened each frame (shots, explosions, pickups) as
+EventKind codes with a small fixed payload, written into an EventStream
+that is reused every frame. Clients read it to play sounds and effects.
+
+The stream still reads like the old list[str]: iterating it yields the
+event names ("player_shoot", "asteroid_explosion", ...), and `in` and
+append() accept names too.
+"""
+
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from enum import IntEnum
+from typing import NamedTuple
+
+from core import config as C
+from core.utils import Vec
+
+
+class EventKind(IntEnum):
+    PLAYER_SHOOT = 0
+    UFO_SHOOT = 1
+    ASTEROID_EXPLOSION = 2
+    # Ship or UFO destroyed; both play the same sound.
+    SHIP_EXPLOSION = 3
+    SHIELD_ON = 4
+    EXTRA_LIFE = 5
+
+    @property
+    def label(self) -> str:
+        """The event's legacy string name, e.g. "player_shoot"."""
+        return _LABELS[self]
+
+    @classmethod
+    def parse(cls, event: "EventKind | str") -> "EventKind":
+        """Accept an EventKind or its legacy string name."""
+        if isinstance(event, str):
+            return cls[event.upper()]
+        return cls(event)
+
+
+_LABELS = {kind: kind.name.lower() for kind in EventKind}
+
+
+class Event(NamedTuple):
+    """One event with its payload.
+
+    owner is the PlayerId involved (UFO_BULLET_OWNER for UFOs, 0 when
+    nobody is) and size the radius of the entity involved, or 0.
+    """
+
+    kind: EventKind
+    x: float
+    y: float
+    owner: int
+    size: int
+
+
+Handler = Callable[[Event], object]
+
+
+class EventStream:
+    """Fixed-capacity ring buffer of one frame's events.
+
+    Payloads live in parallel typed columns, so emitting an event stores a
+    few numbers and allocates nothing. clear() empties the buffer for the
+    next frame. If a frame emits more than `capacity` events, the oldest
+    are overwritten and counted in `dropped`.
+
+    Consumers either read the stream (records(), kinds(), of_kind()) or
+    subscribe() a handler per kind and call dispatch() once per frame.
+    """
+
+    def __init__(self, capacity: int | None = None) -> None:
+        self.capacity = capacity or C.EVENT_CAPACITY
+        self.kind = array("B", bytes(self.capacity))
+        self.x = array("d", bytes(8 * self.capacity))
+        self.y = array("d", bytes(8 * self.capacity))
+        self.owner = array("q", bytes(8 * self.capacity))
+        self.size = array("H", bytes(2 * self.capacity))
+        self.dropped = 0
+        self._start = 0
+        self._count = 0
+        self._handlers: dict[EventKind, list[Handler]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __iter__(self) -> Iterator[str]:
+        """Legacy view: the event names, oldest first."""
+        for kind in self.kinds():
+            yield kind.label
+
+    def __contains__(self, event: object) -> bool:
+        if isinstance(event, str | int):
+            return EventKind.parse(event) in self.kinds()
+        return False
+
+    def clear(self) -> None:
+        self._start = 0
+        self._count = 0
+        self.dropped = 0
+
+    def emit(
+        self,
+        kind: EventKind,
+        pos: Vec | None = None,
+        owner: int = 0,
+        size: int = 0,
+    ) -> None:
+        if self._count == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+            self._count -= 1
+            self.dropped += 1
+        i = (self._start + self._count) % self.capacity
+        self.kind[i] = kind
+        if pos is None:
+            self.x[i] = 0.0
+            self.y[i] = 0.0
+        else:
+            self.x[i] = pos.x
+            self.y[i] = pos.y
+        self.owner[i] = owner
+        self.size[i] = size
+        self._count += 1
+
+    def append(self, event: EventKind | str) -> None:
+        """Legacy emit by name, with no payload."""
+        self.emit(EventKind.parse(event))
+
+    def extend(self, events: Iterable[EventKind | str]) -> None:
+        for event in events:
+            self.append(event)
+
+    def kinds(self) -> Iterator[EventKind]:
+        """The events' kinds, oldest first."""
+        for i in self._indices():
+            yield EventKind(self.kind[i])
+
+    def records(self) -> Iterator[Event]:
+        """The events with their payloads, oldest first."""
+        for i in self._indices():
+            yield Event(
+                EventKind(self.kind[i]),
+                self.x[i],
+                self.y[i],
+                self.owner[i],
+                self.size[i],
+            )
+
+    def of_kind(self, kind: EventKind) -> Iterator[Event]:
+        return (event for event in self.records() if event.kind == kind)
+
+    def subscribe(self, kind: EventKind, handler: Handler) -> None:
+        """Call handler(event) for every event of kind on dispatch()."""
+        self._handlers.setdefault(kind, []).append(handler)
+
+    def unsubscribe(self, kind: EventKind, handler: Handler) -> None:
+        self._handlers.get(kind, []).remove(handler)
+
+    def dispatch(self) -> None:
+        """Hand this frame's events to the subscribed handlers."""
+        handlers = self._handlers
+        if not handlers:
+            return
+        for event in self.records():
+            for handler in handlers.get(event.kind, ()):
+                handler(event)
+
+    def _indices(self) -> Iterator[int]:
+        start = self._start
+        capacity = self.capacity
+        for n in range(self._count):
+            yield (start + n) % capacity
@@ -0,0 +1,231 @@
+"""Run the simulation without a display.
+
+Usage: python -m core.headless [--frames N] [--dt 1/60] [--policy NAME]
+                               [--players N] [--seed N] [--until-game-over]
+                               [--record FILE]
+       python -m core.headless --replay FILE [--seek TICK] [--frames N]
+                               [--verify]
+
+Steps World.update() as fast as it goes, with commands from a policy in
+core.bots ("idle" sends empty commands), then prints ticks per second and
+the mean time of each World.update() phase. --record also writes the
+session to a core.replay file; --replay plays one back instead of a
+policy, from tick --seek, so a recorded slowdown or crash reproduces
+exactly. Nothing here touches the pygame display, mixer or clock, so it
+runs on display-less servers.
+"""
+
+import argparse
+import os
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from fractions import Fraction
+
+from core import config as C
+from core.bots import POLICIES, PolicyFactory
+from core.events import Event, EventKind
+from core.profiling import PhaseTimer
+from core.replay import ReplayPlayer, ReplayWriter, read
+from core.world import World
+
+
+@dataclass
+class RunStats:
+    """What a headless run did, and how fast."""
+
+    frames: int = 0
+    wall: float = 0.0
+    score: int = 0
+    waves: int = 0
+    deaths: int = 0
+    game_overs: int = 0
+    phases: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ticks_per_sec(self) -> float:
+        return self.frames / self.wall if self.wall > 0.0 else 0.0
+
+
+def run(
+    frames: int,
+    dt: float = 1.0 / C.FPS,
+    policy: str | PolicyFactory = "idle",
+    players: int = 1,
+    seed: int | None = None,
+    until_game_over: bool = False,
+    record: str | os.PathLike[str] | None = None,
+) -> RunStats:
+    """Step a fresh World `frames` times and return its RunStats.
+
+    policy is a name from core.bots.POLICIES or a factory that takes a
+    seed and returns a policy; each player gets its own. After a game over
+    the world is reset and play goes on, unless until_game_over is set.
+    score and deaths add up over every game; waves is the highest wave
+    reached. With record, the session is also written to that replay file.
+    """
+    if isinstance(policy, str):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy: {policy!r}")
+        policy = POLICIES[policy]
+    player_ids = list(range(C.LOCAL_PLAYER_ID, C.LOCAL_PLAYER_ID + players))
+    policies = {
+        pid: policy(None if seed is None else seed + pid)
+        for pid in player_ids
+    }
+
+    stats = RunStats()
+    world = World(seed)
+    world.timer = timer = PhaseTimer()
+    _count_deaths(world, stats)
+
+    def join_players() -> None:
+        for pid in player_ids:
+            if world.get_ship(pid) is None:
+                world.spawn_player(pid)
+
+    join_players()
+    with ExitStack() as stack:
+        recorder = None
+        if record is not None:
+            file = stack.enter_context(open(record, "wb"))
+            recorder = ReplayWriter(file, world, tuple(player_ids))
+        start = time.perf_counter()
+        for _ in range(frames):
+            commands = {pid: policies[pid](world, pid) for pid in player_ids}
+            if recorder is not None:
+                recorder.record(world, dt, commands)
+            world.update(dt, commands)
+            world.events.dispatch()
+            stats.frames += 1
+            stats.waves = max(stats.waves, world.wave)
+            if world.game_over:
+                stats.game_overs += 1
+                stats.score += sum(world.scores.values())
+                if until_game_over:
+                    break
+                world.reset()
+                join_players()
+                if recorder is not None:
+                    recorder.resync()
+        stats.wall = time.perf_counter() - start
+
+    if not world.game_over:
+        stats.score += sum(world.scores.values())
+    stats.phases = timer.per_frame()
+    return stats
+
+
+def play(
+    path: str | os.PathLike[str],
+    start: int = 0,
+    frames: int | None = None,
+    verify: bool = False,
+) -> tuple[RunStats, float]:
+    """Play a replay file back as fast as it goes, from tick start, for at
+    most frames ticks; returns its RunStats and the mean dt played.
+
+    score is the final world's; with verify, a divergence from the
+    recorded keyframes raises RuntimeError.
+    """
+    player = ReplayPlayer(read(path), verify=verify)
+    player.seek(start)
+    world = player.world
+    world.timer = timer = PhaseTimer()
+    stats = RunStats()
+    _count_deaths(world, stats)
+
+    sim_time = 0.0
+    dts = player.replay.dts
+    begin = time.perf_counter()
+    while (frames is None or stats.frames < frames) and not player.done:
+        sim_time += dts[player.tick]
+        was_over = world.game_over
+        player.step()
+        world.events.dispatch()
+        stats.frames += 1
+        stats.waves = max(stats.waves, world.wave)
+        if world.game_over and not was_over:
+            stats.game_overs += 1
+    stats.wall = time.perf_counter() - begin
+
+    stats.score = sum(world.scores.values())
+    stats.phases = timer.per_frame()
+    return stats, sim_time / max(stats.frames, 1)
+
+
+def _count_deaths(world: World, stats: RunStats) -> None:
+    def on_explosion(event: Event) -> None:
+        if event.owner > 0:
+            stats.deaths += 1
+
+    world.events.subscribe(EventKind.SHIP_EXPLOSION, on_explosion)
+
+
+def report(stats: RunStats, dt: float) -> str:
+    sim_time = stats.frames * dt
+    lines = [
+        f"frames {stats.frames}  dt {dt:.6f}  sim {sim_time:.1f} s"
+        f"  wall {stats.wall:.3f} s",
+        f"{stats.ticks_per_sec:.0f} ticks/s"
+        f" ({sim_time / stats.wall if stats.wall else 0.0:.1f}x real time)",
+        "",
+        f"{'phase':<12}{'ms/frame':>10}{'share':>8}",
+    ]
+    total = sum(stats.phases.values()) or 1.0
+    for phase, seconds in stats.phases.items():
+        lines.append(
+            f"{phase:<12}{seconds * 1000:10.4f}{seconds / total:8.1%}"
+        )
+    lines += [
+        "",
+        f"score {stats.score}  best wave {stats.waves}"
+        f"  deaths {stats.deaths}  game overs {stats.game_overs}",
+    ]
+    return "\n".join(lines)
+
+
+def parse_dt(text: str) -> float:
+    """Seconds per tick, as a decimal or a fraction such as 1/60."""
+    dt = float(Fraction(text))
+    if dt <= 0.0:
+        raise argparse.ArgumentTypeError("dt must be positive")
+    return dt
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=None)
+    parser.add_argument("--dt", type=parse_dt, default=f"1/{C.FPS}")
+    parser.add_argument("--policy", choices=POLICIES, default="idle")
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--until-game-over", action="store_true")
+    parser.add_argument("--record", metavar="FILE")
+    parser.add_argument("--replay", metavar="FILE")
+    parser.add_argument("--seek", type=int, default=0, metavar="TICK")
+    parser.add_argument("--verify", action="store_true")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        stats, dt = play(args.replay, args.seek, args.frames, args.verify)
+        print(report(stats, dt))
+        return
+
+    if not 1 <= args.players <= C.MAX_PLAYERS:
+        parser.error(f"--players must be between 1 and {C.MAX_PLAYERS}")
+    stats = run(
+        args.frames or C.FPS * 60,
+        dt=args.dt,
+        policy=args.policy,
+        players=args.players,
+        seed=args.seed,
+        until_game_over=args.until_game_over,
+        record=args.record,
+    )
+    print(report(stats, args.dt))
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,97 @@
+"""Explosion particles as one NumPy particle system."""
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from core import config as C
+from core.utils import Vec
+
+# Burst shape per explosion kind: (count, speed_min, speed_max, ttl).
+BURSTS: dict[str, tuple[int, float, float, float]] = {
+    "asteroid": C.PARTICLE_ASTEROID,
+    "ufo": C.PARTICLE_UFO,
+    "ship": C.PARTICLE_SHIP,
+}
+
+
+class ParticleSystem:
+    """Position, velocity and TTL of every live particle, in flat arrays.
+
+    Particles are cosmetic and never interact, so they skip the entity
+    store: the first `count` rows of pos, vel and ttl are live, update()
+    integrates and culls all of them at once, and the renderer draws
+    positions() in one pass. Bursts past `capacity` are truncated and
+    counted in `dropped`.
+
+    Particles don't wrap the screen: they live ~1s and travel ≤200px, so
+    wrapping would teleport stray particles to the opposite edge and look
+    like a bug. They draw from their own generator, so effects never
+    consume the gameplay random stream.
+    """
+
+    def __init__(
+        self,
+        capacity: int | None = None,
+        rng: np.random.Generator | None = None,
+    ) -> None:
+        self.capacity = capacity or C.PARTICLE_CAPACITY
+        self.pos = np.empty((self.capacity, 2))
+        self.vel = np.empty((self.capacity, 2))
+        self.ttl = np.empty(self.capacity)
+        self.count = 0
+        self.dropped = 0
+        self._rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def positions(self) -> np.ndarray:
+        """View of the live particles' positions, shape (count, 2)."""
+        return self.pos[: self.count]
+
+    def spawn(self, requests: Iterable[tuple[Vec, str]]) -> None:
+        """Emit one burst per (pos, kind), e.g. particles_to_spawn."""
+        for pos, kind in requests:
+            self.emit(pos, kind)
+
+    def emit(self, pos: Vec, kind: str) -> None:
+        """Emit an explosion burst of the given kind at pos."""
+        count, sp_min, sp_max, ttl = BURSTS[kind]
+        start = self.count
+        n = min(count, self.capacity - start)
+        self.dropped += count - n
+        if n <= 0:
+            return
+        end = start + n
+
+        ang = self._rng.uniform(0.0, 2.0 * np.pi, n)
+        speed = self._rng.uniform(sp_min, sp_max, n)
+        self.pos[start:end] = (pos.x, pos.y)
+        vel = self.vel[start:end]
+        np.cos(ang, out=vel[:, 0])
+        np.sin(ang, out=vel[:, 1])
+        vel *= speed[:, None]
+        self.ttl[start:end] = ttl
+        self.count = end
+
+    def update(self, dt: float) -> None:
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        vel = self.vel[:n]
+        ttl = self.ttl[:n]
+        pos += vel * dt
+        ttl -= dt
+
+        alive = ttl > 0.0
+        keep = int(np.count_nonzero(alive))
+        if keep < n:
+            self.pos[:keep] = pos[alive]
+            self.vel[:keep] = vel[alive]
+            self.ttl[:keep] = ttl[alive]
+            self.count = keep
@@ -0,0 +1,64 @@
+"""Object pools for short-lived entities."""
+
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    """Counters for tuning a pool's capacity."""
+
+    hits: int
+    misses: int
+    high_water: int
+    live: int
+    idle: int
+
+
+class Pool(Generic[T]):
+    """Free list of reusable entities of one class.
+
+    acquire(*args) hands out an idle instance reinitialised with
+    instance.reset(*args), or builds cls(*args) when none is idle (a miss).
+    release() takes an instance back; at most `capacity` idle instances are
+    kept, the rest are left to the garbage collector. EntityTables release
+    their entities automatically when they are killed.
+    """
+
+    def __init__(self, cls: type[T], capacity: int) -> None:
+        self.cls = cls
+        self.capacity = capacity
+        self._idle: list[T] = []
+        self._hits = 0
+        self._misses = 0
+        self._live = 0
+        self._high_water = 0
+
+    def acquire(self, *args: object) -> T:
+        if self._idle:
+            obj = self._idle.pop()
+            obj.reset(*args)
+            self._hits += 1
+        else:
+            obj = self.cls(*args)
+            self._misses += 1
+        self._live += 1
+        if self._live > self._high_water:
+            self._high_water = self._live
+        return obj
+
+    def release(self, obj: T) -> None:
+        self._live -= 1
+        if len(self._idle) < self.capacity:
+            self._idle.append(obj)
+
+    def stats(self) -> PoolStats:
+        return PoolStats(
+            hits=self._hits,
+            misses=self._misses,
+            high_water=self._high_water,
+            live=self._live,
+            idle=len(self._idle),
+        )
@@ -0,0 +1,40 @@
+"""Per-phase frame timing."""
+
+from time import perf_counter
+
+
+class PhaseTimer:
+    """Accumulates wall time per named phase of World.update().
+
+    World calls start() at the top of a frame and lap(name) after each
+    phase; a lap is charged the time since the previous call.
+    """
+
+    def __init__(self) -> None:
+        self.totals: dict[str, float] = {}
+        self.frames = 0
+        self._last = 0.0
+
+    def start(self) -> None:
+        self.frames += 1
+        self._last = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = perf_counter()
+        self.totals[phase] = self.totals.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def per_frame(self) -> dict[str, float]:
+        """Mean seconds per frame for each phase, in first-seen order."""
+        frames = max(self.frames, 1)
+        return {phase: t / frames for phase, t in self.totals.items()}
+
+
+class NullTimer:
+    """Stand-in for PhaseTimer when nobody is profiling."""
+
+    def start(self) -> None:
+        pass
+
+    def lap(self, phase: str) -> None:
+        pass
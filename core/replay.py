@@ -0,0 +1,296 @@
+"""Session replays: a seed, every tick's commands and dt, and keyframes.
+
+A replay file is written front to back and never rewritten, so a crash
+loses at most what was still buffered. It starts with a header (magic,
+version, seed, player ids) followed by tagged records:
+
+    D  dt        the seconds per tick from here on (a double)
+    T  commands  one tick: a packed PlayerCommand byte per player, in
+                 header order (ABSENT for a player with no command)
+    K  keyframe  tick, sync flag, length, then a core.snapshot of the
+                 World as it was before that tick's update
+
+A tick costs 1 + players bytes while dt holds steady. ReplayWriter adds a
+keyframe every REPLAY_KEYFRAME_EVERY ticks (core.config), so a player can
+seek by restoring the nearest keyframe and replaying from it. A sync
+keyframe marks a jump the commands cannot reproduce (the session's first
+tick, or a World.reset()), so playback always restores it.
+
+read() tolerates a truncated last record, so a log cut short by a crash
+still plays up to the crash.
+"""
+
+import os
+import struct
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from core import config as C
+from core.commands import PlayerCommand
+from core.world import PlayerId, World
+
+MAGIC = b"ARPL"
+VERSION = 1
+# A player who sent no command that tick, which World.update() treats
+# differently from an empty command.
+ABSENT = 0x80
+
+# magic, version, has_seed, seed, players
+HEADER = struct.Struct("<4sHBqB")
+PLAYER_ID = struct.Struct("<q")
+DT = struct.Struct("<d")
+# tick, sync, snapshot length
+KEYFRAME = struct.Struct("<IBI")
+
+TAG_DT = ord("D")
+TAG_TICK = ord("T")
+TAG_KEYFRAME = ord("K")
+
+_COMMANDS = tuple(PlayerCommand.from_bits(bits) for bits in range(64))
+
+
+@dataclass(frozen=True, slots=True)
+class Keyframe:
+    """A World snapshot taken before tick `tick` was played."""
+
+    tick: int
+    sync: bool
+    data: memoryview
+
+
+class ReplayWriter:
+    """Streams one World's session to a binary file opened for writing.
+
+    Call record() before each World.update() with the same dt and
+    commands, and resync() after anything else that changes the World
+    (reset(), spawn_player()). The writer flushes at each keyframe;
+    closing the file writes out the tail.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        world: World,
+        player_ids: tuple[PlayerId, ...] | None = None,
+        keyframe_every: int | None = None,
+    ) -> None:
+        self.player_ids = player_ids or tuple(world.ships)
+        self.keyframe_every = keyframe_every or C.REPLAY_KEYFRAME_EVERY
+        self.ticks = 0
+        self._file = file
+        self._known = set(self.player_ids)
+        self._dt: float | None = None
+        self._sync = True
+        seed = world.seed
+        self._file.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                seed is not None,
+                seed or 0,
+                len(self.player_ids),
+            )
+        )
+        for pid in self.player_ids:
+            self._file.write(PLAYER_ID.pack(pid))
+
+    def record(
+        self,
+        world: World,
+        dt: float,
+        commands: dict[PlayerId, PlayerCommand],
+    ) -> None:
+        """Log one tick; world is the World about to play it."""
+        if not commands.keys() <= self._known:
+            unknown = sorted(commands.keys() - self._known)
+            raise ValueError(f"commands for unrecorded players: {unknown}")
+        if self._sync or self.ticks % self.keyframe_every == 0:
+            self._write_keyframe(world)
+        write = self._file.write
+        if dt != self._dt:
+            write(b"D" + DT.pack(dt))
+            self._dt = dt
+        tick = bytearray(b"T")
+        for pid in self.player_ids:
+            cmd = commands.get(pid)
+            tick.append(ABSENT if cmd is None else cmd.to_bits())
+        write(tick)
+        self.ticks += 1
+
+    def resync(self) -> None:
+        """Make the next tick's keyframe a sync one; call it after changing
+        the World in ways the commands do not explain."""
+        self._sync = True
+
+    def _write_keyframe(self, world: World) -> None:
+        data = world.snapshot()
+        write = self._file.write
+        write(b"K")
+        write(KEYFRAME.pack(self.ticks, self._sync, len(data)))
+        write(data)
+        self._sync = False
+        self._file.flush()
+
+
+@dataclass
+class Replay:
+    """A replay file, parsed. commands holds players bytes per tick."""
+
+    seed: int | None
+    player_ids: tuple[PlayerId, ...]
+    dts: array
+    commands: bytearray
+    keyframes: list[Keyframe]
+    truncated: bool = False
+
+    def __len__(self) -> int:
+        return len(self.dts)
+
+    def commands_at(self, tick: int) -> dict[PlayerId, PlayerCommand]:
+        n = len(self.player_ids)
+        row = self.commands[tick * n : tick * n + n]
+        return {
+            pid: _COMMANDS[bits]
+            for pid, bits in zip(self.player_ids, row, strict=True)
+            if bits != ABSENT
+        }
+
+
+def read(path: str | os.PathLike[str]) -> Replay:
+    """Parse a replay file; raises ValueError if it is not one."""
+    with open(path, "rb") as f:
+        return parse(f.read())
+
+
+def parse(buffer: bytes | memoryview) -> Replay:
+    """Parse a replay held in memory; keyframes keep views into it."""
+    data = memoryview(buffer)
+    if len(data) < HEADER.size:
+        raise ValueError("replay too short")
+    magic, version, has_seed, seed, n_players = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a replay file")
+    if version != VERSION:
+        raise ValueError(f"unsupported replay version {version}")
+    offset = HEADER.size
+    player_ids = tuple(
+        PLAYER_ID.unpack_from(data, offset + i * PLAYER_ID.size)[0]
+        for i in range(n_players)
+    )
+    offset += n_players * PLAYER_ID.size
+
+    replay = Replay(
+        seed if has_seed else None,
+        player_ids,
+        array("d"),
+        bytearray(),
+        [],
+    )
+    dts = replay.dts
+    commands = replay.commands
+    dt = 1.0 / C.FPS
+    end = len(data)
+    while offset < end:
+        tag = data[offset]
+        offset += 1
+        if tag == TAG_TICK:
+            if offset + n_players > end:
+                break
+            dts.append(dt)
+            commands += data[offset : offset + n_players]
+            offset += n_players
+        elif tag == TAG_DT:
+            if offset + DT.size > end:
+                break
+            (dt,) = DT.unpack_from(data, offset)
+            offset += DT.size
+        elif tag == TAG_KEYFRAME:
+            if offset + KEYFRAME.size > end:
+                break
+            tick, sync, size = KEYFRAME.unpack_from(data, offset)
+            offset += KEYFRAME.size
+            if offset + size > end:
+                break
+            snap = data[offset : offset + size]
+            replay.keyframes.append(Keyframe(tick, bool(sync), snap))
+            offset += size
+        else:
+            raise ValueError(f"bad replay record {tag!r} at {offset - 1}")
+    else:
+        return replay
+    replay.truncated = True
+    return replay
+
+
+class ReplayPlayer:
+    """Plays a Replay back through World.update().
+
+    step() plays one tick and seek() jumps to any tick by restoring the
+    nearest keyframe at or before it. With verify, every keyframe passed
+    is compared against the replayed World, and a mismatch raises
+    RuntimeError naming the tick where the replay diverged.
+    """
+
+    def __init__(
+        self,
+        replay: Replay,
+        world: World | None = None,
+        verify: bool = False,
+    ) -> None:
+        if not replay.keyframes:
+            raise ValueError("replay has no keyframes")
+        self.replay = replay
+        self.world = world or World(replay.seed)
+        self.verify = verify
+        self.tick = 0
+        self._keyframe_ticks = [k.tick for k in replay.keyframes]
+        self._keyframes = {k.tick: k for k in replay.keyframes}
+        self._restored = -1
+        self.seek(0)
+
+    def __len__(self) -> int:
+        return len(self.replay)
+
+    @property
+    def done(self) -> bool:
+        return self.tick >= len(self.replay)
+
+    def step(self) -> bool:
+        """Play the next tick; False once the replay has run out."""
+        tick = self.tick
+        replay = self.replay
+        if tick >= len(replay):
+            return False
+        keyframe = self._keyframes.get(tick)
+        if keyframe is not None and tick != self._restored:
+            if keyframe.sync:
+                self.world.restore(keyframe.data)
+            elif self.verify and self.world.snapshot() != keyframe.data:
+                raise RuntimeError(f"replay diverged before tick {tick}")
+        self.world.update(replay.dts[tick], replay.commands_at(tick))
+        self.tick = tick + 1
+        return True
+
+    def seek(self, tick: int) -> None:
+        """Move to just before tick (clamped to the replay's length)."""
+        tick = max(0, min(tick, len(self.replay)))
+        i = bisect_right(self._keyframe_ticks, tick) - 1
+        if i < 0:
+            raise ValueError(f"no keyframe at or before tick {tick}")
+        keyframe = self.replay.keyframes[i]
+        # Playing on is cheaper than a restore when the target is ahead
+        # and no keyframe lies between.
+        if not keyframe.tick <= self.tick <= tick or self._restored < 0:
+            self.world.restore(keyframe.data)
+            self.tick = self._restored = keyframe.tick
+        while self.tick < tick:
+            self.step()
+
+    def play(self, ticks: int | None = None) -> int:
+        """Play up to ticks ticks (default: to the end); returns how many."""
+        played = 0
+        while (ticks is None or played < ticks) and self.step():
+            played += 1
+        return played
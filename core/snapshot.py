@@ -0,0 +1,376 @@
+"""Binary World snapshots, for rollback, save states and search.
+
+A snapshot is the whole simulation state packed little-endian into
+fixed-size sections, in this order:
+
+    header     magic, version, section counts, wave, game over, timers
+    rng        the World generator's state (625 words, then gauss_next)
+    ships      one record per player, in World.ships order
+    asteroids  one record per asteroid, in table order
+    vertices   every asteroid's outline, (x, y) doubles back to back
+    bullets    one record per bullet, in table order
+    ufos       one record per UFO, in table order
+
+Records are struct layouts (the *_RECORD constants below), so a reader can
+walk them with struct.iter_unpack() over a memoryview slice, vertices
+included, without copying and on hosts of either byte order. load()
+accepts any buffer (bytes, bytearray, memoryview, mmap) and reads it the
+same way.
+
+Particles and the current frame's events are effects, not state: they are
+not saved, and load() clears them. Restoring also restores the generator,
+so a restored World replays the same commands exactly.
+"""
+
+import struct
+from typing import TYPE_CHECKING
+
+from core import config as C
+from core.entities import UFO, Asteroid, Ship
+from core.store import Entity, EntityTable
+from core.utils import Countdown, Vec
+
+if TYPE_CHECKING:
+    from core.world import World
+
+MAGIC = b"ASNP"
+VERSION = 2
+
+# magic, version, players, asteroids, bullets, ufos, vertices, wave,
+# game_over, wave_cool, ufo_timer, extra_life_notice
+HEADER = struct.Struct("<4sHHIIIIqB3d")
+# Mersenne Twister words and position, has_gauss, gauss_next
+RNG = struct.Struct("<625IBd")
+# The same section split in two, so load() gets the words as one tuple.
+RNG_WORDS = struct.Struct("<625I")
+RNG_GAUSS = struct.Struct("<Bd")
+# player_id, score, lives, extra_lives_awarded, x, y, vx, vy, angle, cool,
+# invuln, shield, shield_cd
+SHIP_RECORD = struct.Struct("<4q9d")
+# x, y, vx, vy, size index in C.AST_SIZES, vertex count
+ASTEROID_RECORD = struct.Struct("<4dBB")
+VERTEX_RECORD = struct.Struct("<2d")
+# owner_id, x, y, prev_x, prev_y, vx, vy, ttl
+BULLET_RECORD = struct.Struct("<q7d")
+# small, has_move_dir, r, speed, x, y, vx, vy, cool, move_dir x, y
+UFO_RECORD = struct.Struct("<2B9d")
+
+
+def dump(world: "World") -> bytes:
+    """Pack world's state into a snapshot."""
+    sizes = list(C.AST_SIZES)
+    ships = list(world.ships.values())
+    asteroids = world.asteroids.entities
+    bullets = world.bullets.entities
+    ufos = world.ufos.entities
+
+    ship_values: list[float] = []
+    for ship in ships:
+        pid = ship.player_id
+        ship_values += (
+            pid,
+            world.scores[pid],
+            world.lives[pid],
+            world.extra_lives_awarded[pid],
+            ship.pos.x,
+            ship.pos.y,
+            ship.vel.x,
+            ship.vel.y,
+            ship.angle,
+            ship.cool.remaining,
+            ship.invuln.remaining,
+            ship.shield.remaining,
+            ship.shield_cd.remaining,
+        )
+
+    ast_values: list[float] = []
+    vertices: list[float] = []
+    for ast in asteroids:
+        ast_values += (
+            ast.pos.x,
+            ast.pos.y,
+            ast.vel.x,
+            ast.vel.y,
+            sizes.index(ast.size),
+            len(ast.poly),
+        )
+        for point in ast.poly:
+            vertices += (point.x, point.y)
+
+    bullet_values: list[float] = []
+    for bullet in bullets:
+        bullet_values += (
+            bullet.owner_id,
+            bullet.pos.x,
+            bullet.pos.y,
+            bullet.prev_pos.x,
+            bullet.prev_pos.y,
+            bullet.vel.x,
+            bullet.vel.y,
+            bullet.ttl,
+        )
+
+    ufo_values: list[float] = []
+    for ufo in ufos:
+        move_dir = ufo.move_dir
+        ufo_values += (
+            ufo.small,
+            move_dir is not None,
+            ufo.r,
+            ufo.speed,
+            ufo.pos.x,
+            ufo.pos.y,
+            ufo.vel.x,
+            ufo.vel.y,
+            ufo.cool.remaining,
+            *((move_dir.x, move_dir.y) if move_dir is not None else (0, 0)),
+        )
+
+    _, state, gauss = world.rng.getstate()
+    n_vertices = len(vertices) // 2
+    return b"".join(
+        (
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                len(ships),
+                len(asteroids),
+                len(bullets),
+                len(ufos),
+                n_vertices,
+                world.wave,
+                world.game_over,
+                world.wave_cool.remaining,
+                world.ufo_timer.remaining,
+                world.extra_life_notice.remaining,
+            ),
+            RNG.pack(*state, gauss is not None, gauss or 0.0),
+            _pack(SHIP_RECORD, len(ships), ship_values),
+            _pack(ASTEROID_RECORD, len(asteroids), ast_values),
+            _pack(VERTEX_RECORD, n_vertices, vertices),
+            _pack(BULLET_RECORD, len(bullets), bullet_values),
+            _pack(UFO_RECORD, len(ufos), ufo_values),
+        )
+    )
+
+
+def _pack(record: struct.Struct, count: int, values: list[float]) -> bytes:
+    """count records back to back, from their flattened field values."""
+    if not count:
+        return b""
+    fmt = record.format
+    return struct.pack(fmt[0] + fmt[1:] * count, *values)
+
+
+def header(data: bytes | memoryview) -> tuple:
+    """The snapshot's header fields; raises ValueError if it is not one."""
+    if len(data) < HEADER.size:
+        raise ValueError("snapshot too short")
+    fields = HEADER.unpack_from(data)
+    if fields[0] != MAGIC:
+        raise ValueError("not a World snapshot")
+    if fields[1] != VERSION:
+        raise ValueError(f"unsupported snapshot version {fields[1]}")
+    return fields
+
+
+def load(world: "World", data: bytes | memoryview) -> None:
+    """Replace world's state with a snapshot's."""
+    view = memoryview(data)
+    (
+        _,
+        _,
+        n_ships,
+        n_asteroids,
+        n_bullets,
+        n_ufos,
+        n_vertices,
+        wave,
+        game_over,
+        wave_cool,
+        ufo_timer,
+        notice,
+    ) = header(view)
+    offset = HEADER.size
+    sections = []
+    for record, count in (
+        (RNG, 1),
+        (SHIP_RECORD, n_ships),
+        (ASTEROID_RECORD, n_asteroids),
+        (VERTEX_RECORD, n_vertices),
+        (BULLET_RECORD, n_bullets),
+        (UFO_RECORD, n_ufos),
+    ):
+        end = offset + record.size * count
+        sections.append(view[offset:end])
+        offset = end
+    if len(view) != offset:
+        raise ValueError("snapshot size does not match its header")
+    rng_view, ship_view, ast_view, vertex_view, bullet_view, ufo_view = (
+        sections
+    )
+
+    state = RNG_WORDS.unpack_from(rng_view)
+    has_gauss, gauss = RNG_GAUSS.unpack_from(rng_view, RNG_WORDS.size)
+    world.rng.setstate((3, state, gauss if has_gauss else None))
+    world.wave = wave
+    world.game_over = bool(game_over)
+    world.wave_cool.reset(wave_cool)
+    world.ufo_timer.reset(ufo_timer)
+    world.extra_life_notice.reset(notice)
+    world.particles.clear()
+    world.events.clear()
+
+    _load_ships(world, ship_view)
+    _load_asteroids(world, ast_view, vertex_view)
+    _load_ufos(world, ufo_view)
+    _load_bullets(world, bullet_view)
+
+
+def _load_asteroids(
+    world: "World", view: memoryview, vertex_view: memoryview
+) -> None:
+    """Restore the asteroids, reusing the objects already in the table."""
+    table = world.asteroids
+    sizes = list(C.AST_SIZES)
+    points = VERTEX_RECORD.iter_unpack(vertex_view)
+    row = 0
+    for row, (x, y, vx, vy, size, n) in enumerate(
+        ASTEROID_RECORD.iter_unpack(view), 1
+    ):
+        ast = _reuse(table, row - 1, Asteroid)
+        ast.pos.xy = x, y
+        ast.vel.xy = vx, vy
+        ast.size = sizes[size]
+        ast.r = int(C.AST_SIZES[ast.size]["r"])
+        # The outline is rewritten in place when its vertex count matches.
+        poly = getattr(ast, "poly", None)
+        if poly is not None and len(poly) == n:
+            for vertex in poly:
+                vertex.xy = next(points)
+        else:
+            ast.poly = [Vec(next(points)) for _ in range(n)]
+        _place(world, table, row - 1, ast)
+    _truncate(table, row)
+
+
+def _load_ufos(world: "World", view: memoryview) -> None:
+    """Restore the UFOs, reusing the objects already in the table."""
+    table = world.ufos
+    row = 0
+    for row, (small, has_dir, r, speed, x, y, vx, vy, cool, dx, dy) in (
+        enumerate(UFO_RECORD.iter_unpack(view), 1)
+    ):
+        ufo = _reuse(table, row - 1, UFO)
+        ufo._rng = world.rng
+        ufo.small = bool(small)
+        ufo.r = int(r)
+        ufo.speed = speed
+        ufo.pos.xy = x, y
+        ufo.vel.xy = vx, vy
+        ufo.cool = Countdown(cool)
+        ufo.move_dir = Vec(dx, dy) if has_dir else None
+        ufo.target_pos = None
+        _place(world, table, row - 1, ufo)
+    _truncate(table, row)
+
+
+def _load_bullets(world: "World", view: memoryview) -> None:
+    """Restore the bullets, rewriting the ones already in the table in
+    place; only extra records acquire bullets from the pool."""
+    table = world.bullets
+    acquire = world.bullet_pool.acquire
+    track = world._collision_mgr.track
+    row = 0
+    for row, (owner, x, y, px, py, vx, vy, ttl) in enumerate(
+        BULLET_RECORD.iter_unpack(view), 1
+    ):
+        i = row - 1
+        if i < len(table):
+            bullet = table.entities[i]
+            bullet.owner_id = owner
+            bullet.pos.xy = x, y
+            bullet.prev_pos.xy = px, py
+            bullet.vel.xy = vx, vy
+            bullet.ttl = ttl
+            table.x[i] = x
+            table.y[i] = y
+            table.vx[i] = vx
+            table.vy[i] = vy
+            table.prev_x[i] = px
+            table.prev_y[i] = py
+            table.owner[i] = owner
+        else:
+            bullet = acquire(owner, (px, py), (vx, vy), ttl)
+            bullet.pos.xy = x, y
+            table.add(bullet)
+            track(bullet)
+    _truncate(table, row)
+    # Owners were rewritten in place; the index lists bullets by row.
+    table.reindex()
+
+
+def _load_ships(world: "World", view: memoryview) -> None:
+    """Restore the players, reusing the Ship objects already in play."""
+    old = world.ships
+    world.ships = {}
+    world.scores = {}
+    world.lives = {}
+    world.extra_lives_awarded = {}
+    for record in SHIP_RECORD.iter_unpack(view):
+        pid, score, lives, extra, x, y, vx, vy, angle = record[:9]
+        ship = old.pop(pid, None)
+        if ship is None:
+            ship = Ship(pid, Vec(x, y))
+            world.store.ships.add(ship)
+            world._collision_mgr.track(ship)
+        ship.pos.xy = x, y
+        ship.vel.xy = vx, vy
+        ship.angle = angle
+        cool, invuln, shield, shield_cd = record[9:]
+        ship.cool.reset(cool)
+        ship.invuln.reset(invuln)
+        ship.shield.reset(shield)
+        ship.shield_cd.reset(shield_cd)
+        world.ships[pid] = ship
+        world.scores[pid] = score
+        world.lives[pid] = lives
+        world.extra_lives_awarded[pid] = extra
+    for ship in old.values():
+        ship.kill()
+
+
+def _reuse(table: EntityTable, row: int, cls: type[Entity]) -> Entity:
+    """The entity in row, or a new one with only zeroed pos and vel if the
+    table is shorter; the caller fills in its attributes, then _place()s
+    it."""
+    if row < len(table):
+        return table.entities[row]
+    entity = cls.__new__(cls)
+    Entity.__init__(entity)
+    entity.pos = Vec()
+    entity.vel = Vec()
+    return entity
+
+
+def _place(
+    world: "World", table: EntityTable, row: int, entity: Entity
+) -> None:
+    """Refresh row's columns from a reused entity, or add a new one."""
+    if row < len(table):
+        table.x[row] = entity.pos.x
+        table.y[row] = entity.pos.y
+        table.vx[row] = entity.vel.x
+        table.vy[row] = entity.vel.y
+        table.r[row] = entity.r
+    else:
+        table.add(entity)
+        world._collision_mgr.track(entity)
+
+
+def _truncate(table: EntityTable, count: int) -> None:
+    """Kill the entities past the first count, last first, so no row moves."""
+    entities = table.entities
+    while len(entities) > count:
+        entities[-1].kill()
+
@@ -0,0 +1,321 @@
+"""Array-backed entity storage.
+
+Entities keep their behaviour (update, firing, steering) as objects, but
+their membership and hot numeric state live here: one EntityTable per kind,
+holding parallel typed columns, with free-list slot reuse and stable
+handles. The tables replace pygame sprite groups, so core/ no longer needs
+pygame.sprite.
+"""
+
+from array import array
+from collections.abc import Iterator
+
+from core.pool import Pool
+
+# Handles pack a slot index and that slot's generation into one int.
+SLOT_BITS = 24
+SLOT_MASK = (1 << SLOT_BITS) - 1
+NO_HANDLE = -1
+
+Handle = int
+
+
+class Entity:
+    """Base class for anything stored in an EntityTable.
+
+    Implements the small part of the pygame sprite protocol the game uses:
+    kill(), alive() and the add_internal/remove_internal hooks through
+    which tables and collision indexes track membership.
+    """
+
+    def __init__(self) -> None:
+        self._groups: list[object] = []
+        self.handle: Handle = NO_HANDLE
+
+    def add_internal(self, group: object) -> None:
+        self._groups.append(group)
+
+    def remove_internal(self, group: object) -> None:
+        self._groups.remove(group)
+
+    def alive(self) -> bool:
+        return bool(self._groups)
+
+    def kill(self) -> None:
+        groups = self._groups
+        self._groups = []
+        for group in groups:
+            group.remove_internal(self)
+
+
+class EntityTable:
+    """Parallel typed columns for one entity kind.
+
+    Live entities are packed densely: entities[i] owns row i of every
+    column, and removal moves the last row into the hole. Handles index a
+    separate slot array instead, so they survive that move. Freed slots go
+    on a free list and their generation is bumped, so a stale handle never
+    resolves to the slot's next tenant.
+
+    Columns x, y, vx, vy and r are refreshed from the objects by sync(),
+    once per frame, and handle holds each row's entity handle. Array
+    consumers (the numpy collision backend, snapshots, network encoding)
+    read them without touching the objects.
+
+    The table also behaves like the pygame Group it replaces: iteration
+    (over a copy), len(), `in`, add(), remove(), sprites() and update(dt)
+    all work, and Entity.kill() frees the row. With a pool, every removed
+    entity is released back to it.
+    """
+
+    _spritegroup = True
+
+    def __init__(self, pool: Pool | None = None) -> None:
+        self.pool = pool
+        self.entities: list[Entity] = []
+        self.x = array("d")
+        self.y = array("d")
+        self.vx = array("d")
+        self.vy = array("d")
+        self.r = array("d")
+        self.handle = array("q")
+        self._row_of_slot = array("q")
+        self._slot_of_row = array("q")
+        self._generation = array("Q")
+        self._free: list[int] = []
+
+    # Group-compatible view ------------------------------------------------
+
+    def __iter__(self) -> Iterator[Entity]:
+        return iter(self.entities.copy())
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def __bool__(self) -> bool:
+        return bool(self.entities)
+
+    def __contains__(self, entity: object) -> bool:
+        return self.has_internal(entity)
+
+    def sprites(self) -> list[Entity]:
+        return self.entities.copy()
+
+    def add(self, *entities: Entity) -> None:
+        for entity in entities:
+            if not self.has_internal(entity):
+                self.add_internal(entity)
+                entity.add_internal(self)
+
+    def remove(self, *entities: Entity) -> None:
+        for entity in entities:
+            if self.has_internal(entity):
+                self.remove_internal(entity)
+                entity.remove_internal(self)
+
+    def update(self, dt: float) -> None:
+        # Index walk instead of iterating a copy, so a frame allocates no
+        # list. An entity that kills itself is replaced in its row by the
+        # last one, which has not been updated yet.
+        entities = self.entities
+        i = 0
+        while i < len(entities):
+            entity = entities[i]
+            entity.update(dt)
+            if i < len(entities) and entities[i] is entity:
+                i += 1
+
+    # Storage ----------------------------------------------------------------
+
+    def get(self, handle: Handle) -> Entity | None:
+        """Return the entity a handle refers to, or None if it is gone."""
+        if handle < 0:
+            return None
+        slot = handle & SLOT_MASK
+        if slot >= len(self._generation):
+            return None
+        if self._generation[slot] != handle >> SLOT_BITS:
+            return None
+        row = self._row_of_slot[slot]
+        return self.entities[row] if row >= 0 else None
+
+    def row_of(self, entity: Entity) -> int:
+        """Row of entity in the columns; only valid until the next removal."""
+        return self._row_of_slot[entity.handle & SLOT_MASK]
+
+    def sync(self) -> None:
+        """Copy the objects' current state into the columns."""
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        for i, entity in enumerate(self.entities):
+            pos = entity.pos
+            vel = entity.vel
+            x[i] = pos.x
+            y[i] = pos.y
+            vx[i] = vel.x
+            vy[i] = vel.y
+
+    def has_internal(self, entity: object) -> bool:
+        handle = getattr(entity, "handle", NO_HANDLE)
+        return self.get(handle) is entity
+
+    def add_internal(self, entity: Entity) -> None:
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._generation)
+            self._generation.append(0)
+            self._row_of_slot.append(-1)
+
+        row = len(self.entities)
+        self.entities.append(entity)
+        self._slot_of_row.append(slot)
+        self._row_of_slot[slot] = row
+        entity.handle = (self._generation[slot] << SLOT_BITS) | slot
+        self._append_row(entity)
+
+    def remove_internal(self, entity: Entity) -> None:
+        slot = entity.handle & SLOT_MASK
+        row = self._row_of_slot[slot]
+        last = len(self.entities) - 1
+        if row != last:
+            moved_slot = self._slot_of_row[last]
+            self.entities[row] = self.entities[last]
+            self._slot_of_row[row] = moved_slot
+            self._row_of_slot[moved_slot] = row
+            self._move_row(last, row)
+        self.entities.pop()
+        self._slot_of_row.pop()
+        self._pop_row()
+
+        self._row_of_slot[slot] = -1
+        self._generation[slot] += 1
+        self._free.append(slot)
+        entity.handle = NO_HANDLE
+        if self.pool is not None:
+            self.pool.release(entity)
+
+    def _columns(self) -> tuple[array, ...]:
+        return self.x, self.y, self.vx, self.vy, self.r, self.handle
+
+    def _append_row(self, entity: Entity) -> None:
+        self.handle.append(entity.handle)
+        self.x.append(entity.pos.x)
+        self.y.append(entity.pos.y)
+        self.vx.append(entity.vel.x)
+        self.vy.append(entity.vel.y)
+        self.r.append(getattr(entity, "r", 0.0))
+
+    def _move_row(self, src: int, dst: int) -> None:
+        for column in self._columns():
+            column[dst] = column[src]
+
+    def _pop_row(self) -> None:
+        for column in self._columns():
+            column.pop()
+
+
+class BulletTable(EntityTable):
+    """EntityTable with the extra columns bullets need.
+
+    prev_x/prev_y hold the start of the swept path and owner the owner_id,
+    so collision kernels can filter and sweep bullets from arrays alone.
+
+    The table also indexes its bullets by owner, updated on every add and
+    removal (spawn, TTL expiry, collision kill), so per-owner counts and
+    views never scan the other owners' bullets.
+    """
+
+    def __init__(self, pool: Pool | None = None) -> None:
+        super().__init__(pool)
+        self.prev_x = array("d")
+        self.prev_y = array("d")
+        self.owner = array("q")
+        self._by_owner: dict[int, dict[Entity, None]] = {}
+
+    def count(self, owner: int) -> int:
+        """Number of live bullets fired by owner, in O(1)."""
+        owned = self._by_owner.get(owner)
+        return len(owned) if owned else 0
+
+    def owned_by(self, owner: int) -> list[Entity]:
+        """Live bullets fired by owner, in spawn order."""
+        return list(self._by_owner.get(owner, ()))
+
+    def player_bullets(self) -> list[Entity]:
+        """Live bullets fired by players (owner_id > 0), in spawn order."""
+        return [
+            bullet
+            for owner, owned in self._by_owner.items()
+            if owner > 0
+            for bullet in owned
+        ]
+
+    def reindex(self) -> None:
+        """Rebuild the owner index in row order, after owner_id was
+        rewritten in place (core.snapshot restores bullets that way)."""
+        by_owner: dict[int, dict[Entity, None]] = {}
+        for bullet in self.entities:
+            by_owner.setdefault(bullet.owner_id, {})[bullet] = None
+        self._by_owner = by_owner
+
+    def add_internal(self, bullet: Entity) -> None:
+        super().add_internal(bullet)
+        self._by_owner.setdefault(bullet.owner_id, {})[bullet] = None
+
+    def remove_internal(self, bullet: Entity) -> None:
+        owned = self._by_owner[bullet.owner_id]
+        del owned[bullet]
+        if not owned:
+            del self._by_owner[bullet.owner_id]
+        super().remove_internal(bullet)
+
+    def sync(self) -> None:
+        super().sync()
+        prev_x, prev_y = self.prev_x, self.prev_y
+        for i, bullet in enumerate(self.entities):
+            prev_x[i] = bullet.prev_pos.x
+            prev_y[i] = bullet.prev_pos.y
+
+    def _columns(self) -> tuple[array, ...]:
+        return (*super()._columns(), self.prev_x, self.prev_y, self.owner)
+
+    def _append_row(self, bullet: Entity) -> None:
+        super()._append_row(bullet)
+        self.prev_x.append(bullet.prev_pos.x)
+        self.prev_y.append(bullet.prev_pos.y)
+        self.owner.append(bullet.owner_id)
+
+
+class EntityStore:
+    """One table per entity kind, in draw order.
+
+    An optional pool recycles bullets as they are killed. Particles are
+    not entities; see core.particles.
+    """
+
+    def __init__(self, bullet_pool: Pool | None = None) -> None:
+        self.asteroids = EntityTable()
+        self.bullets = BulletTable(bullet_pool)
+        self.ufos = EntityTable()
+        self.ships = EntityTable()
+        self.tables = (
+            self.asteroids,
+            self.bullets,
+            self.ufos,
+            self.ships,
+        )
+
+    def __iter__(self) -> Iterator[Entity]:
+        for table in self.tables:
+            yield from table.entities.copy()
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self.tables)
+
+    def update(self, dt: float) -> None:
+        for table in self.tables:
+            table.update(dt)
+
+    def sync(self) -> None:
+        for table in self.tables:
+            table.sync()
@@ -1,9 +1,11 @@
 """Common game utilities."""
 
 import math
-from collections.abc import Iterable
-from random import random, uniform
+import random
+from collections.abc import Iterable, Sequence
+from random import Random
 
+import numpy as np
 import pygame as pg
 
 from core import config as C
@@ -46,29 +48,217 @@ class Countdown:
 
 
 def wrap_pos(pos: Vec) -> Vec:
-    return Vec(pos.x % C.WIDTH, pos.y % C.HEIGHT)
+    return Vec(pos.x % C.ARENA_WIDTH, pos.y % C.ARENA_HEIGHT)
 
 
-def angle_to_vec(deg: float) -> Vec:
+def wrap_delta(dx: float, dy: float) -> tuple[float, float]:
+    """The offset (dx, dy) between two positions, taken the short way
+    across the wrapped arena edges.
+
+    Offsets must be under 1.5 arenas, as between any two positions in
+    play, so one arena is added or taken off at most. NumPy arrays are
+    wrapped in place, with the same arithmetic as floats, so the
+    vectorized collision code agrees with the pure-Python one exactly.
+    """
+    width, height = C.ARENA_WIDTH, C.ARENA_HEIGHT
+    if isinstance(dx, np.ndarray):
+        dx[dx > width / 2] -= width
+        dx[dx < -width / 2] += width
+        dy[dy > height / 2] -= height
+        dy[dy < -height / 2] += height
+        return dx, dy
+    if dx > width / 2:
+        dx -= width
+    elif dx < -width / 2:
+        dx += width
+    if dy > height / 2:
+        dy -= height
+    elif dy < -height / 2:
+        dy += height
+    return dx, dy
+
+
+# In-place motion helpers. The frame loop runs these for every moving
+# entity, so they write into the existing vectors instead of building
+# temporaries like `pos += vel * dt` and wrap_pos() do.
+
+
+def integrate(pos: Vec, vel: Vec, dt: float) -> None:
+    """Advance pos by vel * dt, in place."""
+    pos.x += vel.x * dt
+    pos.y += vel.y * dt
+
+
+def integrate_wrap(pos: Vec, vel: Vec, dt: float) -> None:
+    """Advance pos by vel * dt and wrap it around the arena, in place."""
+    pos.x = (pos.x + vel.x * dt) % C.ARENA_WIDTH
+    pos.y = (pos.y + vel.y * dt) % C.ARENA_HEIGHT
+
+
+def segment_dist_sq(start: Vec, end: Vec, point: Vec) -> float:
+    """Squared distance from point to the segment start -> end, with
+    point taken at its nearest copy across the wrapped arena edges."""
+    seg_x = end.x - start.x
+    seg_y = end.y - start.y
+    # wrap_delta(), inlined: this runs for every swept candidate pair.
+    width, height = C.ARENA_WIDTH, C.ARENA_HEIGHT
+    rel_x = point.x - start.x
+    if rel_x > width / 2:
+        rel_x -= width
+    elif rel_x < -width / 2:
+        rel_x += width
+    rel_y = point.y - start.y
+    if rel_y > height / 2:
+        rel_y -= height
+    elif rel_y < -height / 2:
+        rel_y += height
+    len_sq = seg_x * seg_x + seg_y * seg_y
+    t = 0.0
+    if len_sq > 0.0:
+        t = min(max((rel_x * seg_x + rel_y * seg_y) / len_sq, 0.0), 1.0)
+    dx = rel_x - seg_x * t
+    dy = rel_y - seg_y * t
+    return dx * dx + dy * dy
+
+
+def angle_to_vec(deg: float, out: Vec | None = None) -> Vec:
+    """Unit vector at deg; written into out (and returned) when given."""
     rad = math.radians(deg)
-    return Vec(math.cos(rad), math.sin(rad))
+    if out is None:
+        return Vec(math.cos(rad), math.sin(rad))
+    out.x = math.cos(rad)
+    out.y = math.sin(rad)
+    return out
 
 
-def rand_unit_vec() -> Vec:
-    ang = uniform(0, math.tau)
+# Random helpers draw from rng, a World's seeded generator; without one
+# they fall back to the global random module.
+
+
+def rand_unit_vec(rng: Random | None = None) -> Vec:
+    rng = rng or random
+    ang = rng.uniform(0, math.tau)
     return Vec(math.cos(ang), math.sin(ang))
 
 
-def rand_edge_pos() -> Vec:
-    if random() < 0.5:
-        x = uniform(0, C.WIDTH)
-        y = 0 if random() < 0.5 else C.HEIGHT
+def rand_edge_pos(rng: Random | None = None) -> Vec:
+    rng = rng or random
+    if rng.random() < 0.5:
+        x = rng.uniform(0, C.ARENA_WIDTH)
+        y = 0 if rng.random() < 0.5 else C.ARENA_HEIGHT
     else:
-        x = 0 if random() < 0.5 else C.WIDTH
-        y = uniform(0, C.HEIGHT)
+        x = 0 if rng.random() < 0.5 else C.ARENA_WIDTH
+        y = rng.uniform(0, C.ARENA_HEIGHT)
     return Vec(x, y)
 
 
+# Edge positions as rand_edge_pos() draws them: u in [0, 4) covers the
+# top, bottom, left and right edges in turn, one unit each, uniformly
+# along each edge's length. A uniform u therefore follows rand_edge_pos()'s
+# distribution, and a uniform u from some intervals follows it restricted
+# to them.
+
+
+def edge_pos(u: float) -> Vec:
+    """The edge position at u."""
+    side = min(int(u), 3)
+    t = u - side
+    if side == 0:
+        return Vec(t * C.ARENA_WIDTH, 0)
+    if side == 1:
+        return Vec(t * C.ARENA_WIDTH, C.ARENA_HEIGHT)
+    if side == 2:
+        return Vec(0, t * C.ARENA_HEIGHT)
+    return Vec(C.ARENA_WIDTH, t * C.ARENA_HEIGHT)
+
+
+def _edge_frames(p: Vec) -> list[tuple[float, float]]:
+    """Per side: p's offset along it and distance from it."""
+    return [
+        (p.x, abs(p.y)),
+        (p.x, abs(p.y - C.ARENA_HEIGHT)),
+        (p.y, abs(p.x)),
+        (p.y, abs(p.x - C.ARENA_WIDTH)),
+    ]
+
+
+def safe_edge_intervals(
+    avoid: Iterable[Vec], min_dist: float
+) -> list[tuple[float, float]]:
+    """The u intervals of edge positions at least min_dist from every point
+    in avoid, in order; empty if the whole edge is too close."""
+    blocked: list[list[tuple[float, float]]] = [[], [], [], []]
+    for p in avoid:
+        for side, (along, across) in enumerate(_edge_frames(p)):
+            if across < min_dist:
+                half = math.sqrt(min_dist * min_dist - across * across)
+                blocked[side].append((along - half, along + half))
+
+    lengths = (C.ARENA_WIDTH, C.ARENA_WIDTH, C.ARENA_HEIGHT, C.ARENA_HEIGHT)
+    intervals = []
+    for side, length in enumerate(lengths):
+        start = 0.0
+        for lo, hi in sorted(blocked[side]):
+            if lo > start:
+                intervals.append((side + start / length, side + lo / length))
+            start = max(start, hi)
+        if start < length:
+            intervals.append((side + start / length, side + 1.0))
+    return intervals
+
+
+def rand_safe_edge_pos(
+    intervals: list[tuple[float, float]], rng: Random | None = None
+) -> Vec:
+    """A position drawn as rand_edge_pos() does, restricted to the non-empty
+    intervals from safe_edge_intervals(); one draw, no retries."""
+    rng = rng or random
+    v = rng.random() * sum(hi - lo for lo, hi in intervals)
+    for lo, hi in intervals:
+        if v < hi - lo:
+            return edge_pos(lo + v)
+        v -= hi - lo
+    return edge_pos(intervals[-1][1])
+
+
+def farthest_edge_pos(avoid: Sequence[Vec]) -> Vec:
+    """The edge position farthest from its nearest point in avoid."""
+    if not avoid:
+        return edge_pos(0.0)
+    frames = [_edge_frames(p) for p in avoid]
+    best_u, best_d = 0.0, -1.0
+    lengths = (C.ARENA_WIDTH, C.ARENA_WIDTH, C.ARENA_HEIGHT, C.ARENA_HEIGHT)
+    for side, length in enumerate(lengths):
+        points = [f[side] for f in frames]
+        # The nearest-point distance peaks at an end of the side or where
+        # two points are equally near.
+        candidates = [0.0, float(length)]
+        for i, (a1, d1) in enumerate(points):
+            for a2, d2 in points[i + 1 :]:
+                if a1 != a2:
+                    t = (a1 * a1 + d1 * d1 - a2 * a2 - d2 * d2) / (
+                        2 * (a1 - a2)
+                    )
+                    if 0.0 <= t <= length:
+                        candidates.append(t)
+        for t in candidates:
+            d = min((t - a) ** 2 + c * c for a, c in points)
+            if d > best_d:
+                best_u, best_d = side + t / length, d
+    return edge_pos(best_u)
+
+
+def farthest_edge_intervals(
+    avoid: Sequence[Vec],
+) -> list[tuple[float, float]]:
+    """The u intervals of edge positions whose nearest point in avoid is at
+    least AST_FALLBACK_SPAWN_SHARE as far as farthest_edge_pos()'s is;
+    never empty, so a wave can spread over them when no edge is safe."""
+    far = farthest_edge_pos(avoid)
+    reach = min((far.distance_to(p) for p in avoid), default=0.0)
+    return safe_edge_intervals(avoid, reach * C.AST_FALLBACK_SPAWN_SHARE)
+
+
 def draw_poly(surface: pg.Surface, pts: Iterable[Vec]) -> None:
     points = [(int(p.x), int(p.y)) for p in pts]
     pg.draw.polygon(surface, C.WHITE, points, width=1)
@@ -0,0 +1,1008 @@
+"""Many Worlds stepped in lock-step on NumPy arrays, for training agents.
+
+Usage: python -m core.vecworld [--worlds N] [--frames N] [--players N]
+                               [--seed N] [--check]
+
+VecWorld holds N independent games in batched arrays and advances all of
+them with one step() call. It follows World's rules (waves, asteroid
+splits per AST_SIZES, UFO spawns and fire, shields, hyperspace, extra
+lives) and keeps World's table orders and random draws, so world i seeded
+with s plays exactly like World(s) fed the same commands. --check replays
+seeded games through both and reports the first difference; without it,
+the script reports world-ticks per second.
+
+Motion, timers, firing caps and contact tests run as array operations
+over every world at once. Only the rare, order-sensitive steps (splits,
+UFO spawns and shots, hyperspace, new waves, deaths) drop to Python, one
+world at a time, drawing from that world's random.Random in World's order.
+Particles and events are client-side effects and are not simulated.
+"""
+
+import argparse
+import math
+import time
+from collections.abc import Iterable, Sequence
+from random import Random
+
+import numpy as np
+
+from core import config as C
+from core.bots import AimBot, RandomBot
+from core.clearance import ClearanceField
+from core.commands import (
+    HYPERSPACE,
+    ROTATE_LEFT,
+    ROTATE_RIGHT,
+    SHIELD,
+    SHOOT,
+    THRUST,
+)
+from core.entities import UFO, UFO_BULLET_OWNER, ufo_shot_dir
+from core.utils import (
+    Vec,
+    farthest_edge_intervals,
+    rand_edge_pos,
+    rand_safe_edge_pos,
+    rand_unit_vec,
+    safe_edge_intervals,
+    wrap_delta,
+)
+from core.world import World, nearest_wrapped
+
+
+class _Table:
+    """One entity kind across every world, packed like an EntityTable.
+
+    Each column is a (worlds, capacity, ...) array; world w's live rows are
+    0 .. count[w] - 1. Capacity doubles when a world runs out of rows.
+    Removals reproduce EntityTable's row order, since World's collision
+    passes and random draws follow it.
+    """
+
+    def __init__(
+        self,
+        worlds: int,
+        capacity: int,
+        **columns: tuple[tuple[int, ...], type],
+    ) -> None:
+        self.capacity = capacity
+        self.count = np.zeros(worlds, dtype=np.int64)
+        self._names = tuple(columns)
+        for name, (shape, dtype) in columns.items():
+            setattr(self, name, np.zeros((worlds, capacity, *shape), dtype))
+
+    def rows(self) -> np.ndarray:
+        """(worlds, capacity) mask of the live rows."""
+        return np.arange(self.capacity) < self.count[:, None]
+
+    def reserve(self, rows: int) -> None:
+        if rows <= self.capacity:
+            return
+        capacity = max(rows, 2 * self.capacity)
+        for name in self._names:
+            old = getattr(self, name)
+            new = np.zeros((old.shape[0], capacity, *old.shape[2:]), old.dtype)
+            new[:, : self.capacity] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def push(self, w: int, **values: object) -> None:
+        """Append one row to world w."""
+        row = int(self.count[w])
+        self.reserve(row + 1)
+        for name, value in values.items():
+            getattr(self, name)[w, row] = value
+        self.count[w] = row + 1
+
+    def push_rows(self, worlds: np.ndarray, **values: object) -> None:
+        """Append one row per entry of worlds (sorted), in that order."""
+        if len(worlds) == 0:
+            return
+        rank = np.arange(len(worlds)) - np.searchsorted(worlds, worlds)
+        rows = self.count[worlds] + rank
+        self.reserve(int(rows.max()) + 1)
+        for name, value in values.items():
+            getattr(self, name)[worlds, rows] = value
+        np.add.at(self.count, worlds, 1)
+
+    def sweep(self, dead: np.ndarray) -> None:
+        """Drop dead rows the way EntityTable.update() does.
+
+        That walk moves the last unvisited row into each hole, so holes
+        below the new count are filled by the surviving rows above it,
+        highest first.
+        """
+        live = self.rows()
+        dead = dead & live
+        if not dead.any():
+            return
+        keep = self.count - dead.sum(axis=1)
+        index = np.arange(self.capacity)
+        holes = dead & (index < keep[:, None])
+        donors = live & ~dead & (index >= keep[:, None])
+        worlds, dst = np.nonzero(holes)
+        _, src = np.nonzero(donors[:, ::-1])
+        src = self.capacity - 1 - src
+        for name in self._names:
+            column = getattr(self, name)
+            column[worlds, dst] = column[worlds, src]
+        self.count = keep
+
+    def gather(self, w: int, order: list[int]) -> None:
+        """Keep only rows `order` of world w, in that order."""
+        n = len(order)
+        if n == self.count[w] and order == list(range(n)):
+            return
+        src = np.array(order, dtype=np.int64)
+        for name in self._names:
+            column = getattr(self, name)
+            column[w, :n] = column[w, src]
+        self.count[w] = n
+
+    def remove(self, w: int, rows: Iterable[int]) -> None:
+        """Remove rows of world w one by one, as Entity.kill() would."""
+        order = _Rows(int(self.count[w]))
+        for row in rows:
+            order.remove(row)
+        self.gather(w, order.order)
+
+
+class _Rows:
+    """Row order of one world's table through a run of removals.
+
+    Rows are named by their index before the first removal; each removal
+    moves the current last row into the hole, as EntityTable does.
+    """
+
+    __slots__ = ("order", "row_of")
+
+    def __init__(self, n: int) -> None:
+        self.order = list(range(n))
+        self.row_of = list(range(n))
+
+    def alive(self, row: int) -> bool:
+        return self.row_of[row] >= 0
+
+    def remove(self, row: int) -> None:
+        at = self.row_of[row]
+        last = self.order.pop()
+        if last != row:
+            self.order[at] = last
+            self.row_of[last] = at
+        self.row_of[row] = -1
+
+
+def _tick(timers: np.ndarray, dt: np.ndarray | float) -> np.ndarray:
+    """Countdown.tick() over an array, in place; True where one ran out."""
+    running = timers > 0.0
+    timers -= np.where(running, dt, 0.0)
+    done = running & (timers <= 0.0)
+    timers[done] = 0.0
+    return done
+
+
+def _swept_dist_sq(
+    points: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+) -> np.ndarray:
+    """segment_dist_sq() from every point to every segment, per world.
+
+    points is (worlds, n, 2) and start/end (worlds, m, 2); the result is
+    (worlds, n, m), in core.utils.segment_dist_sq's operation order.
+    """
+    seg_x = (end[..., 0] - start[..., 0])[:, None, :]
+    seg_y = (end[..., 1] - start[..., 1])[:, None, :]
+    rel_x, rel_y = wrap_delta(
+        points[..., 0, None] - start[:, None, :, 0],
+        points[..., 1, None] - start[:, None, :, 1],
+    )
+    len_sq = seg_x * seg_x + seg_y * seg_y
+    moving = len_sq > 0.0
+    t = np.where(
+        moving,
+        np.minimum(
+            np.maximum(
+                (rel_x * seg_x + rel_y * seg_y)
+                / np.where(moving, len_sq, 1.0),
+                0.0,
+            ),
+            1.0,
+        ),
+        0.0,
+    )
+    dx = rel_x - seg_x * t
+    dy = rel_y - seg_y * t
+    return dx * dx + dy * dy
+
+
+def _dist_sq(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Squared distance from every a to every b, per world, across the
+    wrapped arena edges."""
+    dx, dy = wrap_delta(
+        a[..., 0, None] - b[:, None, :, 0],
+        a[..., 1, None] - b[:, None, :, 1],
+    )
+    return dx * dx + dy * dy
+
+
+def _by_world(hits: np.ndarray) -> dict[int, dict[int, list[int]]]:
+    """{world: {i: [j, ...]}} for a (worlds, n, m) hit mask, j ascending."""
+    out: dict[int, dict[int, list[int]]] = {}
+    index = [axis.tolist() for axis in np.nonzero(hits)]
+    for w, i, j in zip(*index, strict=True):
+        out.setdefault(w, {}).setdefault(i, []).append(j)
+    return out
+
+
+class VecWorld:
+    """N Worlds in lock-step, with their state in batched arrays.
+
+    Ships are (worlds, players) arrays, player j being player id
+    C.LOCAL_PLAYER_ID + j; asteroids, bullets and ufos are per-world row
+    tables (pos, vel and kind-specific columns) with a count per world;
+    an asteroid's size is an index into size_names and ast_radius.
+    World i draws from rngs[i], seeded like World(seeds[i]).
+
+    step() takes one packed command byte (core.commands) per world and
+    player. A world that reaches game over stops changing until reset().
+    """
+
+    def __init__(
+        self,
+        worlds: int,
+        seeds: Sequence[int | None] | None = None,
+        players: int = 1,
+    ) -> None:
+        seeds = [None] * worlds if seeds is None else list(seeds)
+        if len(seeds) != worlds:
+            raise ValueError(f"expected {worlds} seeds, got {len(seeds)}")
+        if not 1 <= players <= C.MAX_PLAYERS:
+            raise ValueError(f"players must be between 1 and {C.MAX_PLAYERS}")
+        self.worlds = worlds
+        self.players = players
+        self.seeds = seeds
+        self.rngs = [
+            Random(C.RANDOM_SEED if seed is None else seed) for seed in seeds
+        ]
+        self.player_ids = np.arange(players) + C.LOCAL_PLAYER_ID
+
+        sizes = list(C.AST_SIZES)
+        self.size_names = sizes
+        self.ast_radius = np.array([C.AST_SIZES[s]["r"] for s in sizes], float)
+        self._ast_score = [C.AST_SIZES[s]["score"] for s in sizes]
+        self._ast_split = [
+            [sizes.index(s) for s in C.AST_SIZES[name]["split"]]
+            for name in sizes
+        ]
+        self._bounds = np.array(
+            [C.ARENA_WIDTH, C.ARENA_HEIGHT], dtype=np.float64
+        )
+        self._clearance = ClearanceField()
+
+        shape = (worlds, players)
+        self.ship_pos = np.zeros((*shape, 2))
+        self.ship_vel = np.zeros((*shape, 2))
+        self.ship_angle = np.zeros(shape)
+        self.ship_cool = np.zeros(shape)
+        self.invuln = np.zeros(shape)
+        self.shield = np.zeros(shape)
+        self.shield_cd = np.zeros(shape)
+        self.scores = np.zeros(shape, dtype=np.int64)
+        self.lives = np.zeros(shape, dtype=np.int64)
+        self.extra_lives_awarded = np.zeros(shape, dtype=np.int64)
+
+        self.wave = np.zeros(worlds, dtype=np.int64)
+        self.wave_cool = np.zeros(worlds)
+        self.ufo_timer = np.zeros(worlds)
+        self.game_over = np.zeros(worlds, dtype=bool)
+
+        vec = ((2,), np.float64)
+        scalar = ((), np.float64)
+        self.asteroids = _Table(
+            worlds, 32, pos=vec, vel=vec, size=((), np.int8)
+        )
+        self.bullets = _Table(
+            worlds,
+            players * C.MAX_BULLETS_PER_PLAYER + 8,
+            pos=vec,
+            prev=vec,
+            vel=vec,
+            ttl=scalar,
+            owner=((), np.int64),
+        )
+        self.ufos = _Table(
+            worlds, 4, pos=vec, vel=vec, r=scalar, cool=scalar,
+            small=((), bool),
+        )
+
+        for w in range(worlds):
+            self._init_world(w)
+
+    def reset(self, worlds: Iterable[int] | None = None) -> None:
+        """Start the given worlds (default all) over, like World.reset().
+
+        Each keeps drawing from its generator, so a seeded batch stays
+        reproducible across resets.
+        """
+        for w in range(self.worlds) if worlds is None else worlds:
+            self._init_world(int(w))
+
+    def _init_world(self, w: int) -> None:
+        # World seeds its ParticleSystem from its generator; draw the same
+        # bits so the streams stay in step.
+        self.rngs[w].getrandbits(64)
+        for table in (self.asteroids, self.bullets, self.ufos):
+            table.count[w] = 0
+        self.ship_pos[w] = (C.ARENA_WIDTH / 2, C.ARENA_HEIGHT / 2)
+        self.ship_vel[w] = 0.0
+        self.ship_angle[w] = -90.0
+        self.ship_cool[w] = 0.0
+        self.invuln[w] = C.SAFE_SPAWN_TIME
+        self.shield[w] = 0.0
+        self.shield_cd[w] = 0.0
+        self.scores[w] = 0
+        self.lives[w] = C.START_LIVES
+        self.extra_lives_awarded[w] = 0
+        self.wave[w] = 0
+        self.wave_cool[w] = C.WAVE_DELAY
+        self.ufo_timer[w] = C.UFO_SPAWN_EVERY
+        self.game_over[w] = False
+
+    def step(self, dt: float, commands: np.ndarray | None = None) -> None:
+        """Advance every live world by dt, as World.update() does.
+
+        commands is a (worlds, players) array of packed command bytes;
+        None means no input anywhere.
+        """
+        live = ~self.game_over
+        if not live.any():
+            return
+        # Finished worlds step with dt = 0 and no input, which leaves them
+        # exactly as they are.
+        dt_w = np.where(live, dt, 0.0)
+        if commands is None:
+            bits = np.zeros((self.worlds, self.players), dtype=np.uint8)
+        else:
+            bits = np.where(live[:, None], commands, 0).astype(np.uint8)
+
+        self._apply_commands(dt, bits, live)
+        self._move(dt_w)
+        self._update_ufos(dt_w, live)
+        self._update_timers(dt_w)
+        self._collide(live)
+        self._next_waves(dt_w, live)
+
+    # Commands -------------------------------------------------------------
+
+    def _apply_commands(
+        self,
+        dt: float,
+        bits: np.ndarray,
+        live: np.ndarray,
+    ) -> None:
+        for w, j in zip(*np.nonzero(bits & HYPERSPACE), strict=True):
+            self._hyperspace(int(w), int(j))
+
+        shield = (bits & SHIELD != 0) & (self.shield_cd <= 0.0)
+        self.shield[shield] = C.SHIELD_DURATION
+        self.shield_cd[shield] = C.SHIELD_COOLDOWN
+
+        left = bits & ROTATE_LEFT != 0
+        right = bits & ROTATE_RIGHT != 0
+        turn = C.SHIP_TURN_SPEED * dt
+        angle = self.ship_angle
+        angle[left & ~right] -= turn
+        angle[right & ~left] += turn
+
+        thrust = bits & THRUST != 0
+        if thrust.any():
+            rad = np.radians(angle)
+            vel = self.ship_vel
+            vel[..., 0] += np.where(
+                thrust, np.cos(rad) * C.SHIP_THRUST * dt, 0.0
+            )
+            vel[..., 1] += np.where(
+                thrust, np.sin(rad) * C.SHIP_THRUST * dt, 0.0
+            )
+        friction = C.SHIP_FRICTION ** (dt * C.FPS)
+        self.ship_vel *= np.where(live, friction, 1.0)[:, None, None]
+
+        shoot = (bits & SHOOT != 0) & (self.ship_cool <= 0.0)
+        if shoot.any():
+            shoot &= self._bullet_counts() < C.MAX_BULLETS_PER_PLAYER
+            self._fire(*np.nonzero(shoot))
+
+    def _bullet_counts(self) -> np.ndarray:
+        """Live bullets per world and player."""
+        bullets = self.bullets
+        owned = bullets.owner[:, :, None] == self.player_ids
+        return (owned & bullets.rows()[:, :, None]).sum(axis=1)
+
+    def _fire(self, worlds: np.ndarray, players: np.ndarray) -> None:
+        if len(worlds) == 0:
+            return
+        rad = np.radians(self.ship_angle[worlds, players])
+        dirv = np.stack((np.cos(rad), np.sin(rad)), axis=-1)
+        pos = self.ship_pos[worlds, players] + dirv * (
+            int(C.SHIP_RADIUS) + C.BULLET_SPAWN_OFFSET
+        )
+        vel = self.ship_vel[worlds, players] + dirv * C.SHIP_BULLET_SPEED
+        self.ship_cool[worlds, players] = C.SHIP_FIRE_RATE
+        self.bullets.push_rows(
+            worlds,
+            pos=pos,
+            prev=pos,
+            vel=vel,
+            ttl=float(C.BULLET_TTL),
+            owner=self.player_ids[players],
+        )
+
+    def _hyperspace(self, w: int, j: int) -> None:
+        """World._find_safe_hyperspace_pos() and Ship.hyperspace()."""
+        field = self._clearance_field(w)
+        margin = int(C.SHIP_RADIUS) + C.HYPERSPACE_SAFE_MARGIN
+        pos = field.sample(self.rngs[w], margin)
+        self.ship_pos[w, j] = pos if pos is not None else field.clearest()
+        self.ship_vel[w, j] = 0.0
+        self.invuln[w, j] = C.SAFE_SPAWN_TIME
+        self.scores[w, j] = max(0, self.scores[w, j] - C.HYPERSPACE_COST)
+
+    # Motion ---------------------------------------------------------------
+
+    def _move(self, dt_w: np.ndarray) -> None:
+        """EntityStore.update(): asteroids, bullets, ufos, then ships."""
+        dt = dt_w[:, None, None]
+        bounds = self._bounds
+
+        asteroids = self.asteroids
+        np.mod(asteroids.pos + asteroids.vel * dt, bounds, out=asteroids.pos)
+
+        bullets = self.bullets
+        bullets.prev[:] = bullets.pos
+        bullets.pos += bullets.vel * dt
+        bullets.ttl -= dt_w[:, None]
+        bullets.sweep(bullets.ttl <= 0.0)
+
+        self.ufos.sweep(self._move_ufos(dt_w))
+
+        ship_timers = self.ship_cool, self.invuln, self.shield, self.shield_cd
+        for timer in ship_timers:
+            _tick(timer, dt_w[:, None])
+        np.mod(self.ship_pos + self.ship_vel * dt, bounds, out=self.ship_pos)
+
+    def _move_ufos(self, dt_w: np.ndarray) -> np.ndarray:
+        """UFO.update() for every UFO; returns the mask of those that left.
+
+        Small UFOs keep a constant velocity toward where they locked on,
+        so both kinds just drift.
+        """
+        ufos = self.ufos
+        _tick(ufos.cool, dt_w[:, None])
+        ufos.pos += ufos.vel * dt_w[:, None, None]
+        x = ufos.pos[..., 0]
+        y = ufos.pos[..., 1]
+        r = ufos.r
+        out = (x < -r) | (x > C.ARENA_WIDTH + r)
+        out |= (y < -r) | (y > C.ARENA_HEIGHT + r)
+        return out & ufos.rows()
+
+    def _update_ufos(self, dt_w: np.ndarray, live: np.ndarray) -> None:
+        """World._update_ufos(): the store already moved the UFOs once."""
+        ufos = self.ufos
+        if not ufos.count.any():
+            return
+
+        out = self._move_ufos(dt_w)
+        ready = ufos.rows() & ~out & (ufos.cool <= 0.0) & live[:, None]
+        shots_w: list[int] = []
+        shots_pos: list[tuple[float, float]] = []
+        shots_vel: list[tuple[float, float]] = []
+        worlds, rows = np.nonzero(ready)
+        nearest = nearest_wrapped(
+            ufos.pos[worlds, rows],
+            self.ship_pos[worlds],
+            self.lives[worlds] > 0,
+        ).tolist()
+        for w, u, j in zip(
+            worlds.tolist(), rows.tolist(), nearest, strict=True
+        ):
+            if j < 0:
+                continue
+            pos = Vec(*ufos.pos[w, u])
+            target = Vec(*self.ship_pos[w, j])
+            small = bool(ufos.small[w, u])
+            dirv = ufo_shot_dir(small, pos, target, self.rngs[w])
+            if dirv is None:
+                continue
+            ufos.cool[w, u] = (
+                C.UFO_FIRE_RATE_SMALL if small else C.UFO_FIRE_RATE_BIG
+            )
+            shots_w.append(w)
+            shots_pos.append(pos.xy)
+            shots_vel.append((dirv * C.UFO_BULLET_SPEED).xy)
+
+        for w in np.flatnonzero(out.any(axis=1)).tolist():
+            ufos.remove(w, np.flatnonzero(out[w]).tolist())
+
+        if shots_w:
+            pos = np.array(shots_pos)
+            self.bullets.push_rows(
+                np.array(shots_w),
+                pos=pos,
+                prev=pos,
+                vel=np.array(shots_vel),
+                ttl=float(C.UFO_BULLET_TTL),
+                owner=UFO_BULLET_OWNER,
+            )
+
+    def _nearest_ship(self, w: int, pos: Vec) -> Vec | None:
+        """World._nearest_ship_positions() for one point in world w."""
+        j = int(
+            nearest_wrapped(
+                np.array(pos.xy), self.ship_pos[w], self.lives[w] > 0
+            )
+        )
+        return None if j < 0 else Vec(*self.ship_pos[w, j])
+
+    # Spawns and timers ----------------------------------------------------
+
+    def _update_timers(self, dt_w: np.ndarray) -> None:
+        for w in np.flatnonzero(_tick(self.ufo_timer, dt_w)).tolist():
+            for _ in range(C.UFO_SPAWN_COUNT):
+                self._spawn_ufo(w)
+            self.ufo_timer[w] = C.UFO_SPAWN_EVERY
+
+    def _spawn_ufo(self, w: int) -> None:
+        rng = self.rngs[w]
+        small = rng.uniform(0, 1) < 0.5
+        pos = rand_edge_pos(rng)
+        # UFO() picks the heading, with World's draws.
+        ufo = UFO(pos, small, target_pos=self._nearest_ship(w, pos), rng=rng)
+        self.ufos.push(
+            w, pos=ufo.pos.xy, vel=ufo.vel.xy, r=ufo.r, cool=0.0, small=small
+        )
+
+    def _spawn_asteroid(self, w: int, pos: Vec, vel: Vec, size: int) -> None:
+        # Outlines are only drawn, so none is kept; the jitter is still
+        # drawn because World draws it from the same generator.
+        rng = self.rngs[w]
+        for _ in range(C.AST_POLY_STEPS[self.size_names[size]]):
+            rng.uniform(C.AST_POLY_JITTER_MIN, C.AST_POLY_JITTER_MAX)
+        self.asteroids.push(w, pos=pos.xy, vel=vel.xy, size=size)
+
+    def _next_waves(self, dt_w: np.ndarray, live: np.ndarray) -> None:
+        cleared = (self.asteroids.count == 0) & live
+        if not cleared.any():
+            return
+        ready = _tick(self.wave_cool, np.where(cleared, dt_w, 0.0))
+        for w in np.flatnonzero(ready).tolist():
+            self._start_wave(w)
+            self.wave_cool[w] = C.WAVE_DELAY
+
+    def _start_wave(self, w: int) -> None:
+        """World.start_wave() for world w."""
+        rng = self.rngs[w]
+        self.wave[w] += 1
+        count = C.WAVE_BASE_COUNT + int(self.wave[w])
+
+        ship_positions = [Vec(p) for p in self.ship_pos[w].tolist()]
+        intervals = safe_edge_intervals(
+            ship_positions, C.AST_MIN_SPAWN_DIST
+        )
+        if not intervals:
+            intervals = farthest_edge_intervals(ship_positions)
+
+        for _ in range(count):
+            pos = rand_safe_edge_pos(intervals, rng)
+            ang = rng.uniform(0, math.tau)
+            speed = rng.uniform(C.AST_VEL_MIN, C.AST_VEL_MAX)
+            vel = Vec(math.cos(ang), math.sin(ang)) * speed
+            self._spawn_asteroid(w, pos, vel, 0)
+
+    # Collisions -----------------------------------------------------------
+
+    def _collide(self, live: np.ndarray) -> None:
+        """Find every world's contacts at once, then resolve the few worlds
+        that have any, pass by pass as CollisionManager.resolve() does."""
+        asteroids, bullets, ufos = self.asteroids, self.bullets, self.ufos
+        n_ast = int(asteroids.count.max())
+        n_bul = int(bullets.count.max())
+        n_ufo = int(ufos.count.max())
+        rows = live[:, None]
+        ast_ok = asteroids.rows()[:, :n_ast] & rows
+        bul_ok = bullets.rows()[:, :n_bul] & rows
+        ufo_ok = ufos.rows()[:, :n_ufo] & rows
+        vulnerable = (self.invuln <= 0.0) & rows
+        shielded = (self.shield > 0.0) & rows
+
+        ast_pos = asteroids.pos[:, :n_ast]
+        ast_r = self.ast_radius[asteroids.size[:, :n_ast]]
+        start = bullets.prev[:, :n_bul]
+        end = bullets.pos[:, :n_bul]
+        owner = bullets.owner[:, :n_bul]
+        player_shot = bul_ok & (owner > 0)
+        ufo_shot = bul_ok & (owner == UFO_BULLET_OWNER)
+        ufo_pos = ufos.pos[:, :n_ufo]
+        ufo_r = ufos.r[:, :n_ufo]
+        ship_r = int(C.SHIP_RADIUS)
+        bullet_r = int(C.BULLET_RADIUS)
+
+        contacts = {}
+        if n_ast and n_bul:
+            reach = ast_r * ast_r
+            contacts["inside"] = (
+                (_swept_dist_sq(ast_pos, start, end) < reach[..., None])
+                & ast_ok[..., None]
+                & bul_ok[:, None]
+            )
+        if n_ufo and n_bul:
+            reach = ufo_r + bullet_r
+            reach *= reach
+            contacts["ufo_shot"] = (
+                (_swept_dist_sq(ufo_pos, start, end) < reach[..., None])
+                & ufo_ok[..., None]
+                & player_shot[:, None]
+            )
+        if n_ufo and n_ast:
+            reach = ufo_r[..., None] + ast_r[:, None]
+            contacts["ufo_ast"] = (
+                (_dist_sq(ufo_pos, ast_pos) < reach * reach)
+                & ufo_ok[..., None]
+                & ast_ok[:, None]
+            )
+        if n_ast:
+            reach = ship_r + ast_r[:, None]
+            contacts["ship_ast"] = (
+                (_dist_sq(self.ship_pos, ast_pos) < reach * reach)
+                & (vulnerable[..., None] & ast_ok[:, None])
+            )
+        if n_ufo:
+            reach = ship_r + ufo_r[:, None]
+            contacts["ship_ufo"] = (
+                (_dist_sq(self.ship_pos, ufo_pos) < reach * reach)
+                & (shielded[..., None] & ufo_ok[:, None])
+            )
+        if n_bul:
+            reach = (ship_r + bullet_r) ** 2
+            contacts["ship_shot"] = (
+                (_swept_dist_sq(self.ship_pos, start, end) < reach)
+                & (vulnerable[..., None] & ufo_shot[:, None])
+            )
+
+        by_world = {name: _by_world(hits) for name, hits in contacts.items()}
+        worlds = sorted({w for hits in by_world.values() for w in hits})
+        for w in worlds:
+            self._resolve(
+                w, {name: hits.get(w, {}) for name, hits in by_world.items()}
+            )
+
+    def _resolve(self, w: int, contacts: dict[str, dict]) -> None:
+        """CollisionManager.resolve() and World._handle_collisions()."""
+        rng = self.rngs[w]
+        asteroids, bullets, ufos = self.asteroids, self.bullets, self.ufos
+        ast_rows = _Rows(int(asteroids.count[w]))
+        bul_rows = _Rows(int(bullets.count[w]))
+        ufo_rows = _Rows(int(ufos.count[w]))
+        owner = bullets.owner[w].tolist()
+        sizes = asteroids.size[w].tolist()
+        shielded = (self.shield[w] > 0.0).tolist()
+        score_deltas: dict[int, int] = {}
+        spawns: list[tuple[Vec, Vec, int]] = []
+        deaths: list[int] = []
+
+        def add_score(player_id: int, score: int) -> None:
+            score_deltas[player_id] = score_deltas.get(player_id, 0) + score
+
+        def split(a: int, scorer_id: int | None = None) -> None:
+            size = sizes[a]
+            if scorer_id is not None:
+                add_score(scorer_id, self._ast_score[size])
+            pos = Vec(*asteroids.pos[w, a])
+            ast_rows.remove(a)
+            for new_size in self._ast_split[size]:
+                dirv = rand_unit_vec(rng)
+                speed = (
+                    rng.uniform(C.AST_VEL_MIN, C.AST_VEL_MAX)
+                    * C.AST_SPLIT_SPEED_MULT
+                )
+                spawns.append((pos, dirv * speed, new_size))
+
+        def destroy_ufo(u: int) -> None:
+            if ufo_rows.alive(u):
+                ufo_rows.remove(u)
+
+        def touching(hits: dict, i: int, rows: _Rows) -> list[int]:
+            return [j for j in hits.get(i, ()) if rows.alive(j)]
+
+        # Bullets vs asteroids.
+        hits = contacts.get("inside", {})
+        for a in range(len(ast_rows.order)):
+            inside = touching(hits, a, bul_rows)
+            if not inside:
+                continue
+            for b in inside:
+                bul_rows.remove(b)
+            if any(owner[b] == UFO_BULLET_OWNER for b in inside):
+                ast_rows.remove(a)
+                continue
+            scorers = [owner[b] for b in inside if owner[b] > 0]
+            split(a, scorers[0] if scorers else None)
+
+        # UFOs vs player bullets.
+        hits = contacts.get("ufo_shot", {})
+        for u in list(ufo_rows.order):
+            cfg = C.UFO_SMALL if ufos.small[w, u] else C.UFO_BIG
+            score = cfg["score"]
+            for b in touching(hits, u, bul_rows):
+                add_score(owner[b], score)
+                bul_rows.remove(b)
+                destroy_ufo(u)
+
+        # UFOs vs asteroids: the UFO dies, the asteroid splits unscored.
+        hits = contacts.get("ufo_ast", {})
+        for u in list(ufo_rows.order):
+            for a in touching(hits, u, ast_rows):
+                destroy_ufo(u)
+                split(a)
+                break
+
+        # Ships vs asteroids; the first death ends the pass.
+        hits = contacts.get("ship_ast", {})
+        for j in range(self.players):
+            for a in touching(hits, j, ast_rows):
+                if shielded[j]:
+                    split(a)
+                    continue
+                deaths.append(j)
+                break
+            if deaths:
+                break
+
+        # A shield destroys any UFO it touches, unscored.
+        hits = contacts.get("ship_ufo", {})
+        for j in range(self.players):
+            for u in touching(hits, j, ufo_rows):
+                destroy_ufo(u)
+
+        # Ships vs UFO bullets; again the first death ends the pass.
+        hits = contacts.get("ship_shot", {})
+        died = False
+        for j in range(self.players):
+            for b in touching(hits, j, bul_rows):
+                bul_rows.remove(b)
+                if shielded[j]:
+                    continue
+                deaths.append(j)
+                died = True
+                break
+            if died:
+                break
+
+        asteroids.gather(w, ast_rows.order)
+        bullets.gather(w, bul_rows.order)
+        ufos.gather(w, ufo_rows.order)
+
+        for player_id, delta in score_deltas.items():
+            j = player_id - C.LOCAL_PLAYER_ID
+            if 0 <= j < self.players:
+                self.scores[w, j] += delta
+                self._maybe_award_extra_life(w, j)
+        for pos, vel, size in spawns:
+            self._spawn_asteroid(w, pos, vel, size)
+        for j in deaths:
+            self._ship_die(w, j)
+
+    def _clearance_field(self, w: int) -> ClearanceField:
+        """World._clearance_field() for world w."""
+        asteroids, ufos = self.asteroids, self.ufos
+        n = asteroids.count[w]
+        m = ufos.count[w]
+        pos = np.concatenate((asteroids.pos[w, :n], ufos.pos[w, :m]))
+        r = np.concatenate(
+            (self.ast_radius[asteroids.size[w, :n]], ufos.r[w, :m])
+        )
+        self._clearance.build(pos[:, 0], pos[:, 1], r)
+        return self._clearance
+
+    def _ship_die(self, w: int, j: int) -> None:
+        """World._ship_die() and _find_respawn_pos()."""
+        self.lives[w, j] -= 1
+        field = self._clearance_field(w)
+        margin = int(C.SHIP_RADIUS) + C.RESPAWN_SAFE_MARGIN
+        pos = field.nearest(C.ARENA_WIDTH / 2, C.ARENA_HEIGHT / 2, margin)
+        self.ship_pos[w, j] = pos if pos is not None else field.clearest()
+        self.ship_vel[w, j] = 0.0
+        self.ship_angle[w, j] = -90.0
+        self.invuln[w, j] = C.SAFE_SPAWN_TIME
+        if np.all(self.lives[w] <= 0):
+            self.game_over[w] = True
+
+    def _maybe_award_extra_life(self, w: int, j: int) -> None:
+        target = int(self.scores[w, j]) // C.EXTRA_LIFE_EVERY
+        already = int(self.extra_lives_awarded[w, j])
+        if target <= already:
+            return
+        self.lives[w, j] += target - already
+        self.extra_lives_awarded[w, j] = target
+
+
+# Parity check ---------------------------------------------------------------
+
+
+def _world_state(world: World, players: int) -> dict[str, object]:
+    ids = range(C.LOCAL_PLAYER_ID, C.LOCAL_PLAYER_ID + players)
+    ships = [world.ships[pid] for pid in ids]
+    return {
+        "scores": [world.scores[pid] for pid in ids],
+        "lives": [world.lives[pid] for pid in ids],
+        "wave": world.wave,
+        "game_over": world.game_over,
+        "ships": [
+            (*s.pos, *s.vel, s.angle, s.invuln.remaining, s.shield.remaining)
+            for s in ships
+        ],
+        "asteroids": [
+            (*a.pos, *a.vel, a.r) for a in world.asteroids.entities
+        ],
+        "bullets": [
+            (*b.pos, *b.vel, b.ttl, b.owner_id)
+            for b in world.bullets.entities
+        ],
+        "ufos": [(*u.pos, *u.vel, u.r) for u in world.ufos.entities],
+    }
+
+
+def _vec_state(vec: VecWorld, w: int) -> dict[str, object]:
+    n_ast = vec.asteroids.count[w]
+    n_bul = vec.bullets.count[w]
+    n_ufo = vec.ufos.count[w]
+    ast_r = vec.ast_radius[vec.asteroids.size[w, :n_ast]]
+    return {
+        "scores": vec.scores[w].tolist(),
+        "lives": vec.lives[w].tolist(),
+        "wave": int(vec.wave[w]),
+        "game_over": bool(vec.game_over[w]),
+        "ships": np.column_stack(
+            (
+                vec.ship_pos[w],
+                vec.ship_vel[w],
+                vec.ship_angle[w],
+                vec.invuln[w],
+                vec.shield[w],
+            )
+        ).tolist(),
+        "asteroids": np.column_stack(
+            (
+                vec.asteroids.pos[w, :n_ast],
+                vec.asteroids.vel[w, :n_ast],
+                ast_r,
+            )
+        ).tolist(),
+        "bullets": np.column_stack(
+            (
+                vec.bullets.pos[w, :n_bul],
+                vec.bullets.vel[w, :n_bul],
+                vec.bullets.ttl[w, :n_bul],
+                vec.bullets.owner[w, :n_bul],
+            )
+        ).tolist(),
+        "ufos": np.column_stack(
+            (
+                vec.ufos.pos[w, :n_ufo],
+                vec.ufos.vel[w, :n_ufo],
+                vec.ufos.r[w, :n_ufo],
+            )
+        ).tolist(),
+    }
+
+
+def _diff(expected: object, actual: object, path: str) -> str | None:
+    """Where two states first differ, or None when they match exactly."""
+    if isinstance(expected, dict):
+        for key in expected:
+            found = _diff(expected[key], actual[key], f"{path}.{key}")
+            if found:
+                return found
+        return None
+    if isinstance(expected, list | tuple):
+        if len(expected) != len(actual):
+            return f"{path}: {len(expected)} entries, got {len(actual)}"
+        for i, (e, a) in enumerate(zip(expected, actual, strict=True)):
+            found = _diff(e, a, f"{path}[{i}]")
+            if found:
+                return found
+        return None
+    if expected != actual:
+        return f"{path}: expected {expected!r}, got {actual!r}"
+    return None
+
+
+def check_parity(
+    seed: int = 0,
+    worlds: int = 4,
+    frames: int = C.FPS * 120,
+    players: int = 1,
+    dt: float = 1.0 / C.FPS,
+) -> str | None:
+    """Play the same seeded games through World and VecWorld.
+
+    Even worlds are driven by AimBot, odd ones by RandomBot (which also
+    uses hyperspace and shields). Returns a description of the first
+    difference, or None if every frame matched exactly.
+    """
+    seeds = [seed + i for i in range(worlds)]
+    vec = VecWorld(worlds, seeds, players)
+    ids = list(range(C.LOCAL_PLAYER_ID, C.LOCAL_PLAYER_ID + players))
+    refs = []
+    policies = []
+    for i, world_seed in enumerate(seeds):
+        world = World(world_seed)
+        for pid in ids[1:]:
+            world.spawn_player(pid)
+        refs.append(world)
+        bot = AimBot if i % 2 == 0 else RandomBot
+        policies.append({pid: bot(world_seed + pid) for pid in ids})
+
+    bits = np.zeros((worlds, players), dtype=np.uint8)
+    for frame in range(frames):
+        for i, world in enumerate(refs):
+            commands = {pid: policies[i][pid](world, pid) for pid in ids}
+            for j, pid in enumerate(ids):
+                bits[i, j] = commands[pid].to_bits()
+            world.update(dt, commands)
+        vec.step(dt, bits)
+        for i, world in enumerate(refs):
+            found = _diff(
+                _world_state(world, players), _vec_state(vec, i), ""
+            )
+            if found:
+                return f"seed {seeds[i]} frame {frame}: {found}"
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--worlds", type=int, default=256)
+    parser.add_argument("--frames", type=int, default=C.FPS * 60)
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    if args.check:
+        found = check_parity(
+            args.seed, min(args.worlds, 8), args.frames, args.players
+        )
+        if found:
+            raise SystemExit(f"mismatch: {found}")
+        print(f"World and VecWorld agree over {args.frames} frames")
+        return
+
+    vec = VecWorld(
+        args.worlds,
+        range(args.seed, args.seed + args.worlds),
+        args.players,
+    )
+    noise = np.random.default_rng(args.seed)
+    shape = (args.worlds, args.players)
+    dt = 1.0 / C.FPS
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        # Random presses; hyperspace only now and then, as players use it.
+        commands = noise.integers(0, 64, shape) & ~HYPERSPACE
+        commands[noise.random(shape) < 0.002] |= HYPERSPACE
+        vec.step(dt, commands)
+        done = np.flatnonzero(vec.game_over)
+        if len(done):
+            vec.reset(done.tolist())
+    wall = time.perf_counter() - start
+    ticks = args.worlds * args.frames
+    print(
+        f"{args.worlds} worlds x {args.frames} frames in {wall:.2f} s:"
+        f" {ticks / wall:.0f} world-ticks/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,87 @@
 """Game systems (World, waves, score)."""
 
 import math
-from random import uniform
+from random import Random
 
-import pygame as pg
+import numpy as np
 
 from core import config as C
+from core import snapshot
+from core.clearance import ClearanceField
 from core.collisions import CollisionManager
 from core.commands import PlayerCommand
-from core.entities import UFO, Asteroid, Particle, Ship
-from core.utils import Countdown, Vec, rand_edge_pos
+from core.entities import UFO, UFO_BULLET_OWNER, Asteroid, Bullet, Ship
+from core.events import EventKind, EventStream
+from core.particles import ParticleSystem
+from core.pool import Pool, PoolStats
+from core.profiling import NullTimer, PhaseTimer
+from core.store import EntityStore
+from core.utils import (
+    Countdown,
+    Vec,
+    farthest_edge_intervals,
+    rand_edge_pos,
+    rand_safe_edge_pos,
+    safe_edge_intervals,
+)
 
 PlayerId = int
 
 
+def nearest_wrapped(
+    points: np.ndarray, targets: np.ndarray, valid: np.ndarray
+) -> np.ndarray:
+    """Index of the nearest valid target for each point, measured across
+    the wrapped arena edges; -1 where no target is valid.
+
+    points is (..., 2), targets (..., m, 2) and valid (..., m); the
+    leading dimensions broadcast. Ties go to the lower index.
+    """
+    bounds = np.array([C.ARENA_WIDTH, C.ARENA_HEIGHT], dtype=np.float64)
+    delta = targets - points[..., None, :]
+    delta = (delta + bounds / 2) % bounds - bounds / 2
+    d_sq = np.where(valid, (delta * delta).sum(axis=-1), np.inf)
+    return np.where(valid.any(axis=-1), d_sq.argmin(axis=-1), -1)
+
+
 class World:
     """World state and game rules.
 
     Multiplayer-ready:
     - World receives commands indexed by player_id.
-    - World generates events (strings) for the client (sounds/effects).
+    - World generates typed events (core.events) for the client
+      (sounds/effects); iterating them still yields the legacy strings.
+
+    Entities live in self.store, one array-backed table per kind. The
+    bullets, asteroids and ufos attributes are those tables and still read
+    like the sprite groups they replaced; bullets are also indexed by
+    owner (bullets.count(), ufo_bullets, player_bullets). Explosion
+    particles live in self.particles, a ParticleSystem outside the store.
+
+    Every random draw (waves, UFOs, splits, hyperspace, particles) comes
+    from self.rng, seeded with `seed` (default C.RANDOM_SEED; None seeds
+    from the OS). A seed plus the command stream reproduces a run exactly.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        seed: int | None = None,
+        rng: Random | None = None,
+    ) -> None:
+        if rng is None:
+            seed = C.RANDOM_SEED if seed is None else seed
+            rng = Random(seed)
+        self.seed = seed
+        self.rng = rng
+        self.bullet_pool = Pool(Bullet, C.BULLET_POOL_SIZE)
+        self.store = EntityStore(self.bullet_pool)
         self.ships: dict[PlayerId, Ship] = {}
-        self.bullets = pg.sprite.Group()
-        self.asteroids = pg.sprite.Group()
-        self.ufos = pg.sprite.Group()
-        self.particles = pg.sprite.Group()
-        self.all_sprites = pg.sprite.Group()
+        self.bullets = self.store.bullets
+        self.asteroids = self.store.asteroids
+        self.ufos = self.store.ufos
+        self.particles = ParticleSystem(
+            rng=np.random.default_rng(rng.getrandbits(64))
+        )
 
         self.scores: dict[PlayerId, int] = {}
         self.lives: dict[PlayerId, int] = {}
@@ -38,22 +91,52 @@ class World:
         self.ufo_timer = Countdown(C.UFO_SPAWN_EVERY)
         self.extra_life_notice = Countdown()
 
-        self.events: list[str] = []
-        self._collision_mgr = CollisionManager()
+        self.events = EventStream()
+        # Set to a PhaseTimer to profile update(); see core.headless.
+        self.timer: PhaseTimer | NullTimer = NullTimer()
+        self._collision_mgr = CollisionManager(rng=rng)
+        self._clearance = ClearanceField()
 
         self.game_over = False
 
         self.spawn_player(C.LOCAL_PLAYER_ID)
 
+    @property
+    def all_sprites(self) -> EntityStore:
+        """Every stored entity, in draw order (read-only view)."""
+        return self.store
+
     def begin_frame(self) -> None:
         self.events.clear()
 
     def reset(self) -> None:
-        """Reset the world (used on Game Over)."""
-        self.__init__()
+        """Reset the world (used on Game Over).
+
+        The event stream and the timer survive, so subscriptions and
+        profiling stay in place. The next game keeps drawing from the same
+        generator, so a seeded session stays reproducible across resets.
+        """
+        events = self.events
+        timer = self.timer
+        self.__init__(self.seed, self.rng)
+        events.clear()
+        self.events = events
+        self.timer = timer
+
+    def snapshot(self) -> bytes:
+        """The whole simulation state as compact bytes; see core.snapshot."""
+        return snapshot.dump(self)
+
+    def restore(self, data: bytes | memoryview) -> None:
+        """Return to a snapshot() taken from this or another World.
+
+        Reads data in place, so a memoryview into a larger buffer works
+        without copying. Raises ValueError on a bad or foreign snapshot.
+        """
+        snapshot.load(self, data)
 
     def spawn_player(self, player_id: PlayerId) -> None:
-        pos = Vec(C.WIDTH / 2, C.HEIGHT / 2)
+        pos = Vec(C.ARENA_WIDTH / 2, C.ARENA_HEIGHT / 2)
         ship = Ship(player_id, pos)
         ship.invuln.reset(C.SAFE_SPAWN_TIME)
 
@@ -61,7 +144,23 @@ class World:
         self.scores[player_id] = 0
         self.lives[player_id] = C.START_LIVES
         self.extra_lives_awarded[player_id] = 0
-        self.all_sprites.add(ship)
+        self.store.ships.add(ship)
+        self._collision_mgr.track(ship)
+
+    def pool_stats(self) -> dict[str, PoolStats]:
+        return {
+            "bullets": self.bullet_pool.stats(),
+        }
+
+    @property
+    def ufo_bullets(self) -> list[Bullet]:
+        """Live UFO bullets, from the owner index of self.bullets."""
+        return self.bullets.owned_by(UFO_BULLET_OWNER)
+
+    @property
+    def player_bullets(self) -> list[Bullet]:
+        """Live player bullets, from the owner index of self.bullets."""
+        return self.bullets.player_bullets()
 
     def get_ship(self, player_id: PlayerId) -> Ship | None:
         return self.ships.get(player_id)
@@ -70,35 +169,34 @@ class World:
         self.wave += 1
         count = C.WAVE_BASE_COUNT + self.wave
 
+        # Asteroids enter from the edge, at least AST_MIN_SPAWN_DIST from
+        # every ship, or spread over the stretches farthest from them.
         ship_positions = [s.pos for s in self.ships.values()]
-        min_dist_sq = C.AST_MIN_SPAWN_DIST * C.AST_MIN_SPAWN_DIST
+        intervals = safe_edge_intervals(
+            ship_positions, C.AST_MIN_SPAWN_DIST
+        )
+        if not intervals:
+            intervals = farthest_edge_intervals(ship_positions)
 
         for _ in range(count):
-            pos = rand_edge_pos()
-            while any(
-                (pos - sp).length_squared() < min_dist_sq
-                for sp in ship_positions
-            ):
-                pos = rand_edge_pos()
-
-            ang = uniform(0, math.tau)
-            speed = uniform(C.AST_VEL_MIN, C.AST_VEL_MAX)
+            pos = rand_safe_edge_pos(intervals, self.rng)
+            ang = self.rng.uniform(0, math.tau)
+            speed = self.rng.uniform(C.AST_VEL_MIN, C.AST_VEL_MAX)
             vel = Vec(math.cos(ang), math.sin(ang)) * speed
             self.spawn_asteroid(pos, vel, "L")
 
     def spawn_asteroid(self, pos: Vec, vel: Vec, size: str) -> None:
-        ast = Asteroid(pos, vel, size)
+        ast = Asteroid(pos, vel, size, self.rng)
         self.asteroids.add(ast)
-        self.all_sprites.add(ast)
+        self._collision_mgr.track(ast)
 
     def spawn_ufo(self) -> None:
-        small = uniform(0, 1) < 0.5
-        pos = rand_edge_pos()
-        target = self._get_nearest_ship_pos(pos)
-        ufo = UFO(pos, small, target_pos=target)
+        small = self.rng.uniform(0, 1) < 0.5
+        pos = rand_edge_pos(self.rng)
+        (target,) = self._nearest_ship_positions([pos])
+        ufo = UFO(pos, small, target_pos=target, rng=self.rng)
         self.ufos.add(ufo)
-
-        self.all_sprites.add(ufo)
+        self._collision_mgr.track(ufo)
 
     def update(
         self,
@@ -110,13 +208,25 @@ class World:
         if self.game_over:
             return
 
+        timer = self.timer
+        timer.start()
         self._apply_commands(dt, commands_by_player_id)
-        self.all_sprites.update(dt)
+        timer.lap("commands")
+        self.store.update(dt)
+        timer.lap("entities")
+        self.particles.update(dt)
+        timer.lap("particles")
 
         self._update_ufos(dt)
+        timer.lap("ufos")
         self._update_timers(dt)
+        timer.lap("timers")
+        self.store.sync()
+        timer.lap("sync")
         self._handle_collisions()
+        timer.lap("collisions")
         self._maybe_start_next_wave(dt)
+        timer.lap("waves")
 
     def _apply_commands(
         self,
@@ -135,62 +245,86 @@ class World:
                 )
 
             if cmd.shield and ship.try_activate_shield():
-                self.events.append("shield_on")
+                self.events.emit(EventKind.SHIELD_ON, ship.pos, player_id)
 
-            bullet = ship.apply_command(cmd, dt, self.bullets)
+            bullet = ship.apply_command(
+                cmd, dt, self.bullets, self.bullet_pool
+            )
             if bullet is not None:
-                self.bullets.add(bullet)
-                self.all_sprites.add(bullet)
-                self.events.append("player_shoot")
+                self._add_bullet(bullet)
+                self.events.emit(
+                    EventKind.PLAYER_SHOOT, bullet.pos, player_id
+                )
 
     def _update_ufos(self, dt: float) -> None:
-        for ufo in list(self.ufos):
+        # Moving draws nothing from self.rng, so every UFO can move before
+        # any fires, and all of them get their target in one query.
+        ufos = list(self.ufos)
+        for ufo in ufos:
             ufo.update(dt)
-            if not ufo.alive():
-                continue
+        ufos = [ufo for ufo in ufos if ufo.alive()]
+        targets = self._nearest_ship_positions([ufo.pos for ufo in ufos])
 
-            ufo.target_pos = self._get_nearest_ship_pos(ufo.pos)
-            bullet = ufo.try_fire()
+        for ufo, target in zip(ufos, targets, strict=True):
+            ufo.target_pos = target
+            bullet = ufo.try_fire(self.bullet_pool)
             if bullet is not None:
-                self.bullets.add(bullet)
-                self.all_sprites.add(bullet)
-                self.events.append("ufo_shoot")
-
-            if not ufo.alive():
-                self.ufos.remove(ufo)
-
-    def _get_nearest_ship_pos(self, from_pos: Vec) -> Vec | None:
-        """Return position of the nearest living ship to from_pos."""
-        nearest = None
-        min_dist_sq = float("inf")
-        for ship in self.ships.values():
-            d_sq = (ship.pos - from_pos).length_squared()
-            if d_sq < min_dist_sq:
-                min_dist_sq = d_sq
-                nearest = ship
-        return nearest.pos if nearest else None
+                self._add_bullet(bullet)
+                self.events.emit(
+                    EventKind.UFO_SHOOT, bullet.pos, UFO_BULLET_OWNER
+                )
+
+    def _add_bullet(self, bullet: Bullet) -> None:
+        self.bullets.add(bullet)
+        self._collision_mgr.track(bullet)
+
+    def _nearest_ship_positions(self, points: list[Vec]) -> list[Vec | None]:
+        """Position of the nearest ship with lives left to each point,
+        across the wrapped edges; None where no ship has any."""
+        ships = [s for pid, s in self.ships.items() if self.lives[pid] > 0]
+        if len(ships) <= 1 or not points:
+            return [ships[0].pos if ships else None] * len(points)
+        nearest = nearest_wrapped(
+            np.array([(p.x, p.y) for p in points]),
+            np.array([(s.pos.x, s.pos.y) for s in ships]),
+            np.ones(len(ships), dtype=bool),
+        )
+        return [ships[i].pos for i in nearest.tolist()]
 
     def _find_safe_hyperspace_pos(self, ship: Ship) -> Vec:
-        """Pick a random position that is not on top of an asteroid.
+        """Pick a random position at least HYPERSPACE_SAFE_MARGIN clear of
+        every asteroid and UFO.
 
-        Tries HYPERSPACE_ATTEMPTS times. Falls back to an unchecked random
-        position if no clear spot is found, which only happens when the screen
-        is saturated with asteroids.
+        When the arena is too crowded for that, the ship goes to the
+        clearest spot there is instead.
         """
-        margin = ship.r + C.HYPERSPACE_SAFE_MARGIN
-        for _ in range(C.HYPERSPACE_ATTEMPTS):
-            pos = Vec(uniform(0, C.WIDTH), uniform(0, C.HEIGHT))
-            if all(
-                (pos - ast.pos).length_squared()
-                > (ast.r + margin) ** 2
-                for ast in self.asteroids
-            ):
-                return pos
-        return Vec(uniform(0, C.WIDTH), uniform(0, C.HEIGHT))
+        field = self._clearance_field()
+        pos = field.sample(self.rng, ship.r + C.HYPERSPACE_SAFE_MARGIN)
+        return Vec(pos if pos is not None else field.clearest())
+
+    def _find_respawn_pos(self, ship: Ship) -> Vec:
+        """The centre, or the nearest spot to it at least
+        RESPAWN_SAFE_MARGIN clear of every asteroid and UFO; the clearest
+        spot if there is none."""
+        field = self._clearance_field()
+        margin = ship.r + C.RESPAWN_SAFE_MARGIN
+        pos = field.nearest(C.ARENA_WIDTH / 2, C.ARENA_HEIGHT / 2, margin)
+        return Vec(pos if pos is not None else field.clearest())
+
+    def _clearance_field(self) -> ClearanceField:
+        """self._clearance, rebuilt from the asteroid and UFO columns."""
+        asteroids, ufos = self.asteroids, self.ufos
+        self._clearance.build(
+            np.frombuffer(asteroids.x + ufos.x),
+            np.frombuffer(asteroids.y + ufos.y),
+            np.frombuffer(asteroids.r + ufos.r),
+        )
+        return self._clearance
 
     def _update_timers(self, dt: float) -> None:
         if self.ufo_timer.tick(dt):
-            self.spawn_ufo()
+            for _ in range(C.UFO_SPAWN_COUNT):
+                self.spawn_ufo()
             self.ufo_timer.reset(C.UFO_SPAWN_EVERY)
         self.extra_life_notice.tick(dt)
 
@@ -208,10 +342,9 @@ class World:
             self.bullets,
             self.asteroids,
             self.ufos,
+            self.events,
         )
 
-        self.events.extend(result.events)
-
         for player_id, delta in result.score_deltas.items():
             if player_id in self.scores:
                 self.scores[player_id] += delta
@@ -220,38 +353,23 @@ class World:
         for pos, vel, size in result.asteroids_to_spawn:
             self.spawn_asteroid(pos, vel, size)
 
-        for pos, kind in result.particles_to_spawn:
-            self._spawn_particles(pos, kind)
+        self.particles.spawn(result.particles_to_spawn)
 
         for player_id in result.ship_deaths:
             ship = self.get_ship(player_id)
             if ship is not None:
-                self._spawn_particles(Vec(ship.pos), "ship")
+                self.particles.emit(ship.pos, "ship")
                 self._ship_die(ship)
 
-    def _spawn_particles(self, pos: Vec, kind: str) -> None:
-        count, sp_min, sp_max, ttl = {
-            "asteroid": C.PARTICLE_ASTEROID,
-            "ufo": C.PARTICLE_UFO,
-            "ship": C.PARTICLE_SHIP,
-        }[kind]
-        for _ in range(count):
-            ang = uniform(0.0, math.tau)
-            speed = uniform(sp_min, sp_max)
-            vel = Vec(math.cos(ang), math.sin(ang)) * speed
-            p = Particle(pos, vel, ttl)
-            self.particles.add(p)
-            self.all_sprites.add(p)
-
     def _ship_die(self, ship: Ship) -> None:
         pid = ship.player_id
+        self.events.emit(EventKind.SHIP_EXPLOSION, ship.pos, pid, ship.r)
         self.lives[pid] = self.lives[pid] - 1
-        ship.pos.xy = (C.WIDTH / 2, C.HEIGHT / 2)
+        ship.pos.update(self._find_respawn_pos(ship))
         ship.vel.xy = (0, 0)
         ship.angle = -90.0
         ship.invuln.reset(C.SAFE_SPAWN_TIME)
 
-        self.events.append("ship_explosion")
         if all(v <= 0 for v in self.lives.values()):
             self.game_over = True
 
@@ -266,4 +384,4 @@ class World:
         self.lives[player_id] += gained
         self.extra_lives_awarded[player_id] = target
         self.extra_life_notice.reset(C.EXTRA_LIFE_NOTICE_TIME)
-        self.events.append("extra_life")
+        self.events.emit(EventKind.EXTRA_LIFE, owner=player_id)
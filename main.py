@@ -1,8 +1,15 @@
+import argparse
+
 from client.game import Game
 
 
 def main() -> None:
-    Game().run()
+    parser = argparse.ArgumentParser(description="Asteroids")
+    parser.add_argument(
+        "--record", metavar="FILE", help="write the session to a replay file"
+    )
+    args = parser.parse_args()
+    Game(record=args.record).run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+"""Wire format between players and server.server.
+
+A player opens a TCP connection and asks to join a room; the server
+answers with a player id and a session token, or turns it away. Messages
+on the stream are a tag byte and a fixed-size little-endian body:
+
+    J  join     room id
+    W  welcome  room id, player id, session token
+    F  full     room id (no free seat, or no room left to open)
+    C  command  sequence number, packed PlayerCommand byte
+    S  state    frame length, followed by a core.delta frame
+    A  ack      tick of the latest state frame decoded
+
+Commands can also travel as UDP datagrams to the same port, one per
+datagram, carrying the session token in place of the connection:
+
+    C  token, sequence number, packed PlayerCommand byte
+
+A player numbers its commands and the server drops any that is not newer
+than the last one it took, so a reordered datagram never rolls input
+back. A command is the player's controls as of its latest frame: HELD
+controls (rotate, thrust) stay applied on every tick until a newer command
+changes them, and the rest (shoot, hyperspace, shield) are presses that
+apply on the next tick only.
+
+Every tick the server sends each seated player a state frame against the
+last tick they acknowledged; a player who stops acknowledging keeps
+getting frames against an older baseline, and then full ones.
+"""
+
+import asyncio
+import struct
+
+from core.commands import ROTATE_LEFT, ROTATE_RIGHT, THRUST
+
+TAG_JOIN = ord("J")
+TAG_WELCOME = ord("W")
+TAG_FULL = ord("F")
+TAG_COMMAND = ord("C")
+TAG_STATE = ord("S")
+TAG_ACK = ord("A")
+
+# Bodies on the stream, by tag.
+JOIN = struct.Struct("<I")
+# room id, player id, token
+WELCOME = struct.Struct("<IBQ")
+FULL = struct.Struct("<I")
+# sequence number, command bits
+COMMAND = struct.Struct("<IB")
+# frame length; the frame follows
+STATE = struct.Struct("<I")
+# tick
+ACK = struct.Struct("<I")
+BODIES = {
+    TAG_JOIN: JOIN,
+    TAG_WELCOME: WELCOME,
+    TAG_FULL: FULL,
+    TAG_COMMAND: COMMAND,
+    TAG_STATE: STATE,
+    TAG_ACK: ACK,
+}
+
+# tag, token, sequence number, command bits
+DATAGRAM = struct.Struct("<BQIB")
+
+HELD = ROTATE_LEFT | ROTATE_RIGHT | THRUST
+
+
+def message(tag: int, *values: int) -> bytes:
+    """A stream message: tag, then values packed as that tag's body."""
+    return bytes((tag,)) + BODIES[tag].pack(*values)
+
+
+async def read_message(
+    reader: asyncio.StreamReader,
+) -> tuple[int, tuple[int, ...]]:
+    """The next stream message as (tag, body values).
+
+    A state message's frame is left on the stream for the caller to read.
+    Raises asyncio.IncompleteReadError at end of stream and ValueError on
+    an unknown tag.
+    """
+    tag = (await reader.readexactly(1))[0]
+    body = BODIES.get(tag)
+    if body is None:
+        raise ValueError(f"unknown message tag: {tag:#04x}")
+    return tag, body.unpack(await reader.readexactly(body.size))
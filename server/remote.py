@@ -0,0 +1,173 @@
+"""Network players for server.server: a client and a load test.
+
+Usage: python -m server.remote [--host HOST] [--port N] [--rooms N]
+                               [--players N] [--udp] [--duration SECONDS]
+                               [--seed N]
+
+Joins --players players to each of --rooms rooms over TCP, then has each
+one send a RandomBot command every tick, over its connection or, with
+--udp, as datagrams, while decoding and acknowledging the state frames
+the server sends. Run it against a server on localhost and watch the
+server's report; the load test ends with the state bytes received.
+"""
+
+import argparse
+import asyncio
+from contextlib import suppress
+
+from core import config as C
+from core.bots import RandomBot
+from core.commands import PlayerCommand
+from core.delta import DeltaDecoder, State
+from core.world import PlayerId
+from server.protocol import (
+    DATAGRAM,
+    TAG_ACK,
+    TAG_COMMAND,
+    TAG_JOIN,
+    TAG_STATE,
+    TAG_WELCOME,
+    message,
+    read_message,
+)
+
+
+class RemotePlayer:
+    """One seat in a server room, seen from the player's side."""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        room_id: int,
+        player_id: PlayerId,
+        token: int,
+    ) -> None:
+        self.room_id = room_id
+        self.player_id = player_id
+        self.token = token
+        self.decoder = DeltaDecoder()
+        # Bytes of state frames received so far.
+        self.received = 0
+        self._reader = reader
+        self._writer = writer
+        self._udp: asyncio.DatagramTransport | None = None
+        self._seq = 0
+
+    @classmethod
+    async def join(
+        cls, room_id: int, host: str | None = None, port: int | None = None
+    ) -> "RemotePlayer":
+        """Connect and take a seat; raises ConnectionError if the server
+        turns the player away."""
+        host = host or C.SERVER_HOST
+        port = C.SERVER_PORT if port is None else port
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(message(TAG_JOIN, room_id))
+        tag, body = await read_message(reader)
+        if tag != TAG_WELCOME:
+            writer.close()
+            raise ConnectionError(f"room {room_id} is full")
+        _, player_id, token = body
+        return cls(reader, writer, room_id, player_id, token)
+
+    async def open_udp(self) -> None:
+        """Send commands as datagrams from now on."""
+        loop = asyncio.get_running_loop()
+        host, port = self._writer.get_extra_info("peername")[:2]
+        self._udp, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=(host, port)
+        )
+
+    def send(self, command: PlayerCommand) -> None:
+        """Send the controls as of this frame."""
+        self._seq += 1
+        bits = command.to_bits()
+        if self._udp is not None:
+            self._udp.sendto(
+                DATAGRAM.pack(TAG_COMMAND, self.token, self._seq, bits)
+            )
+        else:
+            self._writer.write(message(TAG_COMMAND, self._seq, bits))
+
+    async def receive(self) -> State:
+        """Wait for the next state frame, decode it and acknowledge it.
+        Raises asyncio.IncompleteReadError when the server hangs up."""
+        while True:
+            tag, body = await read_message(self._reader)
+            if tag == TAG_STATE:
+                break
+        frame = await self._reader.readexactly(body[0])
+        self.received += len(frame)
+        state = self.decoder.decode(frame)
+        self._writer.write(message(TAG_ACK, self.decoder.ack))
+        return state
+
+    async def close(self) -> None:
+        if self._udp is not None:
+            self._udp.close()
+        self._writer.close()
+        with suppress(ConnectionError):
+            await self._writer.wait_closed()
+
+
+async def _load(args: argparse.Namespace) -> None:
+    players = []
+    for room_id in range(args.rooms):
+        for _ in range(args.players):
+            player = await RemotePlayer.join(room_id, args.host, args.port)
+            if args.udp:
+                await player.open_udp()
+            players.append(player)
+    print(f"{len(players)} players in {args.rooms} rooms")
+
+    bots = [RandomBot(args.seed + i) for i in range(len(players))]
+    receivers = [asyncio.create_task(_receive(p)) for p in players]
+    loop = asyncio.get_running_loop()
+    period = 1.0 / C.TICK_RATE
+    start = loop.time()
+    end = start + args.duration
+    try:
+        while loop.time() < end:
+            for player, bot in zip(players, bots, strict=True):
+                # RandomBot never looks at the world.
+                player.send(bot(None, player.player_id))
+            await asyncio.sleep(period)
+    finally:
+        for receiver in receivers:
+            receiver.cancel()
+        for player in players:
+            await player.close()
+    received = sum(player.received for player in players)
+    elapsed = loop.time() - start
+    print(
+        f"received {received:,} state bytes,"
+        f" {received / elapsed / len(players):,.0f} B/s per player"
+    )
+
+
+async def _receive(player: RemotePlayer) -> None:
+    with suppress(asyncio.IncompleteReadError, ConnectionError):
+        while True:
+            await player.receive()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=C.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=C.SERVER_PORT)
+    parser.add_argument("--rooms", type=int, default=1)
+    parser.add_argument("--players", type=int, default=1)
+    parser.add_argument("--udp", action="store_true")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not 1 <= args.rooms <= C.SERVER_MAX_ROOMS:
+        parser.error(f"--rooms must be between 1 and {C.SERVER_MAX_ROOMS}")
+    if not 1 <= args.players <= C.MAX_PLAYERS:
+        parser.error(f"--players must be between 1 and {C.MAX_PLAYERS}")
+    asyncio.run(_load(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""One game hosted by the server: a World and the players seated in it."""
+
+from dataclasses import dataclass
+
+from core import config as C
+from core.bots import Policy
+from core.commands import PlayerCommand
+from core.delta import DeltaEncoder
+from core.world import PlayerId, World
+from server.protocol import HELD
+
+_COMMANDS = tuple(PlayerCommand.from_bits(bits) for bits in range(64))
+
+
+@dataclass
+class RoomStats:
+    """How a room's ticks went since the stats were last taken.
+
+    latency runs from the moment a tick was due to the moment the room
+    finished it, so it includes waiting behind other rooms; a tick that
+    finished after the next one was due missed its deadline.
+    """
+
+    ticks: int = 0
+    missed: int = 0
+    update: float = 0.0
+    update_max: float = 0.0
+    latency: float = 0.0
+    latency_max: float = 0.0
+
+    def add(self, update: float, latency: float, missed: bool) -> None:
+        self.ticks += 1
+        self.missed += missed
+        self.update += update
+        self.update_max = max(self.update_max, update)
+        self.latency += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def merge(self, other: "RoomStats") -> None:
+        """Count other's ticks in with these."""
+        self.ticks += other.ticks
+        self.missed += other.missed
+        self.update += other.update
+        self.update_max = max(self.update_max, other.update_max)
+        self.latency += other.latency
+        self.latency_max = max(self.latency_max, other.latency_max)
+
+    @property
+    def mean_update(self) -> float:
+        return self.update / self.ticks if self.ticks else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency / self.ticks if self.ticks else 0.0
+
+
+class _Seat:
+    """A remote player's input between ticks."""
+
+    __slots__ = ("seq", "held", "pressed", "ack")
+
+    def __init__(self) -> None:
+        self.seq = -1
+        self.held = 0
+        self.pressed = 0
+        # Latest state frame the player decoded.
+        self.ack: int | None = None
+
+    def receive(self, seq: int, bits: int) -> None:
+        if seq <= self.seq:
+            return
+        self.seq = seq
+        self.held = bits & HELD
+        self.pressed |= bits & ~HELD
+
+    def take(self) -> PlayerCommand:
+        bits = self.held | self.pressed
+        self.pressed = 0
+        return _COMMANDS[bits & 0x3F]
+
+
+class Room:
+    """A World with up to MAX_PLAYERS seats, for remote players or bots.
+
+    A player who leaves frees the seat; their ship stays in the world,
+    idle, and the next player to join takes it over. After a game over the
+    room starts a new game with everyone still seated.
+
+    While remote players are seated, each step() captures the world for
+    state frames; see frame().
+    """
+
+    def __init__(self, room_id: int, seed: int | None = None) -> None:
+        self.id = room_id
+        self.world = World(seed)
+        self.seats: dict[PlayerId, _Seat] = {}
+        self.bots: dict[PlayerId, Policy] = {}
+        self.stats = RoomStats()
+        self.tick = 0
+        self.encoder = DeltaEncoder()
+
+    def __len__(self) -> int:
+        return len(self.seats) + len(self.bots)
+
+    def join(self) -> PlayerId | None:
+        """Seat a remote player; their id, or None if the room is full."""
+        pid = self._free_id()
+        if pid is not None:
+            self.seats[pid] = _Seat()
+        return pid
+
+    def add_bot(self, policy: Policy) -> PlayerId | None:
+        """Seat a bot driven by policy; its id, or None if full."""
+        pid = self._free_id()
+        if pid is not None:
+            self.bots[pid] = policy
+        return pid
+
+    def leave(self, player_id: PlayerId) -> None:
+        self.seats.pop(player_id, None)
+        self.bots.pop(player_id, None)
+
+    def receive(self, player_id: PlayerId, seq: int, bits: int) -> None:
+        """Take command number seq from a seated player."""
+        seat = self.seats.get(player_id)
+        if seat is not None:
+            seat.receive(seq, bits)
+
+    def acknowledge(self, player_id: PlayerId, tick: int) -> None:
+        """Note that a seated player decoded the state frame of tick."""
+        seat = self.seats.get(player_id)
+        if seat is not None and (seat.ack is None or tick > seat.ack):
+            seat.ack = tick
+
+    def frame(self, player_id: PlayerId) -> bytes | None:
+        """The state frame for a seated player, against their last ack;
+        None if the world was not captured on the latest tick."""
+        if self.encoder.tick != self.tick:
+            return None
+        return self.encoder.encode(self.seats[player_id].ack)
+
+    def step(self, dt: float) -> None:
+        """Advance the world one tick with everyone's latest input."""
+        world = self.world
+        commands = {pid: seat.take() for pid, seat in self.seats.items()}
+        for pid, policy in self.bots.items():
+            commands[pid] = policy(world, pid)
+        world.update(dt, commands)
+        if world.game_over:
+            world.reset()
+            for pid in (*self.seats, *self.bots):
+                self._spawn(pid)
+        self.tick += 1
+        if self.seats:
+            self.encoder.capture(world, self.tick)
+
+    def take_stats(self) -> RoomStats:
+        """The stats so far, starting a fresh count."""
+        stats, self.stats = self.stats, RoomStats()
+        return stats
+
+    def _free_id(self) -> PlayerId | None:
+        for pid in range(C.LOCAL_PLAYER_ID, C.LOCAL_PLAYER_ID + C.MAX_PLAYERS):
+            if pid not in self.seats and pid not in self.bots:
+                self._spawn(pid)
+                return pid
+        return None
+
+    def _spawn(self, player_id: PlayerId) -> None:
+        if self.world.get_ship(player_id) is None:
+            self.world.spawn_player(player_id)
@@ -0,0 +1,334 @@
+"""Authoritative game server: many World rooms on one asyncio loop.
+
+Usage: python -m server.server [--host HOST] [--port N] [--seed N]
+                               [--rooms N] [--bots N] [--policy NAME]
+                               [--report SECONDS] [--duration SECONDS]
+
+Players connect over TCP, join a room by id (the first join opens it) and
+send commands over the connection or over UDP to the same port, and get
+a core.delta state frame back over the connection every tick; see
+server.protocol. One scheduler task ticks every room at TICK_RATE. Each
+tick is due one period after the last, and every room is stepped once
+per tick, in a rotating order so no room always goes last. Between rooms
+the scheduler lets network I/O in every SERVER_SLICE seconds. When the
+scheduler falls more than SERVER_MAX_LAG behind, it drops the ticks it
+cannot make up instead of running a burst.
+
+Every --report seconds the server prints tick rate, the time World.update()
+takes, tick latency (from when a tick was due until a room finished it)
+and missed deadlines, overall and for the rooms with the worst latency.
+--rooms opens that many rooms at start, each with --bots players driven
+by a core.bots policy, which measures how many games one core can carry
+without any network clients.
+"""
+
+import argparse
+import asyncio
+import secrets
+from collections.abc import Mapping
+from contextlib import suppress
+
+from core import config as C
+from core.bots import POLICIES
+from core.world import PlayerId
+from server.protocol import (
+    DATAGRAM,
+    TAG_ACK,
+    TAG_COMMAND,
+    TAG_FULL,
+    TAG_JOIN,
+    TAG_STATE,
+    TAG_WELCOME,
+    message,
+    read_message,
+)
+from server.room import Room, RoomStats
+
+
+class GameServer:
+    """Hosts rooms and the network endpoints that feed them.
+
+    With port 0 the system picks a free port, and start() sets self.port
+    to it. Rooms can be opened and filled with bots before start().
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.host = host or C.SERVER_HOST
+        self.port = C.SERVER_PORT if port is None else port
+        self.seed = seed
+        self.rooms: dict[int, Room] = {}
+        # Ticks the scheduler dropped after falling behind.
+        self.dropped = 0
+        # Stats of rooms closed since take_stats(), by room id.
+        self._closed: dict[int, RoomStats] = {}
+        self._sessions: dict[int, tuple[Room, PlayerId]] = {}
+        self._streams: dict[int, asyncio.StreamWriter] = {}
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._tcp: asyncio.Server | None = None
+        self._udp: asyncio.DatagramTransport | None = None
+        self._scheduler: asyncio.Task | None = None
+
+    def open_room(self, room_id: int) -> Room | None:
+        """The room with that id, opened if need be; None if it is not
+        open and SERVER_MAX_ROOMS already are."""
+        room = self.rooms.get(room_id)
+        if room is None and len(self.rooms) < C.SERVER_MAX_ROOMS:
+            seed = None if self.seed is None else self.seed + room_id
+            room = self.rooms[room_id] = Room(room_id, seed)
+        return room
+
+    def take_stats(self) -> dict[int, RoomStats]:
+        """Every room's stats since they were last taken, by room id,
+        including rooms closed in the meantime."""
+        stats, self._closed = self._closed, {}
+        for room_id, room in self.rooms.items():
+            taken = room.take_stats()
+            if room_id in stats:
+                stats[room_id].merge(taken)
+            else:
+                stats[room_id] = taken
+        return stats
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._tcp = await asyncio.start_server(
+            self._serve_stream, self.host, self.port
+        )
+        self.port = self._tcp.sockets[0].getsockname()[1]
+        self._udp, _ = await loop.create_datagram_endpoint(
+            lambda: _Datagrams(self), local_addr=(self.host, self.port)
+        )
+        self._scheduler = asyncio.create_task(self._schedule())
+
+    async def close(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._scheduler
+        if self._udp is not None:
+            self._udp.close()
+        for writer in list(self._writers):
+            writer.close()
+        if self._tcp is not None:
+            self._tcp.close()
+            await self._tcp.wait_closed()
+
+    async def _schedule(self) -> None:
+        loop = asyncio.get_running_loop()
+        period = 1.0 / C.TICK_RATE
+        due = loop.time()
+        turn = 0
+        while True:
+            delay = due - loop.time()
+            if delay > 0.0:
+                await asyncio.sleep(delay)
+            deadline = due + period
+
+            rooms = list(self.rooms.values())
+            if rooms:
+                turn %= len(rooms)
+                rooms = rooms[turn:] + rooms[:turn]
+                turn += 1
+            yield_at = loop.time() + C.SERVER_SLICE
+            for room in rooms:
+                start = loop.time()
+                room.step(period)
+                end = loop.time()
+                room.stats.add(end - start, end - due, end > deadline)
+                if end >= yield_at:
+                    await asyncio.sleep(0)
+                    yield_at = loop.time() + C.SERVER_SLICE
+            self._send_frames()
+
+            due = deadline
+            behind = loop.time() - due
+            if behind > C.SERVER_MAX_LAG:
+                skipped = int(behind / period)
+                due += skipped * period
+                self.dropped += skipped
+
+    async def _serve_stream(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers.add(writer)
+        token = None
+        try:
+            while True:
+                tag, body = await read_message(reader)
+                if tag == TAG_JOIN and token is None:
+                    token = self._join(body[0])
+                    if token is None:
+                        writer.write(message(TAG_FULL, body[0]))
+                    else:
+                        pid = self._sessions[token][1]
+                        self._streams[token] = writer
+                        writer.write(message(TAG_WELCOME, body[0], pid, token))
+                    await writer.drain()
+                elif tag == TAG_COMMAND and token in self._sessions:
+                    room, pid = self._sessions[token]
+                    room.receive(pid, *body)
+                elif tag == TAG_ACK and token in self._sessions:
+                    room, pid = self._sessions[token]
+                    room.acknowledge(pid, body[0])
+                else:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            if token is not None:
+                self._leave(token)
+            self._writers.discard(writer)
+            writer.close()
+
+    def _send_frames(self) -> None:
+        """Send every player a state frame, unless their connection is
+        still backed up from earlier ones. Players whose connection is
+        closing lose their seat here rather than when it is read."""
+        gone = []
+        for token, (room, pid) in self._sessions.items():
+            writer = self._streams.get(token)
+            if writer is None:
+                continue
+            if writer.is_closing():
+                gone.append(token)
+                continue
+            if writer.transport.get_write_buffer_size() > C.SERVER_SEND_BUFFER:
+                continue
+            frame = room.frame(pid)
+            if frame is not None:
+                writer.write(message(TAG_STATE, len(frame)) + frame)
+        for token in gone:
+            self._leave(token)
+
+    def _receive_datagram(self, data: bytes) -> None:
+        if len(data) != DATAGRAM.size:
+            return
+        tag, token, seq, bits = DATAGRAM.unpack(data)
+        session = self._sessions.get(token)
+        if tag == TAG_COMMAND and session is not None:
+            room, pid = session
+            room.receive(pid, seq, bits)
+
+    def _join(self, room_id: int) -> int | None:
+        """Seat a player in the room; their session token, or None."""
+        room = self.open_room(room_id)
+        pid = None if room is None else room.join()
+        if pid is None:
+            return None
+        token = secrets.randbits(64)
+        self._sessions[token] = (room, pid)
+        return token
+
+    def _leave(self, token: int) -> None:
+        session = self._sessions.pop(token, None)
+        if session is None:
+            return
+        room, pid = session
+        self._streams.pop(token, None)
+        room.leave(pid)
+        if not len(room) and self.rooms.get(room.id) is room:
+            del self.rooms[room.id]
+            stats = room.take_stats()
+            if room.id in self._closed:
+                self._closed[room.id].merge(stats)
+            else:
+                self._closed[room.id] = stats
+
+
+class _Datagrams(asyncio.DatagramProtocol):
+    def __init__(self, server: GameServer) -> None:
+        self.server = server
+
+    def datagram_received(self, data: bytes, addr: tuple) -> None:
+        self.server._receive_datagram(data)
+
+
+def report(
+    stats: Mapping[int, RoomStats], elapsed: float, dropped: int = 0
+) -> str:
+    """Summary of take_stats() over elapsed seconds, worst rooms last."""
+    ticks = sum(s.ticks for s in stats.values())
+    if not ticks:
+        return f"{len(stats)} rooms, no ticks"
+    update = sum(s.update for s in stats.values())
+    latency = sum(s.latency for s in stats.values())
+    missed = [s.missed for s in stats.values() if s.missed]
+    lines = [
+        f"{len(stats)} rooms  {ticks / elapsed:.0f} room-ticks/s"
+        f"  update {update / ticks * 1000:.3f} ms"
+        f"  busy {update / elapsed:.0%}",
+        f"latency mean {latency / ticks * 1000:.2f} ms"
+        f"  max {max(s.latency_max for s in stats.values()) * 1000:.2f} ms"
+        f"  missed {sum(missed)} in {len(missed)} rooms"
+        f"  dropped {dropped}",
+    ]
+    worst = sorted(
+        stats.items(), key=lambda item: item[1].latency_max, reverse=True
+    )
+    for room_id, s in worst[:3]:
+        lines.append(
+            f"  room {room_id}: {s.ticks} ticks"
+            f"  latency mean {s.mean_latency * 1000:.2f}"
+            f" max {s.latency_max * 1000:.2f} ms"
+            f"  update max {s.update_max * 1000:.2f} ms"
+            f"  missed {s.missed}"
+        )
+    return "\n".join(lines)
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = GameServer(args.host, args.port, args.seed)
+    for room_id in range(args.rooms):
+        room = server.open_room(room_id)
+        for k in range(args.bots):
+            seed = None
+            if args.seed is not None:
+                seed = args.seed + room_id * C.MAX_PLAYERS + k
+            room.add_bot(POLICIES[args.policy](seed))
+    await server.start()
+    print(
+        f"listening on {server.host}:{server.port} (TCP and UDP)"
+        f"  {len(server.rooms)} rooms  {C.TICK_RATE} Hz"
+    )
+
+    loop = asyncio.get_running_loop()
+    begin = last = loop.time()
+    try:
+        while args.duration is None or last - begin < args.duration:
+            wait = args.report
+            if args.duration is not None:
+                wait = min(wait, begin + args.duration - last)
+            await asyncio.sleep(wait)
+            now = loop.time()
+            print(report(server.take_stats(), now - last, server.dropped))
+            last = now
+    finally:
+        await server.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=C.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=C.SERVER_PORT)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--rooms", type=int, default=0)
+    parser.add_argument("--bots", type=int, default=0)
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--report", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=None)
+    args = parser.parse_args()
+    if not 0 <= args.bots <= C.MAX_PLAYERS:
+        parser.error(f"--bots must be between 0 and {C.MAX_PLAYERS}")
+    if args.rooms > C.SERVER_MAX_ROOMS:
+        parser.error(f"--rooms must be at most {C.SERVER_MAX_ROOMS}")
+    with suppress(KeyboardInterrupt):
+        asyncio.run(_serve(args))
+
+
+if __name__ == "__main__":
+    main()